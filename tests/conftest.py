@@ -0,0 +1,39 @@
+"""Shared fixtures for the twobee tests."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+from random import Random
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from .helpers import random_bases, write_twobit
+
+
+##############################################################################
+@pytest.fixture(scope="session")
+def sequences() -> dict[str, str]:
+    """The sequences in the test genome."""
+    random = Random(2023)
+    return {
+        **{f"chr{number}": random_bases(300_000, random) for number in range(1, 4)},
+        **{f"scaffold{number}": random_bases(500, random) for number in range(20)},
+    }
+
+
+##############################################################################
+@pytest.fixture(scope="session")
+def genome(tmp_path_factory: pytest.TempPathFactory, sequences: dict[str, str]) -> Path:
+    """A 2bit file holding the test sequences."""
+    return write_twobit(tmp_path_factory.mktemp("genome") / "genome.2bit", sequences)
+
+
+### conftest.py ends here
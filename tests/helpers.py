@@ -0,0 +1,105 @@
+"""Helpers for the twobee tests."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+from random import Random
+from re import finditer
+from struct import pack
+
+##############################################################################
+# The 2 bit code for each base.
+CODES = {"T": 0, "C": 1, "A": 2, "G": 3, "N": 0}
+
+
+##############################################################################
+def _blocks(pattern: str, bases: str, endianness: str) -> bytes:
+    """Build a block table for the runs of bases that match a pattern.
+
+    Args:
+        pattern: The pattern that matches a run of bases.
+        bases: The bases.
+        endianness: The endianness to write with, as a `struct` prefix.
+
+    Returns:
+        The block table.
+    """
+    runs = [(run.start(), run.end() - run.start()) for run in finditer(pattern, bases)]
+    return pack(
+        f"{endianness}L{2 * len(runs)}L",
+        len(runs),
+        *(start for start, _ in runs),
+        *(size for _, size in runs),
+    )
+
+
+##############################################################################
+def write_twobit(path: Path, sequences: dict[str, str], endianness: str = "<") -> Path:
+    """Write a 2bit file.
+
+    Args:
+        path: The path to write to.
+        sequences: The bases of each sequence, keyed by name; `N` is an N,
+            and lower case is masked.
+        endianness: The endianness to write with, as a `struct` prefix.
+
+    Returns:
+        The path that was written to.
+    """
+    records = []
+    for bases in sequences.values():
+        padded = bases.upper() + "T" * (-len(bases) % 4)
+        records.append(
+            pack(f"{endianness}L", len(bases))
+            + _blocks("[Nn]+", bases, endianness)
+            + _blocks("[a-z]+", bases, endianness)
+            + pack(f"{endianness}L", 0)
+            + bytes(
+                (CODES[padded[base]] << 6)
+                | (CODES[padded[base + 1]] << 4)
+                | (CODES[padded[base + 2]] << 2)
+                | CODES[padded[base + 3]]
+                for base in range(0, len(padded), 4)
+            )
+        )
+    offset = 16 + sum(5 + len(name) for name in sequences)
+    index = b""
+    for name, record in zip(sequences, records):
+        index += bytes([len(name)]) + name.encode() + pack(f"{endianness}L", offset)
+        offset += len(record)
+    path.write_bytes(
+        pack(f"{endianness}IIII", 0x1A412743, 0, len(sequences), 0)
+        + index
+        + b"".join(records)
+    )
+    return path
+
+
+##############################################################################
+def random_bases(size: int, random: Random) -> str:
+    """Make some random bases, with runs of Ns and of masked bases.
+
+    Args:
+        size: The number of bases to make.
+        random: The source of randomness.
+
+    Returns:
+        The bases.
+    """
+    bases = [random.choice("ACGT") for _ in range(size)]
+    for _ in range(size // 300 + 1):
+        start = random.randrange(size)
+        for base in range(start, min(size, start + random.randrange(1, 80))):
+            bases[base] = bases[base].lower()
+    for _ in range(size // 500 + 1):
+        start = random.randrange(size)
+        for base in range(start, min(size, start + random.randrange(1, 60))):
+            bases[base] = "N" if bases[base].isupper() else "n"
+    return "".join(bases)
+
+
+### helpers.py ends here
@@ -0,0 +1,72 @@
+"""Tests for catalogs of 2bit files."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+from threading import enumerate as threads
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitCatalog, TwoBitFileReader
+
+from .helpers import write_twobit
+
+
+##############################################################################
+def _readahead_threads() -> int:
+    """Count the background readahead threads that are running."""
+    return sum(thread.name.startswith("twobee-readahead") for thread in threads())
+
+
+##############################################################################
+def test_release_keeps_only_the_header_and_index(
+    genome: Path, sequences: dict[str, str]
+) -> None:
+    """Releasing a reader should leave no readahead or thread behind."""
+    # pylint: disable=protected-access
+    before = _readahead_threads()
+    reader = TwoBitFileReader(str(genome), background=True)
+    sequence = reader["chr1"]
+    for start in range(0, 200_000, 10_000):
+        sequence.packed(start, start + 10_000)
+    assert reader._buffer
+    assert _readahead_threads() > before
+    reader.release()
+    assert not reader.is_open
+    assert reader._buffer == b""
+    assert reader._pending is None
+    assert len(reader.sequence_cache) == 0
+    assert _readahead_threads() == before
+    assert reader._loaded_index is not None
+    assert str(reader["chr2"][:100]) == sequences["chr2"][:100].upper()
+
+
+##############################################################################
+def test_eviction_releases_readers(tmp_path: Path, sequences: dict[str, str]) -> None:
+    """A genome evicted from a catalog should only keep its header and index."""
+    # pylint: disable=protected-access
+    paths = {
+        name: write_twobit(tmp_path / f"{name}.2bit", {"chr1": sequences["chr1"]})
+        for name in ("first", "second")
+    }
+    with TwoBitCatalog(paths, max_open=1) as catalog:
+        first = catalog.reader("first")
+        for start in range(0, 100_000, 5_000):
+            catalog.fetch("first", "chr1", start, start + 5_000)
+        assert first.is_open and first._buffer
+        assert (
+            catalog.fetch("second", "chr1", 10, 20) == sequences["chr1"][10:20].upper()
+        )
+        assert catalog.stats.evictions == 1
+        assert not first.is_open
+        assert first._buffer == b""
+        assert len(first.sequence_cache) == 0
+        assert catalog.fetch("first", "chr1", 0, 10) == sequences["chr1"][:10].upper()
+        assert catalog.stats.loads == 2
+
+
+### test_catalog.py ends here
@@ -0,0 +1,139 @@
+"""Tests for comparing two 2bit files."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from random import Random
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitFileReader
+from twobee.lib import diff as diff_module
+from twobee.lib.diff import Difference, diff
+
+from .helpers import write_twobit
+
+##############################################################################
+# The base that each base is changed to, to make a substitution.
+CHANGE = str.maketrans("ACGT", "CGTA")
+
+
+##############################################################################
+def edit(bases: str, start: int, end: int, replacement: str) -> str:
+    """Replace a region of some bases.
+
+    Args:
+        bases: The bases.
+        start: The start of the region (inclusive).
+        end: The end of the region (exclusive).
+        replacement: What to replace the region with.
+
+    Returns:
+        The edited bases.
+    """
+    return f"{bases[:start]}{replacement}{bases[end:]}"
+
+
+##############################################################################
+@pytest.fixture(scope="module")
+def versions(tmp_path_factory: pytest.TempPathFactory) -> tuple[Path, Path]:
+    """Two versions of a genome, with known differences between them."""
+    random = Random(46)
+    original = {
+        name: "".join(random.choice("ACGT") for _ in range(size))
+        for name, size in (("a", 1_000), ("gone", 50), ("b", 1_001), ("c", 20_003))
+    }
+    first = dict(original)
+    first["a"] = edit(first["a"], 300, 305, "NNNNN")
+    first["a"] = edit(first["a"], 600, 620, first["a"][600:620].lower())
+    second = {name: bases for name, bases in original.items() if name != "gone"}
+    second["a"] = edit(second["a"], 10, 11, second["a"][10].translate(CHANGE))
+    second["a"] = edit(second["a"], 100, 104, second["a"][100:104].translate(CHANGE))
+    second["a"] = edit(second["a"], 200, 210, "N" * 10)
+    second["a"] = edit(second["a"], 300, 305, "ACGGC")
+    second["a"] = edit(second["a"], 400, 420, second["a"][400:420].lower())
+    second["b"] = f"{second['b']}ACGTACG"
+    second["new"] = "ACGT" * 10
+    directory = tmp_path_factory.mktemp("diff")
+    return (
+        write_twobit(directory / "first.2bit", first),
+        write_twobit(directory / "second.2bit", second),
+    )
+
+
+##############################################################################
+def test_identical_files_have_no_differences(genome: Path) -> None:
+    """A file should have no differences from itself."""
+    assert not list(diff(TwoBitFileReader(str(genome)), TwoBitFileReader(str(genome))))
+
+
+##############################################################################
+def test_differences(versions: tuple[Path, Path]) -> None:
+    """Every kind of difference should be found, in order."""
+    first, second = (TwoBitFileReader(str(path)) for path in versions)
+    original = str(first["a"][:])
+    assert list(diff(first, second)) == [
+        Difference(
+            "a", 10, 11, "substitution", original[10], original[10].translate(CHANGE)
+        ),
+        Difference(
+            "a",
+            100,
+            104,
+            "substitution",
+            original[100:104],
+            original[100:104].translate(CHANGE),
+        ),
+        # The bases under the Ns aren't reported as substitutions.
+        Difference("a", 200, 210, "n_added"),
+        Difference("a", 300, 305, "n_removed"),
+        Difference("a", 400, 420, "mask_added"),
+        Difference("a", 600, 620, "mask_removed"),
+        Difference("gone", 0, 50, "removed"),
+        # The bases past the end of the shorter sequence, including the
+        # unused bits of its last byte, aren't compared.
+        Difference("b", 1_001, 1_008, "resized"),
+        Difference("new", 0, 40, "added"),
+    ]
+
+
+##############################################################################
+def test_chunks_find_the_same_differences(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Substitutions that cross chunks should be found as single runs."""
+    random = Random(4646)
+    first = "".join(random.choice("ACGT") for _ in range(2_003))
+    second = first
+    for start in range(5, 2_000, 97):
+        end = start + random.randrange(1, 20)
+        second = edit(second, start, end, first[start:end].translate(CHANGE))
+    readers = [
+        TwoBitFileReader(str(write_twobit(tmp_path / f"{name}.2bit", {"s": bases})))
+        for name, bases in (("first", first), ("second", second))
+    ]
+    expected = list(diff(*readers))
+    assert len(expected) == len(range(5, 2_000, 97))
+    monkeypatch.setattr(diff_module, "DIFF_CHUNK", 3)
+    assert list(diff(*readers)) == expected
+
+
+##############################################################################
+def test_processes_find_the_same_differences(versions: tuple[Path, Path]) -> None:
+    """Comparing on a process pool should find what comparing serially does."""
+    first, second = (TwoBitFileReader(str(path)) for path in versions)
+    serial = list(diff(first, second))
+    with ProcessPoolExecutor(2) as executor:
+        assert list(diff(first, second, executor)) == serial
+
+
+### test_diff.py ends here
@@ -0,0 +1,93 @@
+"""Tests for digesting the sequences of a 2bit file."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from base64 import urlsafe_b64encode
+from hashlib import md5, sha512
+from pathlib import Path
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitFileReader
+from twobee.lib.decode import stream_bases
+from twobee.lib.digest import SIDECAR_SUFFIX, digest_file, digest_sequence, sha512t24u
+
+from .helpers import write_twobit
+
+
+##############################################################################
+def expected_digests(bases: str) -> tuple[str, str]:
+    """Work out the digests of some bases, without any help from twobee.
+
+    Args:
+        bases: The bases.
+
+    Returns:
+        The MD5 digest, as hex, and the refget identifier of the bases.
+    """
+    data = bases.upper().encode()
+    return (
+        md5(data).hexdigest(),
+        f"SQ.{urlsafe_b64encode(sha512(data).digest()[:24]).decode()}",
+    )
+
+
+##############################################################################
+def test_known_digests(tmp_path: Path) -> None:
+    """The digests should match the examples given by the refget standard."""
+    assert sha512t24u(b"ACGT") == "aKF498dAxcJAqme6QYQ7EZ07-fiw8Kw2"
+    assert sha512t24u(b"") == "z4PhNX7vuL3xVChQ1m2AB9Yg5AULVxXc"
+    reader = TwoBitFileReader(str(write_twobit(tmp_path / "acgt.2bit", {"s": "aCgT"})))
+    digest = digest_sequence(reader["s"])
+    assert digest.length == 4
+    assert digest.md5 == "f1f8f4bf413b16ad135722aa4591043e"
+    assert digest.refget == "SQ.aKF498dAxcJAqme6QYQ7EZ07-fiw8Kw2"
+
+
+##############################################################################
+def test_masked_n_runs_digest_as_n(tmp_path: Path) -> None:
+    """Masked runs of N should be digested as upper case N."""
+    bases = "ACGTnnnnACgtnNNnTTacNNNNNNNNnnnnGA"
+    reader = TwoBitFileReader(
+        str(write_twobit(tmp_path / "masked.2bit", {"s": bases})), masking=True
+    )
+    for chunk_size in (4, 8, 1024):
+        digest = digest_sequence(reader["s"], chunk_size=chunk_size)
+        assert (digest.md5, digest.refget) == expected_digests(bases)
+        assert (
+            b"".join(stream_bases(reader["s"], chunk_size=chunk_size, masking=True))
+            == bases.replace("n", "N").encode()
+        )
+
+
+##############################################################################
+def test_sequences_and_regions(genome: Path, sequences: dict[str, str]) -> None:
+    """Whole sequences and regions of them should digest as their bases."""
+    assert "n" in sequences["chr1"]
+    reader = TwoBitFileReader(str(genome), masking=True)
+    for name in ("chr1", "scaffold0", "scaffold19"):
+        bases = sequences[name]
+        digest = digest_sequence(reader[name], chunk_size=10_000)
+        assert (digest.md5, digest.refget) == expected_digests(bases)
+        digest = digest_sequence(reader[name], 7, 401, chunk_size=64)
+        assert digest.length == 394
+        assert (digest.md5, digest.refget) == expected_digests(bases[7:401])
+
+
+##############################################################################
+def test_digest_file(tmp_path: Path, sequences: dict[str, str]) -> None:
+    """Digesting a file should digest every sequence, and cache the result."""
+    path = write_twobit(tmp_path / "genome.2bit", sequences)
+    digests = digest_file(path, workers=2)
+    assert list(digests) == list(sequences)
+    for name, bases in sequences.items():
+        assert (digests[name].md5, digests[name].refget) == expected_digests(bases)
+    assert Path(f"{path}{SIDECAR_SUFFIX}").exists()
+    assert digest_file(path, ["scaffold3"]) == {"scaffold3": digests["scaffold3"]}
+
+
+### test_digest.py ends here
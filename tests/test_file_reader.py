@@ -0,0 +1,49 @@
+"""Tests for reading 2bit files from the local filesystem."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitFileReader
+
+
+##############################################################################
+def test_sequential_reads_grow_the_window(genome: Path) -> None:
+    """Reads that carry on from the last one should grow the readahead."""
+    reader = TwoBitFileReader(str(genome))
+    reader.read(100, 1_000)
+    reader.read(100, 1_100)
+    reader.read(100, 1_300)
+    assert reader.stats.window > TwoBitFileReader.MIN_READAHEAD
+
+
+##############################################################################
+def test_backward_reads_are_not_sequential(genome: Path) -> None:
+    """Reads that go back over what has been read shouldn't read ahead."""
+    reader = TwoBitFileReader(str(genome))
+    reader.read(100, 50_000)
+    for position in range(49_900, 40_000, -100):
+        reader.read(100, position)
+        assert reader.stats.window == 0
+
+
+##############################################################################
+def test_reads_are_right_whatever_the_order(
+    genome: Path, sequences: dict[str, str]
+) -> None:
+    """Bases should be right however the file is read."""
+    reader = TwoBitFileReader(str(genome), masking=True)
+    bases = sequences["chr1"]
+    for start in [*range(0, 20_000, 1_000), *range(20_000, 0, -1_500)]:
+        assert str(reader["chr1"][start : start + 1_000]) == (
+            bases[start : start + 1_000].replace("n", "N")
+        )
+
+
+### test_file_reader.py ends here
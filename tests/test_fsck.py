@@ -0,0 +1,182 @@
+"""Tests for checking the structure of 2bit files."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from struct import pack
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from twobee.lib.fsck import Problem, fsck
+
+from .helpers import write_twobit
+
+##############################################################################
+# The sequences of the file that's broken in the tests.
+#
+# With the header taking 16 bytes and each index entry 8, the record of
+# `one` runs from 32 to 76: its size at 32, its N block count at 36, the
+# starts of its two N blocks at 40 and 44 and their sizes at 48 and 52,
+# its mask block count at 56, its mask block at 60 and 64, its reserved
+# field at 68 and its packed DNA from 72. The record of `two` runs from 76
+# to the end of the file at 113, with its packed DNA from 108.
+SEQUENCES = {"one": "ACNNGTNNNNacgtAC", "two": "ACGTACGTACGTnnAAG"}
+
+
+##############################################################################
+def broken(path: Path, offset: int, replacement: bytes) -> Path:
+    """Write a copy of the test file with some of its bytes replaced.
+
+    Args:
+        path: The path to write to.
+        offset: The offset of the bytes to replace.
+        replacement: The bytes to replace them with.
+
+    Returns:
+        The path that was written to.
+    """
+    data = bytearray(write_twobit(path, SEQUENCES).read_bytes())
+    data[offset : offset + len(replacement)] = replacement
+    path.write_bytes(bytes(data))
+    return path
+
+
+##############################################################################
+@pytest.mark.parametrize("endianness", ["<", ">"], ids=["little", "big"])
+def test_clean_files_have_no_problems(
+    tmp_path: Path, endianness: str, genome: Path
+) -> None:
+    """A well-formed file should have no problems, in either byte order."""
+    path = write_twobit(tmp_path / "clean.2bit", SEQUENCES, endianness)
+    assert path.stat().st_size == 113
+    assert fsck(path) == []
+    assert fsck(genome) == []
+
+
+##############################################################################
+@pytest.mark.parametrize(
+    "size, expected",
+    [
+        (10, [Problem("The file is too short to hold a 2bit header", offset=0)]),
+        (
+            20,
+            [
+                Problem(
+                    "The index is cut short by the end of the file after "
+                    "0 of 2 sequence(s)",
+                    offset=16,
+                )
+            ],
+        ),
+        (
+            42,
+            [
+                Problem("The record starts past the end of the file", "two", 76),
+                Problem("The N block table runs past the end of the file", "one", 32),
+            ],
+        ),
+        (
+            62,
+            [
+                Problem("The record starts past the end of the file", "two", 76),
+                Problem(
+                    "The mask block table runs past the end of the file", "one", 32
+                ),
+            ],
+        ),
+        (
+            110,
+            [
+                Problem(
+                    "The packed DNA runs 3 byte(s) past the end of the file",
+                    "two",
+                    108,
+                )
+            ],
+        ),
+    ],
+    ids=["header", "index", "n-blocks", "mask-blocks", "dna"],
+)
+def test_truncation(tmp_path: Path, size: int, expected: list[Problem]) -> None:
+    """A file that's cut short should be reported where it's cut."""
+    path = write_twobit(tmp_path / "truncated.2bit", SEQUENCES)
+    path.write_bytes(path.read_bytes()[:size])
+    assert fsck(path) == expected
+
+
+##############################################################################
+def test_trailing_bytes(tmp_path: Path) -> None:
+    """Bytes after the last record should be reported."""
+    path = write_twobit(tmp_path / "trailing.2bit", SEQUENCES)
+    path.write_bytes(path.read_bytes() + b"junk")
+    assert fsck(path) == [
+        Problem(
+            "The packed DNA is followed by 4 byte(s) that belong to no sequence",
+            "two",
+            113,
+        )
+    ]
+
+
+##############################################################################
+def test_overlapping_record(tmp_path: Path) -> None:
+    """A record whose packed DNA runs into the next record should be reported."""
+    path = broken(tmp_path / "overlapping.2bit", 32, pack("<L", 24))
+    assert fsck(path) == [
+        Problem("The packed DNA overlaps the record of 'two'", "one", 72)
+    ]
+
+
+##############################################################################
+def test_reserved_field(tmp_path: Path) -> None:
+    """A record's reserved field that isn't zero should be reported."""
+    path = broken(tmp_path / "reserved.2bit", 68, pack("<L", 5))
+    assert fsck(path) == [Problem("The reserved field is 5 rather than 0", "one", 68)]
+
+
+##############################################################################
+def test_out_of_order_block(tmp_path: Path) -> None:
+    """Blocks that are out of order should be reported."""
+    path = broken(tmp_path / "unordered.2bit", 40, pack("<LL", 6, 2))
+    assert fsck(path) == [
+        Problem(
+            "1 N block(s) are out of order or overlap the one before, the "
+            "first being block 1 at 2",
+            "one",
+            32,
+        )
+    ]
+
+
+##############################################################################
+def test_garbage_sequence_count(tmp_path: Path) -> None:
+    """A sequence count that's garbage should stop the checks at the index."""
+    path = broken(tmp_path / "count.2bit", 8, pack("<L", 0xFFFFFFF0))
+    problems = fsck(path)
+    assert problems[-1].message.startswith(
+        "The index is cut short by the end of the file after "
+    )
+    assert problems[-1].message.endswith(f" of {0xFFFFFFF0} sequence(s)")
+    assert all(problem.offset is not None for problem in problems)
+
+
+##############################################################################
+def test_threads_find_the_same_problems(tmp_path: Path) -> None:
+    """Checking on a pool of threads should find what checking serially does."""
+    path = broken(tmp_path / "both.2bit", 56, pack("<LLLL", 1, 20, 4, 5))
+    serial = fsck(path)
+    assert len(serial) == 2
+    with ThreadPoolExecutor(2) as executor:
+        assert fsck(path, executor) == serial
+
+
+### test_fsck.py ends here
@@ -0,0 +1,120 @@
+"""Tests for building haplotype sequences."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from twobee import HaplotypeBuilder, TwoBitFileReader, TwoBitSequence, Variant
+
+from .helpers import write_twobit
+
+##############################################################################
+# The bases of the reference.
+REFERENCE = "ACGTTGCAAC" * 10
+
+##############################################################################
+# A SNP, a deletion of 4 bases and an insertion of 3 bases.
+SNP = Variant(5, REFERENCE[5], "A")
+DELETION = Variant(20, REFERENCE[20:25], REFERENCE[20])
+INSERTION = Variant(40, REFERENCE[40], f"{REFERENCE[40]}GGG")
+
+
+##############################################################################
+@pytest.fixture
+def reference(tmp_path: Path) -> TwoBitSequence:
+    """The reference sequence."""
+    reader = TwoBitFileReader(
+        str(write_twobit(tmp_path / "ref.2bit", {"s": REFERENCE}))
+    )
+    return reader["s"]
+
+
+##############################################################################
+def test_variants_are_applied(reference: TwoBitSequence) -> None:
+    """The variants of a haplotype should be applied to the reference."""
+    builder = HaplotypeBuilder(reference, {("x", 0): [SNP, DELETION, INSERTION]})
+    (region,) = builder.build([(0, 100)])
+    assert region.skipped == 0
+    assert region.bases == (
+        f"{REFERENCE[:5]}A{REFERENCE[6:21]}{REFERENCE[25:40]}"
+        f"{REFERENCE[40]}GGG{REFERENCE[41:]}"
+    )
+    assert len(region) == 100 - 4 + 3
+
+
+##############################################################################
+def test_coordinates_map_across_indels(reference: TwoBitSequence) -> None:
+    """Positions should map between the reference and the haplotype."""
+    builder = HaplotypeBuilder(reference, {("x", 0): [SNP, DELETION, INSERTION]})
+    (region,) = builder.build([(0, 100)])
+    # Before, at and after the SNP.
+    assert [region.to_haplotype(position) for position in (4, 5, 6)] == [4, 5, 6]
+    # The deleted bases map to just after what's left of the deletion.
+    deleted = [20, 21, 21, 21, 21, 21, 22]
+    assert [region.to_haplotype(position) for position in range(20, 27)] == deleted
+    # The inserted bases push everything after them along.
+    assert region.to_haplotype(40) == 36
+    assert region.to_haplotype(41) == 40
+    assert region.to_haplotype(99) == 98
+    # Going the other way, the inserted bases map to just after the
+    # reference allele.
+    inserted = [39, 40, 41, 41, 41, 41]
+    assert [region.to_reference(location) for location in range(35, 41)] == inserted
+    assert region.to_reference(21) == 25
+    assert region.to_reference(98) == 99
+    for position in (0, 10, 19, 30, 50, 99):
+        assert region.to_reference(region.to_haplotype(position)) == position
+        assert region.bases[region.to_haplotype(position)] == REFERENCE[position]
+
+
+##############################################################################
+def test_regions_within_a_sequence(reference: TwoBitSequence) -> None:
+    """Regions should be offset from their own start."""
+    builder = HaplotypeBuilder(reference, {("x", 0): [DELETION, INSERTION]})
+    (region,) = builder.build([(30, 50)])
+    assert region.skipped == 0
+    assert region.bases == f"{REFERENCE[30:41]}GGG{REFERENCE[41:50]}"
+    assert region.to_haplotype(30) == 0
+    assert region.to_haplotype(45) == 18
+    assert region.to_reference(18) == 45
+
+
+##############################################################################
+def test_variants_running_into_a_region_are_skipped(
+    reference: TwoBitSequence,
+) -> None:
+    """A variant that starts before a region and runs into it is skipped."""
+    builder = HaplotypeBuilder(reference, {("x", 0): [SNP, DELETION, INSERTION]})
+    (region,) = builder.build([(22, 60)])
+    assert region.skipped == 1
+    assert region.bases == f"{REFERENCE[22:41]}GGG{REFERENCE[41:60]}"
+    # A variant that ends before the region isn't counted.
+    (region,) = builder.build([(25, 30)])
+    assert region.skipped == 0
+    assert region.bases == REFERENCE[25:30]
+
+
+##############################################################################
+def test_long_variants_are_found_past_shorter_ones(
+    reference: TwoBitSequence,
+) -> None:
+    """A long deletion should be found even with later variants before the region."""
+    deletion = Variant(10, REFERENCE[10:50], REFERENCE[10])
+    snp = Variant(30, REFERENCE[30], "G")
+    builder = HaplotypeBuilder(reference, {("x", 0): [deletion, snp]})
+    (region,) = builder.build([(45, 60)])
+    assert region.skipped == 1
+    assert region.bases == REFERENCE[45:60]
+
+
+### test_haplotype.py ends here
@@ -0,0 +1,163 @@
+"""Tests for reading 2bit files over HTTP."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from re import match
+from threading import Thread
+from typing import Iterator
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitHTTPReader
+
+
+##############################################################################
+class Server(ThreadingHTTPServer):
+    """A HTTP server that serves one file, and counts the requests made of it."""
+
+    def __init__(self, data: bytes, ranges: bool) -> None:
+        self.data = data
+        self.ranges = ranges
+        self.requests = 0
+        super().__init__(("127.0.0.1", 0), Handler)
+
+    @property
+    def url(self) -> str:
+        """The URL of the file."""
+        return f"http://127.0.0.1:{self.server_address[1]}/genome.2bit"
+
+
+##############################################################################
+class Handler(BaseHTTPRequestHandler):
+    """Serves the file, honouring `Range` if the server is meant to."""
+
+    server: Server
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a GET request."""
+        self.server.requests += 1
+        data = self.server.data
+        wanted = match(r"^bytes=(\d+)-(\d+)$", self.headers.get("Range", ""))
+        if self.server.ranges and wanted:
+            start, end = int(wanted[1]), min(int(wanted[2]) + 1, len(data))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(data)}")
+            data = data[start:end]
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_: object) -> None:  # pylint: disable=arguments-differ
+        """Keep quiet."""
+
+
+##############################################################################
+def serve(genome: Path, ranges: bool) -> Iterator[Server]:
+    """Serve a genome for the length of a test.
+
+    Args:
+        genome: The path to the genome.
+        ranges: Should the server honour `Range`?
+
+    Yields:
+        The server.
+    """
+    server = Server(genome.read_bytes(), ranges)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+##############################################################################
+@pytest.fixture
+def ranged(genome: Path) -> Iterator[Server]:
+    """A server that honours `Range`."""
+    yield from serve(genome, True)
+
+
+##############################################################################
+@pytest.fixture
+def unranged(genome: Path) -> Iterator[Server]:
+    """A server that ignores `Range`, and always sends the whole file."""
+    yield from serve(genome, False)
+
+
+##############################################################################
+def test_reads_bases(ranged: Server, sequences: dict[str, str]) -> None:
+    """Bases read over HTTP should be the bases in the file."""
+    reader = TwoBitHTTPReader(ranged.url)
+    assert reader.sequences == tuple(sequences)
+    for name, bases in sequences.items():
+        assert str(reader[name][100:2_000]) == bases[100:2_000].upper()
+    assert reader.size == len(ranged.data)
+
+
+##############################################################################
+def test_header_and_index_take_one_request(ranged: Server) -> None:
+    """Opening the reader should only need one request."""
+    reader = TwoBitHTTPReader(ranged.url)
+    assert reader.request_count == ranged.requests == 1
+
+
+##############################################################################
+def test_cached_reads_make_no_requests(ranged: Server) -> None:
+    """Reading what has already been read shouldn't go back to the server."""
+    reader = TwoBitHTTPReader(ranged.url)
+    str(reader["scaffold3"][:])
+    before = ranged.requests
+    for _ in range(10):
+        str(reader["scaffold3"][:])
+    assert ranged.requests == before
+
+
+##############################################################################
+def test_sequential_reads_read_ahead(ranged: Server, sequences: dict[str, str]) -> None:
+    """Reading a sequence from end to end should read ahead."""
+    reader = TwoBitHTTPReader(ranged.url, block_size=4096, cache_blocks=1024)
+    sequence = reader["chr2"]
+    before = ranged.requests
+    chunks = [
+        str(sequence[start : start + 4096]) for start in range(0, len(sequence), 4096)
+    ]
+    assert "".join(chunks) == sequences["chr2"].upper()
+    # The packed bases are about 75,000 bytes, or 19 blocks; with the
+    # readahead doubling each time that should take a handful of requests.
+    assert ranged.requests - before <= 6
+    assert reader.request_count == ranged.requests
+
+
+##############################################################################
+def test_ignored_range_downloads_once(
+    unranged: Server, sequences: dict[str, str]
+) -> None:
+    """If the server ignores `Range`, the file should only be downloaded once."""
+    reader = TwoBitHTTPReader(unranged.url, block_size=4096, cache_blocks=2)
+    for name, bases in sequences.items():
+        assert str(reader[name][:]) == bases.upper()
+    assert unranged.requests == 1
+
+
+### test_http_reader.py ends here
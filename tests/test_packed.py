@@ -0,0 +1,48 @@
+"""Tests for packed bases."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+
+##############################################################################
+# Local imports.
+from twobee import PackedBases, TwoBitFileReader
+
+
+##############################################################################
+def test_packed_bases_decode_like_the_sequence(genome: Path) -> None:
+    """Packed bases should decode to the same bases as the sequence."""
+    reader = TwoBitFileReader(str(genome), masking=True)
+    for name in ("chr2", "scaffold3"):
+        sequence = reader[name]
+        for start in range(0, min(len(sequence), 30_000), 2_999):
+            end = start + 4_001
+            assert str(PackedBases.from_sequence(sequence, start, end)) == str(
+                sequence[start:end]
+            )
+
+
+##############################################################################
+def test_masked_n_runs_stay_n(genome: Path, sequences: dict[str, str]) -> None:
+    """An N run that is also masked should still be shown as N."""
+    reader = TwoBitFileReader(str(genome), masking=True)
+    bases = sequences["chr1"]
+    assert "n" in bases
+    assert str(PackedBases.from_sequence(reader["chr1"])) == bases.replace("n", "N")
+
+
+##############################################################################
+def test_slices_decode_like_the_whole(genome: Path, sequences: dict[str, str]) -> None:
+    """Slicing packed bases should give the same bases as slicing the text."""
+    reader = TwoBitFileReader(str(genome), masking=True)
+    packed = PackedBases.from_sequence(reader["chr3"], 0, 10_000)
+    bases = sequences["chr3"][:10_000].replace("n", "N")
+    for start, end in ((0, 1), (3, 9_998), (1_001, 1_002), (5_555, 7_777)):
+        assert str(packed[start:end]) == bases[start:end]
+
+
+### test_packed.py ends here
@@ -0,0 +1,56 @@
+"""Tests for decoding regions of a sequence in parallel."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from pathlib import Path
+from pickle import dumps, loads
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitFileReader
+from twobee.lib.parallel import decode_parallel
+
+
+##############################################################################
+def test_threads_decode_like_the_sequence(
+    genome: Path, sequences: dict[str, str]
+) -> None:
+    """Decoding with a thread pool should give the bases of the sequence."""
+    sequence = TwoBitFileReader(str(genome), masking=True)["chr2"]
+    with ThreadPoolExecutor(3) as pool:
+        bases = decode_parallel(
+            sequence, 3, 299_999, pool, masking=True, segment_size=10_001
+        )
+    assert bases.decode() == sequences["chr2"][3:299_999].replace("n", "N")
+
+
+##############################################################################
+@pytest.mark.skipif(
+    "fork" not in get_all_start_methods(), reason="Needs to be able to fork"
+)
+def test_forked_workers_open_their_own_readers(
+    genome: Path, sequences: dict[str, str]
+) -> None:
+    """Forked workers shouldn't share a reader recreated in the parent."""
+    sequence = loads(dumps(TwoBitFileReader(str(genome), masking=True)["chr1"]))
+    assert str(sequence[:10]) == sequences["chr1"][:10].replace("n", "N")
+    expected = sequences["chr1"][3:299_999].replace("n", "N")
+    with ProcessPoolExecutor(3, mp_context=get_context("fork")) as pool:
+        for _ in range(3):
+            bases = decode_parallel(
+                sequence, 3, 299_999, pool, masking=True, segment_size=10_001
+            )
+            assert bases.decode() == expected
+
+
+### test_parallel.py ends here
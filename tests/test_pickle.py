@@ -0,0 +1,96 @@
+"""Tests for pickling readers and sequences."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from multiprocessing import get_all_start_methods, get_context
+from pathlib import Path
+from pickle import dumps, loads
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitFileReader, TwoBitReader, TwoBitSequence
+
+##############################################################################
+# A reader that was recreated in the parent process, before forking.
+_PARENT_READER: TwoBitReader | None = None
+
+
+##############################################################################
+def test_readers_round_trip(genome: Path, sequences: dict[str, str]) -> None:
+    """A pickled reader should read the same as the original."""
+    reader = TwoBitFileReader(str(genome), masking=True)
+    copy = loads(dumps(reader))
+    assert isinstance(copy, TwoBitFileReader)
+    assert copy.sequences == reader.sequences
+    assert copy.masking
+    assert str(copy["chr2"][1_000:5_000]) == (
+        sequences["chr2"][1_000:5_000].replace("n", "N")
+    )
+
+
+##############################################################################
+def test_sequences_round_trip(genome: Path, sequences: dict[str, str]) -> None:
+    """A pickled sequence should have the same bases and blocks as the original."""
+    reader = TwoBitFileReader(str(genome), masking=True)
+    for name in ("chr1", "scaffold5"):
+        sequence = reader[name]
+        copy = loads(dumps(sequence))
+        assert isinstance(copy, TwoBitSequence)
+        assert copy.name == name
+        assert len(copy) == len(sequence)
+        assert list(copy.n_blocks) == list(sequence.n_blocks)
+        assert list(copy.mask_blocks) == list(sequence.mask_blocks)
+        assert str(copy[:]) == str(sequence[:]) == sequences[name].replace("n", "N")
+
+
+##############################################################################
+def test_references_share_a_reader(genome: Path) -> None:
+    """Sequences from the same reader should be unpickled onto one reader."""
+    reader = TwoBitFileReader(str(genome))
+    first = loads(dumps(reader["chr1"]))
+    second = loads(dumps(reader["chr2"]))
+    assert first.reader is second.reader
+    assert first.reader is not reader
+    assert reader.reference().open() is first.reader
+
+
+##############################################################################
+def _is_parents_reader(pickled: bytes) -> bool:
+    """Unpickle a sequence, and see if it uses the parent's reader.
+
+    Args:
+        pickled: The pickled sequence.
+
+    Returns:
+        `True` if the sequence uses the reader recreated by the parent.
+    """
+    return loads(pickled).reader is _PARENT_READER
+
+
+##############################################################################
+@pytest.mark.skipif(
+    "fork" not in get_all_start_methods(), reason="Needs to be able to fork"
+)
+def test_forked_processes_get_their_own_reader(genome: Path) -> None:
+    """A forked process shouldn't use the readers recreated by its parent."""
+    global _PARENT_READER  # pylint: disable=global-statement
+    pickled = dumps(TwoBitFileReader(str(genome))["chr1"])
+    sequence = loads(pickled)
+    _PARENT_READER = sequence.reader
+    try:
+        assert loads(pickled).reader is _PARENT_READER
+        with get_context("fork").Pool(1) as pool:
+            assert pool.apply(_is_parents_reader, (pickled,)) is False
+    finally:
+        _PARENT_READER = None
+
+
+### test_pickle.py ends here
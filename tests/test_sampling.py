@@ -0,0 +1,48 @@
+"""Tests for sampling windows from a genome."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitFileReader, Window, WindowLoader, WindowSampler
+
+
+##############################################################################
+def test_windows_load_like_the_sequence(
+    genome: Path, sequences: dict[str, str]
+) -> None:
+    """The bases of a loaded window should be the bases of the sequence."""
+    reader = TwoBitFileReader(str(genome), masking=True)
+    sampler = WindowSampler(reader, 200, seed=42)
+    windows = sampler.samples(64)
+    batch = WindowLoader(reader, sampler, 64).load(windows)
+    for window, bases in zip(windows, batch):
+        assert bytes(bases).decode() == sequences[window.sequence][
+            window.start : window.end
+        ].replace("n", "N")
+
+
+##############################################################################
+def test_masked_n_runs_load_as_n(genome: Path, sequences: dict[str, str]) -> None:
+    """An N run that is also masked should still be loaded as N."""
+    reader = TwoBitFileReader(str(genome), masking=True)
+    bases = sequences["chr1"]
+    masked_n = bases.index("n")
+    windows = [
+        Window("chr1", start, start + 200)
+        for start in (masked_n - 150, masked_n - 30, masked_n + 500)
+    ]
+    batch = WindowLoader(reader, WindowSampler(reader, 200), 3).load(windows)
+    for window, loaded in zip(windows, batch):
+        assert bytes(loaded).decode() == (
+            bases[window.start : window.end].replace("n", "N")
+        )
+
+
+### test_sampling.py ends here
@@ -0,0 +1,47 @@
+"""Tests for grouping the sequences shown in the viewer."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# The viewer is an optional extra.
+pytest.importorskip("textual")
+
+##############################################################################
+# Local imports.
+from twobee.chui.widgets.sequences import (  # pylint: disable=wrong-import-position
+    sequence_group,
+)
+
+
+##############################################################################
+@pytest.mark.parametrize(
+    "name, group",
+    [
+        ("chr1", "Primary"),
+        ("chrX", "Primary"),
+        ("chrM", "Primary"),
+        ("Chr2L", "Primary"),
+        ("7", "Primary"),
+        ("Y", "Primary"),
+        ("MT", "Primary"),
+        ("chr1_KI270706v1_random", "Unlocalised"),
+        ("chrUn_KI270302v1", "Unplaced"),
+        ("chr6_GL000250v2_alt", "Alternate"),
+        ("chr1_KN196472v1_fix", "Patches"),
+        ("scaffold123", "Other"),
+        ("contig_42", "Other"),
+        ("NC_000001.11", "Other"),
+    ],
+)
+def test_sequence_groups(name: str, group: str) -> None:
+    """Sequences should be sorted into the right groups."""
+    assert sequence_group(name) == group
+
+
+### test_sequence_groups.py ends here
@@ -0,0 +1,113 @@
+"""Tests for the sequence server."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import asyncio
+import socket
+from contextlib import suppress
+from pathlib import Path
+from struct import pack
+from threading import Thread
+from time import sleep
+from typing import Iterator
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from twobee.server.client import SequenceClient, ServerError
+from twobee.server.server import SequenceServer
+
+from .helpers import write_twobit
+
+
+##############################################################################
+@pytest.fixture
+def corrupt(tmp_path: Path) -> Path:
+    """A genome where the reserved field of `chr2` isn't zero."""
+    genome = write_twobit(
+        tmp_path / "corrupt.2bit", {"chr1": "ACGTACGTAC", "chr2": "ACGT"}
+    )
+    # The header is 16 bytes and the index 2 * (1 + 4 + 4); chr1's record is
+    # 16 bytes of header then 3 bytes of bases, and the reserved field comes
+    # 12 bytes into chr2's record.
+    reserved = 16 + 18 + 19 + 12
+    data = bytearray(genome.read_bytes())
+    data[reserved : reserved + 4] = pack("<L", 7)
+    genome.write_bytes(bytes(data))
+    return genome
+
+
+##############################################################################
+@pytest.fixture
+def served(tmp_path: Path, genome: Path, corrupt: Path) -> Iterator[str]:
+    """Serve the test genome and the corrupt genome over a UNIX socket."""
+    path = str(tmp_path / "twobee.sock")
+    server = SequenceServer({"good": genome, "bad": corrupt})
+    loop = asyncio.new_event_loop()
+    serving = loop.create_task(server.serve_unix(path))
+
+    def serve() -> None:
+        asyncio.set_event_loop(loop)
+        with suppress(asyncio.CancelledError):
+            loop.run_until_complete(serving)
+        # Wind down any connections that are still being handled.
+        handling = asyncio.all_tasks(loop)
+        for task in handling:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*handling, return_exceptions=True))
+
+    thread = Thread(target=serve, daemon=True)
+    thread.start()
+    while not Path(path).exists():
+        sleep(0.01)
+    timeout = socket.getdefaulttimeout()
+    socket.setdefaulttimeout(10)
+    try:
+        yield path
+    finally:
+        socket.setdefaulttimeout(timeout)
+        loop.call_soon_threadsafe(serving.cancel)
+        thread.join()
+        loop.close()
+        server.close()
+
+
+##############################################################################
+def test_serves_regions(served: str, sequences: dict[str, str]) -> None:
+    """The server should serve the bases of regions."""
+    with SequenceClient(served) as client:
+        assert client.fetch("good", "chr1", 100, 200) == (
+            sequences["chr1"][100:200].upper()
+        )
+        assert client.fetch_many(
+            [("good", "chr2", 0, 50), ("good", "chr3", 1_000, 1_010)]
+        ) == [sequences["chr2"][:50].upper(), sequences["chr3"][1_000:1_010].upper()]
+
+
+##############################################################################
+def test_unexpected_error_fails_only_its_group(
+    served: str, sequences: dict[str, str]
+) -> None:
+    """A failure reading one group shouldn't leave the rest of the batch hanging."""
+    with SequenceClient(served) as client:
+        with pytest.raises(ServerError, match="chr2"):
+            client.fetch_many(
+                [
+                    ("bad", "chr1", 0, 10),
+                    ("bad", "chr2", 0, 4),
+                    ("good", "chr1", 0, 10),
+                ]
+            )
+        # Every reply was read, so the connection is still in step.
+        assert client.fetch("bad", "chr1", 0, 10) == "ACGTACGTAC"
+        assert client.fetch("good", "chr1", 0, 10) == sequences["chr1"][:10].upper()
+
+
+### test_server.py ends here
@@ -0,0 +1,61 @@
+"""Tests for sharing a 2bit file between processes."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import sys
+from pathlib import Path
+from subprocess import run
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitSharedGenome
+
+##############################################################################
+# A process that reads from a shared genome and never closes its reader.
+UNCLOSED_READER = """
+import sys
+from twobee import SharedGenomeHandle
+reader = SharedGenomeHandle(sys.argv[1], int(sys.argv[2]), sys.argv[3]).open()
+print(str(reader["chr1"][:20]))
+"""
+
+
+##############################################################################
+def test_shared_reads_match(genome: Path, sequences: dict[str, str]) -> None:
+    """Reading from a shared genome should give the same bases as the file."""
+    with TwoBitSharedGenome(genome) as shared:
+        reader = shared.open(masking=True)
+        for name in ("chr1", "scaffold7"):
+            assert str(reader[name][100:3_100]) == (
+                sequences[name][100:3_100].replace("n", "N")
+            )
+        reader.close()
+
+
+##############################################################################
+def test_unclosed_reader_exits_cleanly(genome: Path, sequences: dict[str, str]) -> None:
+    """A process that doesn't close its reader shouldn't complain on exit."""
+    with TwoBitSharedGenome(genome) as shared:
+        handle = shared.handle
+        result = run(
+            [
+                sys.executable,
+                "-c",
+                UNCLOSED_READER,
+                handle.name,
+                str(handle.size),
+                handle.source,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    assert result.stdout.strip() == sequences["chr1"][:20].upper()
+    assert result.stderr == ""
+
+
+### test_shared.py ends here
@@ -0,0 +1,151 @@
+"""Tests for writing subsets of 2bit files."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from pathlib import Path
+from random import Random
+from re import finditer
+
+##############################################################################
+# Pytest imports.
+import pytest
+
+##############################################################################
+# Local imports.
+from twobee import TwoBitFileReader
+from twobee.lib import subset
+from twobee.lib.subset import SubsetRegion, write_subset
+
+from .helpers import write_twobit
+
+
+##############################################################################
+def runs(pattern: str, bases: str) -> list[tuple[int, int]]:
+    """Find the runs of bases that match a pattern.
+
+    Args:
+        pattern: The pattern that matches a run of bases.
+        bases: The bases.
+
+    Returns:
+        The start (inclusive) and end (exclusive) of each run.
+    """
+    return [(run.start(), run.end()) for run in finditer(pattern, bases)]
+
+
+##############################################################################
+def check_subset(path: Path, expected: dict[str, str]) -> None:
+    """Check that a subset reads back as expected.
+
+    Args:
+        path: The path to the subset.
+        expected: The bases expected for each sequence, keyed by name.
+
+    Note:
+        The subset is expected to be little-endian, with its sequences in
+        the same order as `expected`.
+    """
+    # The subset should be exactly what writing the bases from scratch gives,
+    # right down to the unused bits at the end of each sequence.
+    assert path.read_bytes() == (
+        write_twobit(path.with_suffix(".expected"), expected).read_bytes()
+    )
+    reader = TwoBitFileReader(str(path), masking=True)
+    assert reader.sequences == tuple(expected)
+    for name, bases in expected.items():
+        sequence = reader[name]
+        assert len(sequence) == len(bases)
+        assert str(sequence[:]) == bases.replace("n", "N")
+        assert [(block.start, block.end) for block in sequence.n_blocks] == runs(
+            "[Nn]+", bases
+        )
+        assert [(block.start, block.end) for block in sequence.mask_blocks] == runs(
+            "[a-z]+", bases
+        )
+
+
+##############################################################################
+@pytest.fixture(params=["<", ">"], ids=["little-endian", "big-endian"])
+def source(
+    request: pytest.FixtureRequest, tmp_path: Path, sequences: dict[str, str]
+) -> Path:
+    """A 2bit file to take subsets from, in both byte orders."""
+    return write_twobit(tmp_path / "source.2bit", sequences, request.param)
+
+
+##############################################################################
+def test_whole_sequences(
+    source: Path, tmp_path: Path, sequences: dict[str, str]
+) -> None:
+    """Whole sequences should be copied as they are."""
+    names = ["scaffold3", "chr2", "scaffold0"]
+    path = write_subset(TwoBitFileReader(str(source)), tmp_path / "subset.2bit", names)
+    check_subset(path, {name: sequences[name] for name in names})
+
+
+##############################################################################
+def test_random_regions(
+    source: Path,
+    tmp_path: Path,
+    sequences: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Aligned and unaligned regions should be copied, across chunks."""
+    # Copy a few bytes at a time, so that most regions cross chunks.
+    monkeypatch.setattr(subset, "COPY_CHUNK", 3)
+    random = Random(45)
+    regions: list[SubsetRegion] = []
+    for number in range(200):
+        name = random.choice(["chr1", "chr3", "scaffold7"])
+        start = random.randrange(len(sequences[name]))
+        if number % 4 == 0:
+            start -= start % 4
+        end = min(start + random.randrange(0, 2_000), len(sequences[name]))
+        regions.append(SubsetRegion(name, start, end, f"region{number}"))
+    path = write_subset(
+        TwoBitFileReader(str(source)), tmp_path / "subset.2bit", regions
+    )
+    check_subset(
+        path,
+        {
+            str(region.name): sequences[region.sequence][region.start : region.end]
+            for region in regions
+        },
+    )
+
+
+##############################################################################
+def test_clipped_blocks(tmp_path: Path) -> None:
+    """N and mask blocks should be clipped to a region."""
+    bases = "ACGTnnnnACgtNNNNacgtACGTNNNNnnnnacgtACGT"
+    source = write_twobit(tmp_path / "source.2bit", {"s": bases})
+    regions = [(1, 39), (6, 14), (13, 30), (5, 5), (26, 27), (0, 40)]
+    path = write_subset(
+        TwoBitFileReader(str(source)),
+        tmp_path / "subset.2bit",
+        [SubsetRegion("s", start, end) for start, end in regions],
+    )
+    check_subset(
+        path,
+        {
+            ("s" if (start, end) == (0, 40) else f"s:{start}-{end}"): bases[start:end]
+            for start, end in regions
+        },
+    )
+
+
+##############################################################################
+def test_bad_regions(genome: Path, tmp_path: Path) -> None:
+    """Regions that aren't within their sequence should be rejected."""
+    reader = TwoBitFileReader(str(genome))
+    for region in (SubsetRegion("chr1", 10, 5), SubsetRegion("scaffold1", 0, 501)):
+        with pytest.raises(ValueError):
+            write_subset(reader, tmp_path / "subset.2bit", [region])
+    assert not list(tmp_path.iterdir())
+
+
+### test_subset.py ends here
@@ -1,5 +1,9 @@
 """twobe - A Python-based 2bit file reader library and viewer tool."""
 
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
 ######################################################################
 # Main information.
 __author__ = "Dave Pearson"
@@ -11,29 +15,143 @@ __version__ = "0.0.2"
 __licence__ = "GPLv3+"
 
 ##############################################################################
-# Import things for easier access.
-from .lib.bases import TwoBitBases
-from .lib.file_reader import TwoBitFileReader
-from .lib.reader import (
-    InvalidSignature,
-    InvalidVersion,
-    TwoBitError,
-    TwoBitReader,
-    UnknownSequence,
-)
-from .lib.sequence import TwoBitSequence
+# Python imports.
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Final
+
+##############################################################################
+# Import things for easier access. When type checking they're imported as
+# normal; otherwise each is only imported the first time it's asked for, so
+# that a process that only wants the reader doesn't pay for importing
+# everything else.
+if TYPE_CHECKING:
+    from .lib.annotate import IntervalAnnotation
+    from .lib.bases import TwoBitBases
+    from .lib.cache import BoundedCache, CacheStats
+    from .lib.catalog import CatalogStats, TwoBitCatalog, UnknownGenome
+    from .lib.decoded import TwoBitDecodedReader, TwoBitDecodedSequence
+    from .lib.file_reader import ReadaheadStats, TwoBitFileReader
+    from .lib.haplotype import HaplotypeBuilder, HaplotypeRegion, Variant
+    from .lib.http_reader import TwoBitHTTPReader
+    from .lib.packed import PackedBases
+    from .lib.reader import (
+        InvalidSignature,
+        InvalidVersion,
+        TwoBitError,
+        TwoBitReader,
+        TwoBitReaderReference,
+        UnknownSequence,
+    )
+    from .lib.sampling import Window, WindowBatch, WindowLoader, WindowSampler
+    from .lib.sequence import TwoBitSequence
+    from .lib.shared import SharedGenomeHandle, TwoBitSharedGenome, TwoBitSharedReader
+    from .lib.summary import SequenceSummary, SummaryBin, TwoBitSummary
+
+##############################################################################
+# Where to find each of the things that can be imported from the package.
+_LAZY: Final = {
+    "IntervalAnnotation": ".lib.annotate",
+    "TwoBitBases": ".lib.bases",
+    "CatalogStats": ".lib.catalog",
+    "TwoBitCatalog": ".lib.catalog",
+    "UnknownGenome": ".lib.catalog",
+    "BoundedCache": ".lib.cache",
+    "CacheStats": ".lib.cache",
+    "TwoBitDecodedReader": ".lib.decoded",
+    "TwoBitDecodedSequence": ".lib.decoded",
+    "ReadaheadStats": ".lib.file_reader",
+    "TwoBitFileReader": ".lib.file_reader",
+    "HaplotypeBuilder": ".lib.haplotype",
+    "HaplotypeRegion": ".lib.haplotype",
+    "Variant": ".lib.haplotype",
+    "TwoBitHTTPReader": ".lib.http_reader",
+    "PackedBases": ".lib.packed",
+    "InvalidSignature": ".lib.reader",
+    "InvalidVersion": ".lib.reader",
+    "TwoBitError": ".lib.reader",
+    "TwoBitReader": ".lib.reader",
+    "TwoBitReaderReference": ".lib.reader",
+    "UnknownSequence": ".lib.reader",
+    "Window": ".lib.sampling",
+    "WindowBatch": ".lib.sampling",
+    "WindowLoader": ".lib.sampling",
+    "WindowSampler": ".lib.sampling",
+    "TwoBitSequence": ".lib.sequence",
+    "SharedGenomeHandle": ".lib.shared",
+    "TwoBitSharedGenome": ".lib.shared",
+    "TwoBitSharedReader": ".lib.shared",
+    "SequenceSummary": ".lib.summary",
+    "SummaryBin": ".lib.summary",
+    "TwoBitSummary": ".lib.summary",
+}
+
+
+##############################################################################
+def __getattr__(name: str) -> Any:
+    """Import something from the package the first time it's asked for.
+
+    Args:
+        name: The name of the thing being asked for.
+
+    Returns:
+        The thing.
+
+    Raises:
+        AttributeError: If the package doesn't provide it.
+    """
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+##############################################################################
+def __dir__() -> list[str]:
+    """Get the names the package provides.
+
+    Returns:
+        The names.
+    """
+    return sorted({*globals(), *_LAZY})
+
 
 ##############################################################################
 # Define what importing * means.
 __all__ = [
     "TwoBitReader",
+    "TwoBitReaderReference",
     "TwoBitError",
     "InvalidSignature",
     "InvalidVersion",
     "UnknownSequence",
     "TwoBitFileReader",
+    "ReadaheadStats",
+    "TwoBitHTTPReader",
+    "TwoBitCatalog",
+    "CatalogStats",
+    "UnknownGenome",
+    "TwoBitSharedGenome",
+    "TwoBitSharedReader",
+    "SharedGenomeHandle",
+    "TwoBitDecodedReader",
+    "TwoBitDecodedSequence",
     "TwoBitSequence",
     "TwoBitBases",
+    "PackedBases",
+    "TwoBitSummary",
+    "SequenceSummary",
+    "SummaryBin",
+    "IntervalAnnotation",
+    "HaplotypeBuilder",
+    "HaplotypeRegion",
+    "Variant",
+    "WindowSampler",
+    "WindowLoader",
+    "WindowBatch",
+    "Window",
+    "BoundedCache",
+    "CacheStats",
 ]
 
 ### __init__.py ends here
@@ -5,7 +5,7 @@ If `python -m twobee` is used this is the code that is run.
 
 ##############################################################################
 # Local imports.
-from .chui.app import run
+from .cli import run
 
 ##############################################################################
 # Main entry point.
@@ -6,8 +6,7 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
-from argparse import ArgumentParser, ArgumentTypeError, Namespace
-from pathlib import Path
+from argparse import ArgumentParser, Namespace
 
 ##############################################################################
 # Textual imports.
@@ -17,6 +16,7 @@ from textual.app import App
 ##############################################################################
 # Local imports.
 from .. import __version__
+from ..cli.arguments import existing_file
 from .screens import Main
 
 
@@ -40,22 +40,6 @@ class TwoBeeApp(App[None]):
         self.push_screen(Main(self._args.file))
 
 
-##############################################################################
-def py_file(path: str) -> Path:
-    """Check that the file we're being asked to look at seems fine
-
-    Args:
-        path: The argument.
-
-    Returns:
-        The `Path` to the file if it looks okay.
-    """
-    candidate = Path(path)
-    if not candidate.exists():
-        raise ArgumentTypeError(f"{path} does not exist")
-    return candidate
-
-
 ##############################################################################
 def get_args() -> Namespace:
     """Parse and return the command line arguments.
@@ -81,7 +65,9 @@ def get_args() -> Namespace:
     )
 
     # The remainder is the file to view.
-    parser.add_argument("file", help="The 2bit file to view", type=py_file, default=".")
+    parser.add_argument(
+        "file", help="The 2bit file to view", type=existing_file, default="."
+    )
 
     # Finally, parse the command line.
     return parser.parse_args()
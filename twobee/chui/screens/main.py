@@ -1,21 +1,31 @@
 """The main screen for the TwoBee application."""
 
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
 ##############################################################################
 # Python imports.
+from array import array
 from pathlib import Path
+from typing import Final
 
 ##############################################################################
 # Textual imports.
+from textual import on, work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal, Vertical
 from textual.screen import Screen
-from textual.widgets import Footer, Header, Label, Tree
+from textual.widgets import Footer, Header, Input, Label
+from textual.worker import get_current_worker
 
 ##############################################################################
 # Local imports.
 from ... import TwoBitFileReader
-from ..widgets import Bases
+from ...lib.search import search
+from ...lib.summary import TwoBitSummary
+from ..widgets import Bases, Sequences
 
 
 ##############################################################################
@@ -23,12 +33,30 @@ class Main(Screen[None]):
     """The main screen for the TwoBee application."""
 
     DEFAULT_CSS = """
-    Tree {
+    #sequences {
         width: 25%;
         min-width: 25;
         border-right: vkey $panel-lighten-2;
     }
 
+    #sequences Input, #tools Input {
+        border: none;
+        height: 1;
+        padding: 0 1;
+    }
+
+    #tools {
+        height: 1;
+    }
+
+    #tools Input {
+        width: 1fr;
+    }
+
+    #sequences Sequences {
+        height: 1fr;
+    }
+
     #viewer {
         width: 1fr;
     }
@@ -55,46 +83,239 @@ class Main(Screen[None]):
     BINDINGS = [
         Binding("escape", "app.quit", "Exit"),
         Binding("ctrl+d", "app.toggle_dark", "Light/Dark"),
+        Binding("slash", "filter", "Filter"),
+        Binding("g", "goto", "Go to"),
+        Binding("f", "find", "Find"),
+        Binding("x", "stop_search", "Stop search"),
     ]
     """The bindings for the main screen."""
 
+    MAX_HITS: Final = 1_000_000
+    """The number of hits after which a search gives up."""
+
     def __init__(self, file: Path) -> None:
         """Initialise the main screen."""
         super().__init__()
         self._file = file
         self._reader = TwoBitFileReader(str(file), masking=False)
+        # Summaries are built in the background, so they get a reader of
+        # their own; the summary makes sure only one is built at a time.
+        self._summary = TwoBitSummary(TwoBitFileReader(str(file)), persist=True)
+        self._sequence: str | None = None
+        self._motif = ""
+        # Each search gets a new ID, so that hits that turn up from a
+        # search that has since been stopped can be ignored.
+        self._search_id = 0
 
     def compose(self) -> ComposeResult:
         """Compose the main screen of the application."""
         yield Header()
         with Horizontal():
-            yield Tree[str](str(self._file.stem))
+            with Vertical(id="sequences"):
+                yield Input(placeholder=f"Filter {self._file.stem}", id="filter")
+                yield Sequences()
             with Vertical(id="viewer"):
                 yield Label("[i]None[/]", id="info")
+                with Horizontal(id="tools"):
+                    yield Input(placeholder="Go to position", id="goto")
+                    yield Input(placeholder="Find motif", id="find")
                 yield Bases()
         yield Footer()
 
     def on_mount(self) -> None:
         """Populate the screen once the DOM is up and running."""
-        file_map = self.query_one(Tree)
-        for chromosome in self._reader:
-            file_map.root.add_leaf(chromosome, data=chromosome)
-        file_map.root.expand()
-        file_map.focus()
+        sequences = self.query_one(Sequences)
+        sequences.load(self._reader.sequences)
+        sequences.focus()
+        self._load_sizes()
+
+    @work(thread=True)
+    def _load_sizes(self) -> None:
+        """Load the sizes of the sequences in the background."""
+        # The scan moves around the file while sequences are being loaded
+        # from the screen's reader, so it gets a reader of its own.
+        reader = TwoBitFileReader(str(self._file))
+        try:
+            sizes = reader.sequence_sizes()
+        finally:
+            reader.close()
+        self.app.call_from_thread(self.query_one(Sequences).set_sizes, sizes)
+
+    def action_filter(self) -> None:
+        """Move focus to the sequence filter."""
+        self.query_one("#filter", Input).focus()
+
+    def action_goto(self) -> None:
+        """Move focus to the go-to input."""
+        self.query_one("#goto", Input).focus()
+
+    def action_find(self) -> None:
+        """Move focus to the motif search input."""
+        self.query_one("#find", Input).focus()
+
+    @on(Input.Changed, "#filter")
+    def filter_sequences(self, event: Input.Changed) -> None:
+        """Filter the sequences as the filter is typed into.
+
+        Args:
+            event: The change event.
+        """
+        self.query_one(Sequences).filter = event.value
+
+    @on(Input.Submitted, "#filter")
+    def filter_done(self) -> None:
+        """Move to the sequences when the filter is submitted."""
+        self.query_one(Sequences).focus()
+
+    @on(Input.Submitted, "#goto")
+    def goto_position(self, event: Input.Submitted) -> None:
+        """Go to the position typed into the go-to input.
+
+        Args:
+            event: The submit event.
+        """
+        if self._sequence is None:
+            self.notify("Select a sequence first", severity="error")
+            return
+        try:
+            position = int(event.value.replace(",", "").replace("_", ""))
+        except ValueError:
+            self.notify(f"'{event.value}' is not a position", severity="error")
+            return
+        bases = self.query_one(Bases)
+        bases.goto(position)
+        bases.focus()
+
+    @on(Input.Submitted, "#find")
+    def find_motif(self, event: Input.Submitted) -> None:
+        """Start a search for the motif typed into the search input.
+
+        Args:
+            event: The submit event.
+        """
+        self._stop_search()
+        bases = self.query_one(Bases)
+        if not event.value:
+            bases.clear_hits()
+            self._show_info()
+            return
+        if self._sequence is None:
+            self.notify("Select a sequence first", severity="error")
+            return
+        # Starting the search here checks the motif; the search itself is
+        # done in the background, with a reader of its own.
+        try:
+            search(self._reader[self._sequence], event.value)
+        except ValueError as error:
+            self.notify(str(error), severity="error")
+            return
+        self._motif = event.value.upper()
+        bases.clear_hits(len(self._motif))
+        bases.focus()
+        self._search(self._search_id, self._sequence, self._motif)
+
+    def _show_info(self, detail: str = "") -> None:
+        """Show information about what's being viewed.
+
+        Args:
+            detail: Any detail to show after the name of the sequence.
+        """
+        info = self._sequence or "[i]None[/]"
+        self.query_one("#info", Label).update(f"{info} · {detail}" if detail else info)
+
+    def _stop_search(self) -> None:
+        """Stop any search that's running."""
+        self._search_id += 1
+        self.workers.cancel_group(self, "search")
+
+    def action_stop_search(self) -> None:
+        """Stop any search that's running."""
+        if any(worker.group == "search" for worker in self.workers):
+            self._stop_search()
+            bases = self.query_one(Bases)
+            self._show_info(f"{self._motif}: {bases.hit_count:,} hits (stopped)")
 
-    def on_tree_node_selected(self, event: Tree.NodeSelected[str]) -> None:
-        """Response to a tree node being selected.
+    @work(thread=True, exclusive=True, group="search")
+    def _search(self, search_id: int, sequence: str, motif: str) -> None:
+        """Search a sequence for a motif, in the background.
+
+        Args:
+            search_id: The ID of the search.
+            sequence: The name of the sequence to search.
+            motif: The motif to search for.
+        """
+        worker = get_current_worker()
+        reader = TwoBitFileReader(str(self._file))
+        try:
+            target = reader[sequence]
+            found = 0
+            for reached, hits in search(target, motif):
+                if worker.is_cancelled:
+                    return
+                found += len(hits)
+                done = found >= self.MAX_HITS or reached >= target.dna_size
+                self.app.call_from_thread(
+                    self._found, search_id, hits, reached * 100 // target.dna_size, done
+                )
+                if done:
+                    return
+        finally:
+            reader.close()
+
+    def _found(
+        self, search_id: int, hits: array[int], progress: int, done: bool
+    ) -> None:
+        """Handle a chunk of hits turning up from the background search.
+
+        Args:
+            search_id: The ID of the search the hits are from.
+            hits: The hits.
+            progress: How far through the sequence the search is, as a percentage.
+            done: Is the search done?
+        """
+        if search_id != self._search_id:
+            return
+        bases = self.query_one(Bases)
+        bases.add_hits(hits)
+        if done:
+            stopped = " (stopped)" if progress < 100 else ""
+            self._show_info(f"{self._motif}: {bases.hit_count:,} hits{stopped}")
+        else:
+            self._show_info(f"{self._motif}: {bases.hit_count:,} hits ({progress}%)")
+
+    def on_bases_hit_shown(self, event: Bases.HitShown) -> None:
+        """Show which search hit is being viewed.
+
+        Args:
+            event: The event that says which hit is being shown.
+        """
+        self._show_info(f"{self._motif}: hit {event.hit + 1:,} of {event.count:,}")
+
+    def on_sequences_selected(self, event: Sequences.Selected) -> None:
+        """Response to a sequence being selected.
 
         Args:
             event: The selection event.
         """
-        # The root has no data, chromosome nodes have the name of the
-        # chromosome as their data, so test if we got a name...
-        if isinstance(event.node.data, str):
-            # ...and update the base viewer to view that.
-            self.query_one(Bases).show(self._reader[event.node.data])
-            self.query_one("#info", Label).update(event.node.data)
-            self.query_one(Bases).focus()
+        self._stop_search()
+        self._sequence = event.sequence
+        self.query_one(Bases).show(self._reader[event.sequence])
+        self._show_info()
+        self.query_one(Bases).focus()
+        self._summarise(event.sequence)
+
+    @work(thread=True, exclusive=True)
+    def _summarise(self, sequence: str) -> None:
+        """Get the summary of a sequence, for zooming out.
+
+        Args:
+            sequence: The name of the sequence to summarise.
+        """
+        summary = self._summary[sequence]
+        # If another sequence has been picked while this one was being
+        # summarised, the summary is no longer wanted.
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.query_one(Bases).summarise, summary)
 
 
 ### main.py ends here
@@ -1,7 +1,8 @@
 """Widgets specific to TwoBee."""
 
 from .bases import Bases
+from .sequences import Sequences
 
-__all__ = ["Bases"]
+__all__ = ["Bases", "Sequences"]
 
 ### __init__.py ends here
@@ -6,25 +6,33 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
+from array import array
+from bisect import bisect_left
 from math import ceil
+from typing import Iterable
 
 ##############################################################################
 # Rich imports.
+from rich.color import Color, blend_rgb
 from rich.segment import Segment
-from textual.geometry import Size
+from rich.style import Style
 
 ##############################################################################
 # Textual imports.
+from textual.binding import Binding
+from textual.geometry import Size
+from textual.message import Message
 from textual.scroll_view import ScrollView
 from textual.strip import Strip
 
 ##############################################################################
 # Local imports.
 from twobee.lib.sequence import TwoBitSequence
+from twobee.lib.summary import SequenceSummary, SummaryBin
 
 
 ##############################################################################
-class Bases(ScrollView, can_focus=True):
+class Bases(ScrollView, can_focus=True):  # pylint: disable=too-many-instance-attributes
     """A widget for browsing bases within a sequence (chromosome)."""
 
     COMPONENT_CLASSES = {
@@ -40,6 +48,10 @@ class Bases(ScrollView, can_focus=True):
         "bases--A",
         "bases--G",
         "bases--N",
+        "bases--summary-at",
+        "bases--summary-gc",
+        "bases--hit",
+        "bases--hit-current",
     }
 
     DEFAULT_CSS = """
@@ -99,11 +111,69 @@ class Bases(ScrollView, can_focus=True):
     Bases > .bases--n, Bases > .bases--N {
         color: $text-disabled;
     }
+
+    /* Summary bins; coloured from AT-rich to GC-rich. */
+
+    Bases > .bases--summary-at {
+        color: #8dd4e8;
+    }
+
+    Bases > .bases--summary-gc {
+        color: #ff0000;
+    }
+
+    App.-light-mode Bases > .bases--summary-at {
+        color: #4b5cc4;
+    }
+
+    App.-light-mode Bases > .bases--summary-gc {
+        color: #bb0000;
+    }
+
+    /* Search hits. */
+
+    Bases > .bases--hit {
+        background: $accent 40%;
+    }
+
+    Bases > .bases--hit-current {
+        background: $accent;
+    }
     """
 
+    BINDINGS = [
+        Binding("minus", "zoom(1)", "Zoom out"),
+        Binding("plus,equals_sign", "zoom(-1)", "Zoom in"),
+        Binding("n", "hit(1)", "Next hit"),
+        Binding("p", "hit(-1)", "Previous hit"),
+    ]
+    """The bindings for the widget."""
+
     NO_DATA = "."
     """The character to use to show there's no data at all."""
 
+    SUMMARY_SHADES = "█▓▒░"
+    """The characters used to show a summary bin, from unmasked to all masked."""
+
+    SUMMARY_N = "·"
+    """The character used to show a summary bin that is all N."""
+
+    class HitShown(Message):
+        """Message posted when a search hit is moved to."""
+
+        def __init__(self, hit: int, count: int) -> None:
+            """Initialise the message.
+
+            Args:
+                hit: The index of the hit that is being shown.
+                count: The number of hits there are.
+            """
+            super().__init__()
+            self.hit = hit
+            """The index of the hit that is being shown."""
+            self.count = count
+            """The number of hits there are."""
+
     def __init__(self) -> None:
         """Initialise the widget.
 
@@ -112,21 +182,41 @@ class Bases(ScrollView, can_focus=True):
         """
         super().__init__()
         self._sequence: TwoBitSequence | None = None
+        self._summary: SequenceSummary | None = None
+        self._zoom = 1
         self._label_size = 0
+        self._hits = array("Q")
+        self._hit_length = 0
+        self._current_hit: int | None = None
 
     @property
     def _width(self) -> int:
         """The width of the data."""
         return self.size.width - (self._label_size + self.scrollbar_size_vertical)
 
+    @property
+    def _cells(self) -> int:
+        """The number of cells needed to show the data at the current zoom."""
+        if self._sequence is None:
+            return 0
+        if self._summary is None or self._zoom == 1:
+            return self._sequence.dna_size
+        return self._summary.bin_count(self._zoom)
+
     @property
     def _height(self) -> int:
         """The height of the data in lines."""
-        return (
-            ceil(self._sequence.dna_size / self._width)
-            if self._sequence is not None
-            else 0
-        )
+        return ceil(self._cells / max(self._width, 1))
+
+    @property
+    def zoom(self) -> int:
+        """The number of bases shown in each cell."""
+        return self._zoom
+
+    @property
+    def zoom_levels(self) -> tuple[int, ...]:
+        """The zoom levels that are available."""
+        return (1, *(() if self._summary is None else self._summary.bin_sizes))
 
     def _refresh_required_height(self) -> None:
         """Refresh the virtual height required to show the data within the width."""
@@ -140,10 +230,96 @@ class Bases(ScrollView, can_focus=True):
             sequence: The sequence to show.
         """
         self._sequence = sequence
+        self._summary = None
+        self._zoom = 1
         self._label_size = len(f"{sequence.dna_size:>,} ")
+        self.clear_hits()
         self._refresh_required_height()
         self.scroll_to(0, 0, animate=False)
 
+    def goto(self, position: int) -> None:
+        """Scroll so that the line holding the given base is at the top.
+
+        Args:
+            position: The position of the base to go to.
+        """
+        if self._sequence is not None:
+            position = min(max(position, 0), max(self._sequence.dna_size - 1, 0))
+            self.scroll_to(
+                0, position // (max(self._width, 1) * self._zoom), animate=False
+            )
+
+    def clear_hits(self, length: int = 0) -> None:
+        """Clear the search hits.
+
+        Args:
+            length: The length of the hits that are going to be found next.
+        """
+        self._hits = array("Q")
+        self._hit_length = length
+        self._current_hit = None
+        self.refresh()
+
+    def add_hits(self, hits: Iterable[int]) -> None:
+        """Add to the search hits.
+
+        Args:
+            hits: The starts of the hits to add, in order, and after any
+                hits that have already been added.
+        """
+        self._hits.extend(hits)
+        self.refresh()
+
+    @property
+    def hit_count(self) -> int:
+        """The number of search hits."""
+        return len(self._hits)
+
+    def action_hit(self, direction: int) -> None:
+        """Move to the next or previous search hit.
+
+        Args:
+            direction: The direction to move; negative for back, positive for on.
+        """
+        if not self._hits:
+            self.app.bell()
+            return
+        if self._current_hit is None:
+            self._current_hit = 0 if direction > 0 else len(self._hits) - 1
+        else:
+            self._current_hit = (self._current_hit + direction) % len(self._hits)
+        self.goto(self._hits[self._current_hit])
+        self.refresh()
+        self.post_message(self.HitShown(self._current_hit, len(self._hits)))
+
+    def summarise(self, summary: SequenceSummary) -> None:
+        """Provide the summary of the sequence being shown.
+
+        Having a summary available makes it possible to zoom out.
+
+        Args:
+            summary: The summary of the sequence.
+        """
+        if self._sequence is not None and summary.name == self._sequence.name:
+            self._summary = summary
+
+    def action_zoom(self, direction: int) -> None:
+        """Zoom in or out of the view.
+
+        Args:
+            direction: The direction to zoom; negative for in, positive for out.
+        """
+        levels = self.zoom_levels
+        level = min(max(levels.index(self._zoom) + direction, 0), len(levels) - 1)
+        if levels[level] != self._zoom:
+            # Keep the base that's at the top of the view at the top of the
+            # view, as best we can, as we change the zoom.
+            top = self._width * self.scroll_offset.y * self._zoom
+            self._zoom = levels[level]
+            self._refresh_required_height()
+            self.scroll_to(0, top // (max(self._width, 1) * self._zoom), animate=False)
+            self.refresh()
+
     def on_resize(self) -> None:
         """Handle being resized."""
         self._refresh_required_height()
@@ -160,6 +336,64 @@ class Bases(ScrollView, can_focus=True):
             ]
         )
 
+    def _summary_segment(self, summary: SummaryBin) -> Segment:
+        """Get the segment to show for a summary bin.
+
+        Args:
+            summary: The summary bin to show.
+
+        Returns:
+            The segment for the bin.
+        """
+        if summary.n == summary.size:
+            return Segment(self.SUMMARY_N, self.get_component_rich_style("bases--N"))
+        at_rich = self.get_component_rich_style("bases--summary-at").color
+        gc_rich = self.get_component_rich_style("bases--summary-gc").color
+        if at_rich is None or gc_rich is None:
+            colour = None
+        else:
+            colour = Color.from_triplet(
+                blend_rgb(
+                    at_rich.get_truecolor(),
+                    gc_rich.get_truecolor(),
+                    summary.gc_fraction,
+                )
+            )
+        return Segment(
+            self.SUMMARY_SHADES[
+                min(
+                    int(summary.mask_fraction * len(self.SUMMARY_SHADES)),
+                    len(self.SUMMARY_SHADES) - 1,
+                )
+            ],
+            Style(color=colour, dim=summary.n_fraction >= 0.5),
+        )
+
+    def _hits_within(self, start: int, end: int) -> dict[int, Style]:
+        """Find the parts of a range of bases that are within search hits.
+
+        Args:
+            start: The start of the range (inclusive).
+            end: The end of the range (exclusive).
+
+        Returns:
+            The style for each base that is within a hit, keyed by its
+            offset from the start of the range.
+        """
+        styles: dict[int, Style] = {}
+        hit = bisect_left(self._hits, start - self._hit_length + 1)
+        while hit < len(self._hits) and self._hits[hit] < end:
+            style = self.get_component_rich_style(
+                "bases--hit-current" if hit == self._current_hit else "bases--hit"
+            )
+            for offset in range(
+                max(self._hits[hit], start) - start,
+                min(self._hits[hit] + self._hit_length, end) - start,
+            ):
+                styles[offset] = style
+            hit += 1
+        return styles
+
     def render_line(self, y: int) -> Strip:
         """Render a line in the display.
 
@@ -172,11 +406,31 @@ class Bases(ScrollView, can_focus=True):
 
         # Only try and show something if we're actually viewing a sequence.
         if self._sequence is not None:
-            # Calculate the starting base in the view.
+            # Calculate the starting cell in the view.
             start = self._width * (self.scroll_offset.y + y)
 
+            # If we're zoomed out, each cell is a bin from the summary.
+            if self._summary is not None and self._zoom > 1:
+                if start < self._cells:
+                    return Strip(
+                        [
+                            Segment(
+                                f"{start * self._zoom:>{self._label_size-1},} ",
+                                style=self.get_component_rich_style("bases--label"),
+                            ),
+                            *[
+                                self._summary_segment(summary)
+                                for summary in self._summary.bins(
+                                    self._zoom, start, self._width
+                                )
+                            ],
+                        ]
+                    )
+                return self._empty_line
+
             # If that places us within the bases in the current sequence...
             if start < self._sequence.dna_size:
+                hits = self._hits_within(start, start + self._width)
                 return Strip(
                     [
                         Segment(
@@ -186,9 +440,12 @@ class Bases(ScrollView, can_focus=True):
                         *[
                             Segment(
                                 base,
-                                style=self.get_component_rich_style(f"bases--{base}"),
+                                style=self.get_component_rich_style(f"bases--{base}")
+                                + hits.get(offset, Style.null()),
+                            )
+                            for offset, base in enumerate(
+                                self._sequence[start : start + self._width]
                             )
-                            for base in self._sequence[start : start + self._width]
                         ],
                     ]
                 )
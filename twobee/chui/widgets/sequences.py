@@ -0,0 +1,371 @@
+"""A widget for listing and picking the sequences within a 2bit file."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from re import IGNORECASE, fullmatch
+from typing import NamedTuple
+
+##############################################################################
+# Rich imports.
+from rich.segment import Segment
+from rich.style import Style
+
+##############################################################################
+# Textual imports.
+from textual.binding import Binding
+from textual.events import Click
+from textual.geometry import Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+##############################################################################
+# The groups that sequences get sorted into, in the order they're shown.
+GROUPS = ("Primary", "Unlocalised", "Unplaced", "Alternate", "Patches", "Other")
+
+##############################################################################
+# The names of primary sequences; chromosomes, with or without a "chr"
+# prefix. Anything else without a recognised suffix (such as the scaffolds
+# of a draft assembly, of which there can be a great many) is "Other".
+PRIMARY = r"chr[0-9a-z]+|[0-9]+[a-z]?|[xyzwm]|mt"
+
+
+##############################################################################
+def sequence_group(name: str) -> str:
+    """Work out which group a sequence belongs in.
+
+    Args:
+        name: The name of the sequence.
+
+    Returns:
+        The name of the group the sequence belongs in.
+    """
+    if name.lower().startswith("chrun"):
+        return "Unplaced"
+    if name.endswith("_random"):
+        return "Unlocalised"
+    if name.endswith("_alt"):
+        return "Alternate"
+    if name.endswith("_fix"):
+        return "Patches"
+    return "Primary" if fullmatch(PRIMARY, name, IGNORECASE) else "Other"
+
+
+##############################################################################
+class Row(NamedTuple):
+    """A row in the list of sequences."""
+
+    group: str
+    """The group the row belongs to."""
+    sequence: str | None = None
+    """The sequence on the row, or `None` if the row is the group heading."""
+
+
+##############################################################################
+# pylint: disable-next=too-many-instance-attributes
+class Sequences(ScrollView, can_focus=True):
+    """A virtual list of the sequences in a 2bit file.
+
+    Sequences are grouped by kind (primary chromosomes, unplaced contigs and
+    so on). Only the rows that are on screen are ever rendered, and the rows
+    of a group are only worked out once the group is expanded, so the list
+    copes with files that have huge numbers of sequences.
+    """
+
+    COMPONENT_CLASSES = {
+        "sequences--cursor",
+        "sequences--group",
+        "sequences--size",
+    }
+
+    DEFAULT_CSS = """
+    Sequences {
+        background: $panel;
+    }
+
+    Sequences > .sequences--cursor {
+        background: $accent;
+        color: $text;
+    }
+
+    Sequences > .sequences--group {
+        text-style: bold;
+    }
+
+    Sequences > .sequences--size {
+        color: $text-muted;
+    }
+    """
+
+    BINDINGS = [
+        Binding("up", "move(-1)", "Up", show=False),
+        Binding("down", "move(1)", "Down", show=False),
+        Binding("pageup", "page(-1)", "Page up", show=False),
+        Binding("pagedown", "page(1)", "Page down", show=False),
+        Binding("home", "jump(0)", "Top", show=False),
+        Binding("end", "jump(-1)", "Bottom", show=False),
+        Binding("enter", "select", "Select", show=False),
+        Binding("s", "sort", "Sort"),
+    ]
+    """The bindings for the widget."""
+
+    class Selected(Message):
+        """Message sent when a sequence is selected."""
+
+        def __init__(self, sequence: str) -> None:
+            """Initialise the message.
+
+            Args:
+                sequence: The name of the selected sequence.
+            """
+            super().__init__()
+            self.sequence = sequence
+            """The name of the selected sequence."""
+
+    def __init__(
+        self, id: str | None = None  # pylint: disable=redefined-builtin
+    ) -> None:
+        """Initialise the widget.
+
+        Args:
+            id: The ID of the widget in the DOM.
+        """
+        super().__init__(id=id)
+        self._groups: dict[str, list[str]] = {}
+        self._sizes: dict[str, int] = {}
+        self._expanded = {"Primary"}
+        self._filter = ""
+        self._by_length = False
+        self._orders: dict[tuple[str, bool], list[str]] = {}
+        self._counts: dict[str, int] = {}
+        self._rows: list[Row] = []
+        self._cursor = 0
+
+    def load(self, sequences: list[str] | tuple[str, ...]) -> None:
+        """Load up the names of the sequences to show.
+
+        Args:
+            sequences: The names of the sequences.
+        """
+        groups: dict[str, list[str]] = {group: [] for group in GROUPS}
+        for sequence in sequences:
+            groups[sequence_group(sequence)].append(sequence)
+        self._groups = {group: names for group, names in groups.items() if names}
+        self._orders = {}
+        # If there are no primary sequences, start out with everything open.
+        if "Primary" not in self._groups:
+            self._expanded = set(self._groups)
+        self._build_rows()
+
+    def set_sizes(self, sizes: dict[str, int]) -> None:
+        """Set the sizes of the sequences.
+
+        Args:
+            sizes: The sizes of the sequences, keyed by name.
+        """
+        self._sizes = sizes
+        self._orders = {key: order for key, order in self._orders.items() if not key[1]}
+        self._build_rows()
+
+    @property
+    def filter(self) -> str:
+        """The text that sequence names are being filtered on."""
+        return self._filter
+
+    @filter.setter
+    def filter(self, text: str) -> None:
+        self._filter = text.strip().lower()
+        self._build_rows()
+
+    def _ordered(self, group: str) -> list[str]:
+        """Get the sequences in a group, in the current sort order.
+
+        Args:
+            group: The group to get the sequences of.
+
+        Returns:
+            The sequences in the group.
+        """
+        key = (group, self._by_length)
+        if key not in self._orders:
+            self._orders[key] = (
+                sorted(self._groups[group], key=lambda name: -self._sizes.get(name, 0))
+                if self._by_length
+                else sorted(self._groups[group])
+            )
+        return self._orders[key]
+
+    def _members(self, group: str) -> list[str]:
+        """Get the sequences in a group that pass the filter, in order.
+
+        Args:
+            group: The group to get the members of.
+
+        Returns:
+            The sequences in the group.
+        """
+        members = self._ordered(group)
+        if self._filter:
+            return [name for name in members if self._filter in name.lower()]
+        return members
+
+    def _build_rows(self) -> None:
+        """Build the rows to show from the groups."""
+        current = self._rows[self._cursor] if self._rows else None
+        rows: list[Row] = []
+        self._counts = {}
+        for group in self._groups:
+            if self._filter or group in self._expanded:
+                members = self._members(group)
+                if not (members or group in self._expanded):
+                    continue
+                self._counts[group] = len(members)
+                rows.append(Row(group))
+                if group in self._expanded:
+                    rows.extend(Row(group, name) for name in members)
+            else:
+                self._counts[group] = len(self._groups[group])
+                rows.append(Row(group))
+        self._rows = rows
+        # Try and keep the cursor on the same row.
+        try:
+            self._cursor = rows.index(current) if current is not None else 0
+        except ValueError:
+            self._cursor = min(self._cursor, max(len(rows) - 1, 0))
+        self.virtual_size = Size(self.size.width, len(rows))
+        self._scroll_to_cursor()
+        self.refresh()
+
+    @property
+    def _page_size(self) -> int:
+        """The number of rows visible in the widget."""
+        return max(self.scrollable_content_region.height, 1)
+
+    def _scroll_to_cursor(self) -> None:
+        """Ensure the cursor is visible."""
+        top = self.scroll_offset.y
+        if self._cursor < top:
+            self.scroll_to(y=self._cursor, animate=False)
+        elif self._cursor >= top + self._page_size:
+            self.scroll_to(y=self._cursor - self._page_size + 1, animate=False)
+
+    def _move_to(self, row: int) -> None:
+        """Move the cursor to a given row.
+
+        Args:
+            row: The row to move to.
+        """
+        self._cursor = min(max(row, 0), max(len(self._rows) - 1, 0))
+        self._scroll_to_cursor()
+        self.refresh()
+
+    def action_move(self, rows: int) -> None:
+        """Move the cursor.
+
+        Args:
+            rows: The number of rows to move.
+        """
+        self._move_to(self._cursor + rows)
+
+    def action_page(self, pages: int) -> None:
+        """Move the cursor a page at a time.
+
+        Args:
+            pages: The number of pages to move.
+        """
+        self._move_to(self._cursor + pages * self._page_size)
+
+    def action_jump(self, row: int) -> None:
+        """Jump the cursor to the top or bottom of the list.
+
+        Args:
+            row: `0` for the top, `-1` for the bottom.
+        """
+        self._move_to(len(self._rows) - 1 if row < 0 else row)
+
+    def action_sort(self) -> None:
+        """Toggle between sorting by name and by length."""
+        self._by_length = not self._by_length
+        self._build_rows()
+
+    def action_select(self) -> None:
+        """Select the row under the cursor."""
+        if not self._rows:
+            return
+        row = self._rows[self._cursor]
+        if row.sequence is None:
+            self._expanded ^= {row.group}
+            self._build_rows()
+        else:
+            self.post_message(self.Selected(row.sequence))
+
+    def on_click(self, event: Click) -> None:
+        """Handle a click in the list.
+
+        Args:
+            event: The click event.
+        """
+        row = self.scroll_offset.y + event.y
+        if row < len(self._rows):
+            self._move_to(row)
+            self.action_select()
+
+    def on_focus(self) -> None:
+        """Handle gaining focus."""
+        self.refresh()
+
+    def on_blur(self) -> None:
+        """Handle losing focus."""
+        self.refresh()
+
+    def on_resize(self) -> None:
+        """Handle being resized."""
+        self.virtual_size = Size(self.size.width, len(self._rows))
+
+    def render_line(self, y: int) -> Strip:
+        """Render a line in the display.
+
+        Args:
+            y: The line to render.
+
+        Returns:
+            A `Strip` that is the line to render.
+        """
+        row_number = self.scroll_offset.y + y
+        width = self.scrollable_content_region.width
+        if row_number >= len(self._rows):
+            return Strip.blank(width, self.rich_style)
+        row = self._rows[row_number]
+        base_style = self.rich_style + (
+            self.get_component_rich_style("sequences--cursor")
+            if row_number == self._cursor and self.has_focus
+            else Style()
+        )
+        if row.sequence is None:
+            marker = "▼" if row.group in self._expanded else "▶"
+            label = f"{marker} {row.group}"
+            count = f"{self._counts.get(row.group, 0):,}"
+            style = base_style + self.get_component_rich_style("sequences--group")
+        else:
+            label = f"  {row.sequence}"
+            size = self._sizes.get(row.sequence)
+            count = "" if size is None else f"{size:,}"
+            style = base_style
+        label = label[: max(width - len(count) - 1, 0)]
+        return Strip(
+            [
+                Segment(label, style),
+                Segment(" " * max(width - len(label) - len(count), 0), base_style),
+                Segment(
+                    count,
+                    style + self.get_component_rich_style("sequences--size"),
+                ),
+            ]
+        ).crop(0, width)
+
+
+### sequences.py ends here
@@ -0,0 +1,11 @@
+"""Command line tools for working with 2bit files."""
+
+##############################################################################
+# Import things for easier access.
+from .main import run
+
+##############################################################################
+# Define what importing * means.
+__all__ = ["run"]
+
+### __init__.py ends here
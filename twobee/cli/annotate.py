@@ -0,0 +1,136 @@
+"""The annotate command; adds the N and mask content to the intervals in a BED file."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import sys
+from argparse import ArgumentParser, FileType, Namespace
+from collections import Counter
+from sys import stdout
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.annotate import IntervalAnnotation, annotate_regions
+from ..lib.file_reader import TwoBitFileReader
+from ..lib.reader import TwoBitError
+from .arguments import existing_file
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the annotate command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee annotate",
+        description="Add the N base count, N fraction, masked base count and "
+        "masked fraction to each interval in a BED file.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "file", help="The 2bit file to annotate against", type=existing_file
+    )
+    parser.add_argument(
+        "bed",
+        help="The BED file to annotate (default: standard input)",
+        type=FileType("r"),
+        nargs="?",
+        default=sys.stdin,
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def read_region(line: str, number: int) -> tuple[str, int, int]:
+    """Read the region from a line of a BED file.
+
+    Args:
+        line: The line of the BED file.
+        number: The number of the line within the BED file.
+
+    Returns:
+        The sequence, start (inclusive) and end (exclusive) of the region.
+
+    Raises:
+        ValueError: If the line doesn't hold a valid region.
+    """
+    try:
+        name, start, end, *_ = line.split("\t")
+        region = (name, int(start), int(end))
+    except ValueError:
+        raise ValueError(f"Line {number} of the BED file isn't an interval") from None
+    if region[1] < 0 or region[2] < region[1]:
+        raise ValueError(f"Line {number} of the BED file isn't a valid interval")
+    return region
+
+
+##############################################################################
+def write_annotated(
+    lines: list[str],
+    regions: list[tuple[str, int, int]],
+    annotations: dict[str, IntervalAnnotation],
+) -> None:
+    """Write the annotated BED lines, in the order they were read.
+
+    Args:
+        lines: The lines of the BED file that hold intervals.
+        regions: The region on each of those lines.
+        annotations: The annotations of the regions, keyed by sequence.
+    """
+    fractions = {
+        name: (annotation.n_fraction, annotation.masked_fraction)
+        for name, annotation in annotations.items()
+    }
+    seen: Counter[str] = Counter()
+    for line, (name, _, _) in zip(lines, regions):
+        index = seen[name]
+        seen[name] += 1
+        annotation = annotations[name]
+        n_fraction, masked_fraction = fractions[name]
+        stdout.write(
+            f"{line}\t{annotation.n_bases[index]}\t{n_fraction[index]:.6f}"
+            f"\t{annotation.masked_bases[index]}\t{masked_fraction[index]:.6f}\n"
+        )
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the annotate command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command; 1 if the BED file couldn't be annotated.
+    """
+    args = get_args(arguments)
+    lines: list[str] = []
+    regions: list[tuple[str, int, int]] = []
+    reader = TwoBitFileReader(str(args.file))
+    try:
+        with args.bed:
+            for number, line in enumerate(args.bed, start=1):
+                if not line.strip() or line.startswith(("#", "track", "browser")):
+                    continue
+                lines.append(line.rstrip("\r\n"))
+                regions.append(read_region(lines[-1], number))
+        annotations = annotate_regions(reader, regions)
+    except (TwoBitError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        reader.close()
+    write_annotated(lines, regions, annotations)
+    return 0
+
+
+### annotate.py ends here
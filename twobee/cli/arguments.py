@@ -0,0 +1,25 @@
+"""Helpers for parsing command line arguments."""
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentTypeError
+from pathlib import Path
+
+
+##############################################################################
+def existing_file(path: str) -> Path:
+    """Check that a file we're being asked to look at exists.
+
+    Args:
+        path: The argument.
+
+    Returns:
+        The `Path` to the file if it looks okay.
+    """
+    candidate = Path(path)
+    if not candidate.exists():
+        raise ArgumentTypeError(f"{path} does not exist")
+    return candidate
+
+
+### arguments.py ends here
@@ -0,0 +1,150 @@
+"""The decode-bench command; shows how decoding a large region scales with workers."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import os
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.file_reader import TwoBitFileReader
+from ..lib.parallel import SEGMENT_SIZE, decode_parallel
+from ..lib.sequence import TwoBitSequence
+from .arguments import existing_file
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the decode-bench command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee decode-bench",
+        description="Time decoding the whole of a sequence with different numbers of workers.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        help="Decode with a pool of processes, rather than threads",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="The numbers of workers to try (default: 1 and up, doubling, to the number of cores)",
+        type=int,
+        nargs="+",
+    )
+    parser.add_argument(
+        "-s",
+        "--segment-size",
+        help="The number of bases each worker decodes at a time (default: %(default)s)",
+        type=int,
+        default=SEGMENT_SIZE,
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        help="The number of times to time each decode (default: %(default)s)",
+        type=int,
+        default=3,
+    )
+    parser.add_argument(
+        "-m",
+        "--masking",
+        help="Take masking into account",
+        action="store_true",
+    )
+    parser.add_argument("file", help="The 2bit file to test with", type=existing_file)
+    parser.add_argument(
+        "sequence",
+        help="The sequence to decode (default: the longest in the file)",
+        nargs="?",
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def time_decode(
+    args: Namespace, sequence: TwoBitSequence, executor: Executor | None
+) -> float:
+    """Time decoding the whole of a sequence.
+
+    Args:
+        args: The command line arguments.
+        sequence: The sequence to decode.
+        executor: The pool of workers to decode with, or `None` to decode
+            on this thread.
+
+    Returns:
+        The best time, in seconds, of all the repeats.
+    """
+    timings = []
+    for _ in range(args.repeat):
+        started = perf_counter()
+        if executor is None:
+            sequence.bases(0, len(sequence))
+        else:
+            decode_parallel(
+                sequence,
+                0,
+                len(sequence),
+                executor,
+                masking=args.masking,
+                segment_size=args.segment_size,
+            )
+        timings.append(perf_counter() - started)
+    return min(timings)
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the decode-bench command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command.
+    """
+    args = get_args(arguments)
+    reader = TwoBitFileReader(str(args.file), masking=args.masking)
+    sizes = reader.sequence_sizes()
+    sequence = reader[args.sequence or max(sizes, key=lambda name: sizes[name])]
+    workers = args.workers or [
+        1 << power for power in range((os.cpu_count() or 1).bit_length())
+    ]
+    pool = ProcessPoolExecutor if args.processes else ThreadPoolExecutor
+    print(f"Decoding {sequence.name} ({len(sequence):,} bases) with {pool.__name__}")
+    print(f"{'workers':>8} {'seconds':>9} {'Mbases/s':>9} {'speedup':>8}")
+    serial = time_decode(args, sequence, None)
+    print(
+        f"{'serial':>8} {serial:>9.3f} {len(sequence) / serial / 1e6:>9.1f} {1:>8.2f}"
+    )
+    for count in workers:
+        with pool(max_workers=count) as executor:
+            # Get the workers started before any timing happens.
+            list(executor.map(abs, range(count)))
+            seconds = time_decode(args, sequence, executor)
+        print(
+            f"{count:>8} {seconds:>9.3f} {len(sequence) / seconds / 1e6:>9.1f}"
+            f" {serial / seconds:>8.2f}"
+        )
+    reader.close()
+    return 0
+
+
+### decode_bench.py ends here
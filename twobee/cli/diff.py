@@ -0,0 +1,132 @@
+"""The diff command; reports what has changed between two 2bit files."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import sys
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack, closing
+from sys import stdout
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.diff import Difference, diff
+from ..lib.file_reader import TwoBitFileReader
+from ..lib.reader import TwoBitError
+from .arguments import existing_file
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the diff command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee diff",
+        description="Report the differences between two 2bit files: added, removed "
+        "and resized sequences, substituted bases, and changed N and mask blocks.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-v",
+        "--vcf",
+        help="Report the differences as VCF-like records, rather than as BED",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="The number of processes to compare sequences with (default: compare "
+        "them one at a time, in this process)",
+        type=int,
+    )
+    parser.add_argument("first", help="The first 2bit file", type=existing_file)
+    parser.add_argument("second", help="The second 2bit file", type=existing_file)
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def as_bed(difference: Difference) -> str:
+    """Format a difference as a BED line.
+
+    Args:
+        difference: The difference.
+
+    Returns:
+        The sequence, start, end and kind of the difference, followed by the
+        bases in each file (`.` if there are none).
+    """
+    return (
+        f"{difference.sequence}\t{difference.start}\t{difference.end}"
+        f"\t{difference.kind}\t{difference.first or '.'}\t{difference.second or '.'}"
+    )
+
+
+##############################################################################
+def as_vcf(difference: Difference) -> str:
+    """Format a difference as a VCF-like record.
+
+    Args:
+        difference: The difference.
+
+    Returns:
+        A substitution as a record with the bases of each file as the
+        reference and alternate alleles; any other difference as a record
+        with a symbolic alternate allele, and its end in the `INFO` column.
+    """
+    if difference.kind == "substitution":
+        alleles = f"{difference.first}\t{difference.second}"
+    else:
+        alleles = f".\t<{difference.kind.upper()}>"
+    return (
+        f"{difference.sequence}\t{difference.start + 1}\t.\t{alleles}\t.\t."
+        f"\tEND={difference.end};TYPE={difference.kind}"
+    )
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the diff command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command; 0 if the files are the same, 1 if
+        they differ and 2 if they couldn't be compared.
+    """
+    args = get_args(arguments)
+    if args.vcf:
+        stdout.write("##fileformat=VCFv4.2\n")
+        stdout.write(f"##source=twobee diff v{__version__}\n")
+        stdout.write("#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n")
+    found = False
+    try:
+        with ExitStack() as stack:
+            first = stack.enter_context(closing(TwoBitFileReader(str(args.first))))
+            second = stack.enter_context(closing(TwoBitFileReader(str(args.second))))
+            executor: Executor | None = (
+                stack.enter_context(ProcessPoolExecutor(args.workers))
+                if args.workers
+                else None
+            )
+            for difference in diff(first, second, executor):
+                found = True
+                stdout.write(f"{(as_vcf if args.vcf else as_bed)(difference)}\n")
+    except TwoBitError as error:
+        print(error, file=sys.stderr)
+        return 2
+    return 1 if found else 0
+
+
+### diff.py ends here
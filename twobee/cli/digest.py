@@ -0,0 +1,84 @@
+"""The digest command; prints content digests of the sequences in a 2bit file."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentParser, Namespace
+from sys import stdout
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.digest import digest_file, seqcol_digest
+from .arguments import existing_file
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the digest command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee digest",
+        description="Show the length, MD5 and refget digest of the sequences in a 2bit file.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="The number of processes to digest with (default: one per CPU)",
+        type=int,
+    )
+    parser.add_argument(
+        "-n",
+        "--no-cache",
+        help="Don't use or save the digests saved alongside the file",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-c",
+        "--seqcol",
+        help="Only show the GA4GH sequence collection digest of the whole file",
+        action="store_true",
+    )
+    parser.add_argument("file", help="The 2bit file to digest", type=existing_file)
+    parser.add_argument("sequence", help="Only digest these sequences", nargs="*")
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the digest command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command.
+    """
+    args = get_args(arguments)
+    digests = digest_file(
+        args.file,
+        args.sequence or None,
+        workers=args.workers,
+        cache=not args.no_cache,
+    )
+    if args.seqcol:
+        stdout.write(f"{seqcol_digest(digests.values())}\n")
+    else:
+        stdout.writelines(
+            f"{digest.name}\t{digest.length}\t{digest.md5}\t{digest.refget}\n"
+            for digest in digests.values()
+        )
+    return 0
+
+
+### digest.py ends here
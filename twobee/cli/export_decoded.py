@@ -0,0 +1,72 @@
+"""The export-decoded command; exports a 2bit file, decoded, for memory mapping."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.decoded import DECODED_SUFFIX, export_decoded
+from ..lib.reader import TwoBitError
+from .arguments import existing_file
+from .running import run_with_reader
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the export-decoded command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee export-decoded",
+        description="Export the sequences of a 2bit file, decoded to one byte "
+        "per base, to a file that can be memory mapped with TwoBitDecodedReader.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-s",
+        "--sequence",
+        help="A sequence to export (can be given more than once; default: all of them)",
+        action="append",
+    )
+    parser.add_argument("file", help="The 2bit file to export", type=existing_file)
+    parser.add_argument(
+        "output",
+        help=f"The file to export to (default: the 2bit file with {DECODED_SUFFIX} added)",
+        type=Path,
+        nargs="?",
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the export-decoded command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command; 1 if the file couldn't be exported.
+    """
+    args = get_args(arguments)
+    return run_with_reader(
+        args.file,
+        lambda reader: print(export_decoded(reader, args.output, args.sequence)),
+        TwoBitError,
+        OSError,
+    )
+
+
+### export_decoded.py ends here
@@ -0,0 +1,109 @@
+"""The fsck command; checks the structure of 2bit files."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import sys
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from sys import stdout
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.fsck import Problem, fsck
+from .arguments import existing_file
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the fsck command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee fsck",
+        description="Check the structure of 2bit files, reading only their headers, "
+        "indexes and block tables.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        help="Don't report the problems, only set the exit code",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="The number of processes to check the sequences with (default: check "
+        "them one batch at a time, in this process)",
+        type=int,
+    )
+    parser.add_argument(
+        "file", help="The 2bit files to check", type=existing_file, nargs="+"
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def describe(problem: Problem) -> str:
+    """Describe a problem.
+
+    Args:
+        problem: The problem.
+
+    Returns:
+        The problem, prefixed with the sequence it's in and followed by the
+        offset it was found at, where they're known.
+    """
+    return (
+        ("" if problem.sequence is None else f"{problem.sequence}: ")
+        + problem.message
+        + ("" if problem.offset is None else f" (at offset {problem.offset})")
+    )
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the fsck command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command; 0 if every file is fine, 1 if any
+        has a problem, and 2 if any couldn't be read.
+    """
+    args = get_args(arguments)
+    result = 0
+    with ExitStack() as stack:
+        executor: Executor | None = (
+            stack.enter_context(ProcessPoolExecutor(args.workers))
+            if args.workers
+            else None
+        )
+        for path in args.file:
+            try:
+                problems = fsck(path, executor)
+            except OSError as error:
+                print(f"{path}: {error}", file=sys.stderr)
+                result = 2
+                continue
+            if problems:
+                result = max(result, 1)
+            if not args.quiet:
+                for problem in problems:
+                    stdout.write(f"{path}: {describe(problem)}\n")
+    return result
+
+
+### fsck.py ends here
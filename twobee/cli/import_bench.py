@@ -0,0 +1,141 @@
+"""The import-bench command; checks how long it takes to import the library."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import sys
+from argparse import ArgumentParser, Namespace
+from statistics import median
+from subprocess import run
+from typing import Final, NamedTuple
+
+##############################################################################
+# Local imports.
+from .. import __version__
+
+##############################################################################
+# The modules that are timed by default.
+MODULES: Final = ("twobee", "twobee.lib.file_reader", "twobee.lib.summary")
+
+##############################################################################
+# The packages that should never be imported along with the library.
+FORBIDDEN: Final = ("rich", "textual", "typing_extensions")
+
+
+##############################################################################
+class ImportTime(NamedTuple):
+    """The result of importing a module."""
+
+    seconds: float
+    """The time it took to import the module."""
+    modules: frozenset[str]
+    """All the modules that were imported along with it."""
+
+
+##############################################################################
+def time_import(module: str) -> ImportTime:
+    """Time the import of a module, in a fresh Python.
+
+    Args:
+        module: The name of the module to import.
+
+    Returns:
+        The time taken, and what was imported.
+    """
+    report = run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    seconds = 0.0
+    imported: set[str] = set()
+    # Each line of the report looks like:
+    #
+    # import time:  self [us] | cumulative | imported package
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.strip() == module and not name[1:].startswith(" "):
+            seconds = int(cumulative) / 1_000_000
+        imported.add(name.strip())
+    return ImportTime(seconds, frozenset(imported))
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the import-bench command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee import-bench",
+        description="Time importing the library, and check it doesn't pull in the viewer.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        help="The number of times to time each import (default: %(default)s)",
+        type=int,
+        default=10,
+    )
+    parser.add_argument(
+        "-b",
+        "--budget",
+        help="The most milliseconds a median import may take (default: %(default)s)",
+        type=float,
+        default=50.0,
+    )
+    parser.add_argument(
+        "module",
+        help=f"The modules to time (default: {', '.join(MODULES)})",
+        nargs="*",
+        default=MODULES,
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the import-bench command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command; 1 if any of the checks failed.
+    """
+    args = get_args(arguments)
+    failed = False
+    print(f"{'module':<30} {'median ms':>10} {'max ms':>10}  problems")
+    for module in args.module:
+        timings = [time_import(module) for _ in range(args.repeat)]
+        seconds = [timing.seconds for timing in timings]
+        problems = sorted(
+            {
+                f"imports {package}"
+                for timing in timings
+                for package in (name.partition(".")[0] for name in timing.modules)
+                if package in FORBIDDEN
+            }
+        )
+        if median(seconds) * 1000 > args.budget:
+            problems.insert(0, "over budget")
+        failed = failed or bool(problems)
+        print(
+            f"{module:<30} {median(seconds) * 1000:>10.2f} {max(seconds) * 1000:>10.2f}"
+            f"  {', '.join(problems)}"
+        )
+    return 1 if failed else 0
+
+
+### import_bench.py ends here
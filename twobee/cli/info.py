@@ -0,0 +1,78 @@
+"""The info command; prints details of the sequences in a 2bit file."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentParser, Namespace
+from sys import stdout
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.file_reader import TwoBitFileReader
+from .arguments import existing_file
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the info command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee info",
+        description="Show the sizes of the sequences in a 2bit file, in chrom.sizes format.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-d",
+        "--detail",
+        help="Also show the N block count, N base count and mask block count",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-g",
+        "--gaps",
+        help="Show the N blocks (gaps) as BED, rather than the sizes",
+        action="store_true",
+    )
+    parser.add_argument("file", help="The 2bit file to look at", type=existing_file)
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the info command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command.
+    """
+    args = get_args(arguments)
+    reader = TwoBitFileReader(str(args.file))
+    try:
+        if args.gaps:
+            for name, blocks in reader.scan_n_blocks():
+                stdout.write(
+                    "".join(f"{name}\t{block.start}\t{block.end}\n" for block in blocks)
+                )
+        else:
+            scan = reader.scan() if args.detail else reader.scan("size")
+            stdout.writelines(
+                "\t".join(str(value) for value in row) + "\n" for row in scan.rows()
+            )
+    finally:
+        reader.close()
+    return 0
+
+
+### info.py ends here
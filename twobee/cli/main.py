@@ -0,0 +1,61 @@
+"""The main entry point for the twobee command."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import sys
+from importlib import import_module
+from typing import Final
+
+##############################################################################
+# The commands that twobee knows about, and the modules that implement them.
+# The modules are only imported when the command is used, so that a command
+# doesn't pay for the imports of any other command (or of the viewer).
+COMMANDS: Final = {
+    "annotate": "twobee.cli.annotate",
+    "decode-bench": "twobee.cli.decode_bench",
+    "diff": "twobee.cli.diff",
+    "digest": "twobee.cli.digest",
+    "export-decoded": "twobee.cli.export_decoded",
+    "fsck": "twobee.cli.fsck",
+    "import-bench": "twobee.cli.import_bench",
+    "info": "twobee.cli.info",
+    "serve": "twobee.cli.serve",
+    "serve-bench": "twobee.cli.serve_bench",
+    "shared-bench": "twobee.cli.shared_bench",
+    "subset": "twobee.cli.subset",
+}
+
+
+##############################################################################
+def run() -> None:
+    """Run the twobee command.
+
+    If the first argument is the name of a command, that command is run;
+    otherwise the arguments are handed on to the viewer.
+
+    Note:
+        The viewer needs Textual, which is only installed with the `viewer`
+        extra.
+    """
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(import_module(COMMANDS[sys.argv[1]]).main(sys.argv[2:]))
+
+    # The viewer is an optional extra, so it might not be installed.
+    try:
+        # pylint: disable=import-outside-toplevel
+        from ..chui.app import run as view
+    except ImportError as error:
+        if (error.name or "").partition(".")[0] not in ("textual", "rich"):
+            raise
+        sys.exit(
+            "The viewer needs Textual; install it with: pip install twobee[viewer]"
+        )
+
+    view()
+
+
+### main.py ends here
@@ -0,0 +1,39 @@
+"""Helpers for running commands that work on a 2bit file."""
+
+##############################################################################
+# Python imports.
+import sys
+from pathlib import Path
+from typing import Callable
+
+##############################################################################
+# Local imports.
+from ..lib.file_reader import TwoBitFileReader
+
+
+##############################################################################
+def run_with_reader(
+    path: Path, work: Callable[[TwoBitFileReader], object], *errors: type[Exception]
+) -> int:
+    """Do some work with a reader for a 2bit file, reporting any errors.
+
+    Args:
+        path: The path to the 2bit file.
+        work: The work to do with the reader.
+        errors: The errors to report, rather than raise.
+
+    Returns:
+        The exit code for the command; 1 if one of the errors was raised.
+    """
+    reader = TwoBitFileReader(str(path))
+    try:
+        work(reader)
+    except errors as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        reader.close()
+    return 0
+
+
+### running.py ends here
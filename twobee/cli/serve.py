@@ -0,0 +1,110 @@
+"""The serve command; serves regions of 2bit files to local jobs."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import asyncio
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from pathlib import Path
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..server import SequenceServer
+from ..server.protocol import DEFAULT_PORT
+from .arguments import existing_file
+
+
+##############################################################################
+def genome_file(genome: str) -> tuple[str, Path]:
+    """Parse a genome argument.
+
+    Args:
+        genome: The argument, either `NAME=PATH` or just `PATH`.
+
+    Returns:
+        The name of the genome and the path to its 2bit file.
+
+    Note:
+        If no name is given, the name of the file (without its extension)
+        is used.
+    """
+    name, _, path = genome.rpartition("=")
+    file = existing_file(path)
+    if not (name := name or file.stem):
+        raise ArgumentTypeError(f"{genome} does not give a genome name")
+    return name, file
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the serve command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee serve",
+        description="Serve regions of 2bit files to local jobs.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-s", "--socket", help="Serve on this UNIX socket, rather than on TCP"
+    )
+    parser.add_argument(
+        "--host",
+        help="The host to serve TCP on (default: %(default)s)",
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        help="The port to serve TCP on (default: %(default)s)",
+        type=int,
+        default=DEFAULT_PORT,
+    )
+    parser.add_argument(
+        "-m", "--masking", help="Take masking into account", action="store_true"
+    )
+    parser.add_argument(
+        "genomes",
+        help="The 2bit files to serve, as NAME=PATH or just PATH",
+        type=genome_file,
+        nargs="+",
+        metavar="genome",
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the serve command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command.
+    """
+    args = get_args(arguments)
+    server = SequenceServer(dict(args.genomes), masking=args.masking)
+    try:
+        asyncio.run(
+            server.serve_tcp(args.host, args.port)
+            if args.socket is None
+            else server.serve_unix(args.socket)
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+### serve.py ends here
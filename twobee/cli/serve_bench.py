@@ -0,0 +1,114 @@
+"""The serve-bench command; load tests the sequence server."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import asyncio
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import sleep
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.file_reader import TwoBitFileReader
+from ..server import SequenceClient, SequenceServer
+from ..server.benchmark import benchmark, random_regions
+from .arguments import existing_file
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the serve-bench command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee serve-bench",
+        description="Load test the sequence server, reporting latency at increasing concurrency.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-s",
+        "--socket",
+        help="Test the server on this UNIX socket, rather than starting one",
+    )
+    parser.add_argument(
+        "-n",
+        "--requests",
+        help="The number of requests each client makes (default: %(default)s)",
+        type=int,
+        default=200,
+    )
+    parser.add_argument(
+        "-l",
+        "--length",
+        help="The length of each region requested (default: %(default)s)",
+        type=int,
+        default=1000,
+    )
+    parser.add_argument(
+        "-c",
+        "--max-concurrency",
+        help="The highest number of clients to test with (default: %(default)s)",
+        type=int,
+        default=32,
+    )
+    parser.add_argument("file", help="The 2bit file to test with", type=existing_file)
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the serve-bench command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command.
+    """
+    args = get_args(arguments)
+    genome = args.file.stem
+    reader = TwoBitFileReader(str(args.file))
+    regions = random_regions(
+        genome, reader.sequence_sizes(), args.requests, args.length
+    )
+    reader.close()
+
+    with TemporaryDirectory() as workspace:
+        # If we've not been pointed at a running server, start one up.
+        socket = args.socket or str(Path(workspace) / "twobee.sock")
+        if args.socket is None:
+            server = SequenceServer({genome: args.file})
+            Thread(
+                target=asyncio.run, args=(server.serve_unix(socket),), daemon=True
+            ).start()
+            while not Path(socket).exists():
+                sleep(0.01)
+
+        print(
+            f"{'clients':>8} {'requests':>9} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}"
+        )
+        concurrency = 1
+        while concurrency <= args.max_concurrency:
+            result = benchmark(lambda: SequenceClient(socket), regions, concurrency)
+            print(
+                f"{result.concurrency:>8} {result.requests:>9} "
+                f"{result.p50 * 1000:>9.2f} {result.p99 * 1000:>9.2f} "
+                f"{result.throughput:>9.0f}"
+            )
+            concurrency *= 2
+    return 0
+
+
+### serve_bench.py ends here
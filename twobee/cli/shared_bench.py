@@ -0,0 +1,176 @@
+"""The shared-bench command; compares the memory used by worker processes."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentParser, Namespace
+from multiprocessing import get_context
+from multiprocessing.queues import Queue
+from multiprocessing.synchronize import Barrier
+from random import Random
+from typing import Final
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.file_reader import TwoBitFileReader
+from ..lib.memory import ProcessMemory, process_memory
+from ..lib.reader import TwoBitReader
+from ..lib.shared import SharedGenomeHandle, TwoBitSharedGenome
+from .arguments import existing_file
+
+##############################################################################
+# The number of bytes in a mebibyte.
+MIB: Final = 1024 * 1024
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the shared-bench command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee shared-bench",
+        description="Compare worker memory when each opens a 2bit file with when they share it.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="The number of worker processes (default: %(default)s)",
+        type=int,
+        default=8,
+    )
+    parser.add_argument(
+        "-n",
+        "--reads",
+        help="The number of random regions each worker reads (default: %(default)s)",
+        type=int,
+        default=1000,
+    )
+    parser.add_argument(
+        "-l",
+        "--length",
+        help="The length of each region read (default: %(default)s)",
+        type=int,
+        default=1000,
+    )
+    parser.add_argument("file", help="The 2bit file to test with", type=existing_file)
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def work(
+    path: str,
+    handle: SharedGenomeHandle | None,
+    reads: int,
+    length: int,
+    seed: int,
+    loaded: Barrier,
+    results: Queue[ProcessMemory],
+) -> None:
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """Do the work of a worker process.
+
+    Args:
+        path: The path to the 2bit file.
+        handle: The handle of the shared genome, or `None` to open the file.
+        reads: The number of random regions to read.
+        length: The length of each region.
+        seed: The seed for picking the regions.
+        loaded: The barrier to wait at once everything is loaded.
+        results: Where to send the memory used by the worker.
+
+    Note:
+        Every sequence is loaded, and held on to, as a long-running worker
+        would end up doing. The memory is measured once all the workers
+        have loaded everything, so that shared memory is counted fairly.
+    """
+    baseline = process_memory()
+    reader: TwoBitReader = TwoBitFileReader(path) if handle is None else handle.open()
+    sequences = [reader[name] for name in reader]
+    rng = Random(seed)
+    for _ in range(reads):
+        sequence = rng.choice(sequences)
+        start = rng.randrange(max(len(sequence) - length, 0) + 1)
+        sequence.packed(start, start + length)
+    loaded.wait()
+    results.put(process_memory() - baseline)
+    loaded.wait()
+    reader.close()
+
+
+##############################################################################
+def measure(args: Namespace, handle: SharedGenomeHandle | None) -> ProcessMemory:
+    """Measure the memory used by a set of worker processes.
+
+    Args:
+        args: The command line arguments.
+        handle: The handle of the shared genome, or `None` to open the file.
+
+    Returns:
+        The mean of the memory used by each worker.
+    """
+    context = get_context("spawn")
+    loaded = context.Barrier(args.workers)
+    results: Queue[ProcessMemory] = context.Queue()
+    workers = [
+        context.Process(
+            target=work,
+            args=(
+                str(args.file),
+                handle,
+                args.reads,
+                args.length,
+                seed,
+                loaded,
+                results,
+            ),
+        )
+        for seed in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    used = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return ProcessMemory(
+        sum(memory.rss for memory in used) // len(used),
+        sum(memory.pss for memory in used) // len(used),
+        sum(memory.private for memory in used) // len(used),
+    )
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the shared-bench command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command.
+    """
+    args = get_args(arguments)
+    print(f"Memory used by each of {args.workers} workers, over an idle process (MiB)")
+    print(f"{'mode':>8} {'rss':>9} {'pss':>9} {'private':>9}")
+    with TwoBitSharedGenome(args.file) as genome:
+        for mode, handle in (("file", None), ("shared", genome.handle)):
+            used = measure(args, handle)
+            print(
+                f"{mode:>8} {used.rss / MIB:>9.2f} {used.pss / MIB:>9.2f} "
+                f"{used.private / MIB:>9.2f}"
+            )
+        print(f"The shared genome takes {genome.handle.size / MIB:.2f} MiB in all")
+    return 0
+
+
+### shared_bench.py ends here
@@ -0,0 +1,107 @@
+"""The subset command; writes sequences or regions of a 2bit file to a new one."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentParser, FileType, Namespace
+from pathlib import Path
+from typing import IO
+
+##############################################################################
+# Local imports.
+from .. import __version__
+from ..lib.reader import TwoBitError
+from ..lib.subset import SubsetRegion, write_subset
+from .arguments import existing_file
+from .running import run_with_reader
+
+
+##############################################################################
+def get_args(arguments: list[str]) -> Namespace:
+    """Parse the arguments for the subset command.
+
+    Args:
+        arguments: The arguments to parse.
+
+    Returns:
+        The result of parsing the arguments.
+    """
+    parser = ArgumentParser(
+        prog="twobee subset",
+        description="Write some of the sequences, or regions of them, of a 2bit "
+        "file to a new 2bit file, without decoding any bases.",
+        epilog=f"v{__version__}",
+    )
+    parser.add_argument(
+        "-s",
+        "--sequence",
+        help="A whole sequence to write (can be given more than once)",
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "-b",
+        "--bed",
+        help="A BED file of regions to write, each as a sequence of its own, named "
+        "after the BED name column if there is one",
+        type=FileType("r"),
+    )
+    parser.add_argument(
+        "file", help="The 2bit file to take the subset from", type=existing_file
+    )
+    parser.add_argument(
+        "output", help="The 2bit file to write the subset to", type=Path
+    )
+    return parser.parse_args(arguments)
+
+
+##############################################################################
+def read_bed(bed: IO[str]) -> list[SubsetRegion]:
+    """Read the regions from a BED file.
+
+    Args:
+        bed: The BED file.
+
+    Returns:
+        The regions.
+    """
+    regions: list[SubsetRegion] = []
+    with bed:
+        for line in bed:
+            if not line.strip() or line.startswith(("#", "track", "browser")):
+                continue
+            sequence, start, end, *rest = line.rstrip("\r\n").split("\t")
+            regions.append(
+                SubsetRegion(sequence, int(start), int(end), rest[0] if rest else None)
+            )
+    return regions
+
+
+##############################################################################
+def main(arguments: list[str]) -> int:
+    """Run the subset command.
+
+    Args:
+        arguments: The arguments for the command.
+
+    Returns:
+        The exit code for the command; 1 if the subset couldn't be written.
+    """
+    args = get_args(arguments)
+    return run_with_reader(
+        args.file,
+        lambda reader: write_subset(
+            reader,
+            args.output,
+            [*args.sequence, *(read_bed(args.bed) if args.bed else [])],
+        ),
+        TwoBitError,
+        ValueError,
+        OSError,
+    )
+
+
+### subset.py ends here
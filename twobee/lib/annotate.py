@@ -0,0 +1,223 @@
+"""Provides N and mask content for large sets of intervals, without decoding bases.
+
+Rather than looking for the blocks that overlap each interval in turn, the
+starts and ends of all the intervals on a sequence are swept through the
+sequence's (sorted) N and mask blocks together, giving the number of block
+bases before each of them; the number of block bases in an interval is
+then the difference between the counts at its end and its start. This
+takes time in proportion to the number of intervals plus the number of
+blocks, and copes with intervals that overlap each other.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .reader import TwoBitReader
+from .sequence_protocol import TwoBitSequenceInterface
+
+
+##############################################################################
+@dataclass(frozen=True)
+class IntervalAnnotation:
+    """The N and mask content of a set of intervals on a sequence.
+
+    Each field is a column, in the same order as the intervals were given.
+    """
+
+    sequence: str
+    """The name of the sequence the intervals are on."""
+    starts: array[int]
+    """The start of each interval (inclusive)."""
+    ends: array[int]
+    """The end of each interval (exclusive)."""
+    n_bases: array[int]
+    """The number of N bases in each interval."""
+    masked_bases: array[int]
+    """The number of masked bases in each interval."""
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield self.sequence
+        yield "intervals", len(self)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @staticmethod
+    def _fractions(
+        counts: array[int], starts: array[int], ends: array[int]
+    ) -> array[float]:
+        """Turn counts of bases into fractions of the interval lengths.
+
+        Args:
+            counts: The counts of bases.
+            starts: The starts of the intervals.
+            ends: The ends of the intervals.
+
+        Returns:
+            The fractions; an empty interval has a fraction of 0.
+        """
+        return array(
+            "d",
+            (
+                count / (end - start) if end > start else 0.0
+                for count, start, end in zip(counts, starts, ends)
+            ),
+        )
+
+    @property
+    def n_fraction(self) -> array[float]:
+        """The fraction of each interval that is N."""
+        return self._fractions(self.n_bases, self.starts, self.ends)
+
+    @property
+    def masked_fraction(self) -> array[float]:
+        """The fraction of each interval that is masked."""
+        return self._fractions(self.masked_bases, self.starts, self.ends)
+
+
+##############################################################################
+def bases_before(blocks: Sequence[TwoBitBlock], positions: Sequence[int]) -> array[int]:
+    """Count the block bases before each of a collection of positions.
+
+    Args:
+        blocks: The blocks, in order, and not overlapping each other.
+        positions: The positions to count up to (exclusive).
+
+    Returns:
+        The number of bases, within the blocks, before each position.
+
+    Note:
+        The positions are visited in order, with the blocks being swept
+        through at the same time. If the positions aren't in order they are
+        sorted first.
+    """
+    order: Iterable[int] = range(len(positions))
+    if any(
+        positions[index] > positions[index + 1] for index in range(len(positions) - 1)
+    ):
+        order = sorted(order, key=positions.__getitem__)
+    counts = array("Q", bytes(8 * len(positions)))
+    covered = 0
+    iterator = iter(blocks)
+    block = next(iterator, None)
+    for index in order:
+        position = positions[index]
+        while block is not None and block.end <= position:
+            covered += block.size
+            block = next(iterator, None)
+        counts[index] = covered + (
+            max(position - block.start, 0) if block is not None else 0
+        )
+    return counts
+
+
+##############################################################################
+def _bases_within(
+    blocks: Sequence[TwoBitBlock], starts: Sequence[int], ends: Sequence[int]
+) -> array[int]:
+    """Count the block bases within each of a set of intervals.
+
+    Args:
+        blocks: The blocks, in order, and not overlapping each other.
+        starts: The start of each interval (inclusive).
+        ends: The end of each interval (exclusive).
+
+    Returns:
+        The number of bases, within the blocks, in each interval.
+    """
+    before = bases_before(blocks, [*starts, *ends])
+    return array(
+        "Q",
+        (before[len(starts) + index] - before[index] for index in range(len(starts))),
+    )
+
+
+##############################################################################
+def annotate_intervals(
+    sequence: TwoBitSequenceInterface, starts: Sequence[int], ends: Sequence[int]
+) -> IntervalAnnotation:
+    """Find the N and mask content of a set of intervals on a sequence.
+
+    Args:
+        sequence: The sequence the intervals are on.
+        starts: The start of each interval (inclusive).
+        ends: The end of each interval (exclusive).
+
+    Returns:
+        The N and mask content of the intervals.
+
+    Raises:
+        ValueError: If the starts and ends don't pair up, or an interval
+            starts before the sequence does or ends before it starts.
+
+    Note:
+        The mask content is always worked out, whether or not the
+        sequence's reader is taking masking into account.
+    """
+    if len(starts) != len(ends):
+        raise ValueError("There must be an end for every start")
+    if any(start < 0 for start in starts):
+        raise ValueError("An interval can't start before the sequence does")
+    if any(end < start for start, end in zip(starts, ends)):
+        raise ValueError("An interval can't end before it starts")
+    n_bases, masked_bases = (
+        _bases_within(blocks, starts, ends)
+        for blocks in (sequence.n_blocks, sequence.mask_blocks)
+    )
+    return IntervalAnnotation(
+        sequence.name, array("Q", starts), array("Q", ends), n_bases, masked_bases
+    )
+
+
+##############################################################################
+def annotate_regions(
+    reader: TwoBitReader, regions: Iterable[tuple[str, int, int]]
+) -> dict[str, IntervalAnnotation]:
+    """Find the N and mask content of regions spread over many sequences.
+
+    Args:
+        reader: The reader for the 2bit file.
+        regions: The sequence, start (inclusive) and end (exclusive) of
+            each region, for example as read from a BED file.
+
+    Returns:
+        The N and mask content of the regions, keyed by sequence name; the
+        regions on each sequence are in the order they were given.
+
+    Raises:
+        UnknownSequence: If a region is on a sequence that isn't in the file.
+        ValueError: If a region starts before its sequence does, or ends
+            before it starts.
+    """
+    starts: dict[str, array[int]] = {}
+    ends: dict[str, array[int]] = {}
+    for name, start, end in regions:
+        if start < 0 or end < start:
+            raise ValueError(f"{name}:{start}-{end} isn't a valid region")
+        if name not in starts:
+            starts[name], ends[name] = array("Q"), array("Q")
+        starts[name].append(start)
+        ends[name].append(end)
+    return {
+        name: annotate_intervals(reader[name], sequence_starts, ends[name])
+        for name, sequence_starts in starts.items()
+    }
+
+
+### annotate.py ends here
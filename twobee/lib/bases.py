@@ -6,21 +6,20 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
-from typing import Iterator
+from typing import TYPE_CHECKING, Final, Iterator
 
 ##############################################################################
-# Rich imports.
-from rich.repr import Result
-from typing_extensions import Final
+# Imports only needed for type checking.
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from rich.repr import Result
 
 ##############################################################################
 # Local imports.
+from .decode import BASES, decode_region  # pylint: disable=unused-import
 from .sequence_protocol import TwoBitSequenceInterface
 
-##############################################################################
-# The bases, in the correct index ordering.
-BASES: Final = "TCAG"
-
 
 ##############################################################################
 class TwoBitBases:
@@ -29,13 +28,28 @@ class TwoBitBases:
     MAX_REPR_BASES: Final = 50
     """The maximum number of bases to emit from a repr."""
 
-    def __init__(self, sequence: TwoBitSequenceInterface, start: int, end: int) -> None:
+    PARALLEL_THRESHOLD: Final = 16 * 1024 * 1024
+    """The number of bases below which an executor isn't worth using."""
+
+    def __init__(
+        self,
+        sequence: TwoBitSequenceInterface,
+        start: int,
+        end: int,
+        executor: Executor | None = None,
+    ) -> None:
         """Initialise the bases object.
 
         Args:
             sequence: The sequence that the bases are to be pulled from.
             start: The starting base (inclusive).
             end: Tne ending base (exclusive).
+            executor: A pool of workers to decode a large range of bases with.
+
+        Note:
+            The executor is only used if there are at least
+            `PARALLEL_THRESHOLD` bases; see
+            `twobee.lib.parallel.decode_parallel`.
         """
         self._sequence = sequence
         self.start = min(start, sequence.dna_size)
@@ -44,8 +58,7 @@ class TwoBitBases:
         """The end location of the bases in the sequence (exclusive)."""
         self.intersecting_mask_blocks = sequence.mask_blocks_intersecting(start, end)
         """The mask blocks that intersect these bases."""
-        self.bases = self._load()
-        """The bases found between the start and end locations."""
+        self._bases = self._load(executor)
 
     def __rich_repr__(self) -> Result:
         """Make the object look nice in Rich."""
@@ -56,73 +69,48 @@ class TwoBitBases:
             else str(self)
         )
 
-    def _load(self) -> tuple[str, ...]:
+    def _load(self, executor: Executor | None) -> str:
         """Load a collection of bases from a 2bit file.
 
+        Args:
+            executor: A pool of workers to decode a large range of bases with.
+
         Returns:
             The requested bases.
         """
-
-        # Work out the byte range we'll be pulling out of the source.
-        start_byte = self._sequence.dna_file_location + (self.start // 4)
-        end_byte = self._sequence.dna_file_location + (self.end // 4)
-
-        # Now set the initial position; this is the base position we're
-        # working in, which moves through the bytes in the range 2 bits at a
-        # time.
-        position = (start_byte - self._sequence.dna_file_location) * 4
-
-        # Bring various values into locals, simply to reduce the number of
-        # attribute access calls in the loop below.
-        start = self.start
-        end = self.end
-        masking = self._sequence.reader.masking
-        n_blocks = self._sequence.n_blocks
-        mask_blocks = self.intersecting_mask_blocks
-
-        # Now that we've figured all of the above out, let's load up enough
-        # bytes to cover the range we're after.
-        buffer = self._sequence.reader.read((end_byte - start_byte) + 1, start_byte)
-
-        # Where we'll build up the sequence.
-        sequence = ""
-
-        for byte in buffer:
-            # For every bit-shift we'll be doing within the current byte...
-            for shift in (6, 4, 2, 0):
-                # If we're within the range we're interested in; don't
-                # forget that we might be starting part way into the first
-                # byte, and/or finishing part way through the end of the
-                # final byte.
-                if start <= position < end:
-                    # If this position is within an N block, we just go with
-                    # an N base.
-                    if any(position in block for block in n_blocks):
-                        sequence += "N"
-                    else:
-                        # We're not looking at an N, so we decode the base
-                        # instead.
-                        base = BASES[(byte >> shift) & 0b11]
-                        # Handle masking if necessary.
-                        if masking and any(position in block for block in mask_blocks):
-                            base = base.lower()
-                        sequence += base
-
-                # On to the next encoded base.
-                position += 1
-
-        # Having finished, let's turn the string of bases into a tuple of
-        # individual bases.
-        return tuple(sequence)
+        if self.end <= self.start:
+            return ""
+        if executor is not None and self.end - self.start >= self.PARALLEL_THRESHOLD:
+            # pylint: disable=import-outside-toplevel
+            from .parallel import decode_parallel
+
+            return decode_parallel(
+                self._sequence,
+                self.start,
+                self.end,
+                executor,
+                masking=self._sequence.reader.masking,
+            ).decode("ascii")
+        return decode_region(
+            self._sequence,
+            self.start,
+            self.end,
+            self.intersecting_mask_blocks if self._sequence.reader.masking else (),
+        ).decode("ascii")
+
+    @property
+    def bases(self) -> tuple[str, ...]:
+        """The bases found between the start and end locations."""
+        return tuple(self._bases)
 
     def __str__(self) -> str:
-        return "".join(self.bases)
+        return self._bases
 
     def __iter__(self) -> Iterator[str]:
-        return iter(self.bases)
+        return iter(self._bases)
 
     def __len__(self) -> int:
-        return len(self.bases)
+        return len(self._bases)
 
 
 ### bases.py ends here
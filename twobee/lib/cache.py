@@ -0,0 +1,168 @@
+"""Provides a bounded, per-owner, least-recently-used cache."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from threading import RLock
+from typing import TYPE_CHECKING, Any, Callable, Generic, Hashable, TypeVar
+from weakref import ref
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# The type of the values held in a cache.
+CachedT = TypeVar("CachedT")
+
+
+##############################################################################
+@dataclass
+class CacheStats:
+    """Statistics for a cache."""
+
+    hits: int = 0
+    """The number of lookups that were found in the cache."""
+    misses: int = 0
+    """The number of lookups that weren't found in the cache."""
+    evictions: int = 0
+    """The number of entries that have been evicted from the cache."""
+    entries: int = 0
+    """The number of entries currently in the cache."""
+    size: int = 0
+    """The approximate number of bytes currently held by the cache."""
+
+
+##############################################################################
+class BoundedCache(Generic[CachedT]):
+    """A least-recently-used cache with an entry budget and a byte budget.
+
+    Unlike `functools.lru_cache` on a method, a cache like this belongs to a
+    single object, only holds a weak reference to that object, and never
+    grows past its budgets.
+    """
+
+    def __init__(
+        self,
+        owner: object,
+        max_entries: int,
+        max_size: int,
+        sizer: Callable[[CachedT], int],
+    ) -> None:
+        """Initialise the cache.
+
+        Args:
+            owner: The object that owns the cache.
+            max_entries: The maximum number of entries to hold.
+            max_size: The maximum approximate number of bytes to hold.
+            sizer: A function that gives the approximate size of a value.
+        """
+        self._owner = ref(owner)
+        self._max_entries = max_entries
+        self._max_size = max_size
+        self._sizer = sizer
+        self._entries: OrderedDict[Hashable, tuple[CachedT, int]] = OrderedDict()
+        self._stats = CacheStats()
+        self._lock = RLock()
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield "owner", self._owner()
+        yield "max_entries", self._max_entries
+        yield "max_size", self._max_size
+        yield "stats", self._stats
+
+    @property
+    def max_entries(self) -> int:
+        """The maximum number of entries the cache will hold."""
+        return self._max_entries
+
+    @max_entries.setter
+    def max_entries(self, max_entries: int) -> None:
+        with self._lock:
+            self._max_entries = max_entries
+            self._evict()
+
+    @property
+    def max_size(self) -> int:
+        """The maximum approximate number of bytes the cache will hold."""
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int) -> None:
+        with self._lock:
+            self._max_size = max_size
+            self._evict()
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the statistics for the cache."""
+        with self._lock:
+            return replace(self._stats)
+
+    def _evict(self) -> None:
+        """Evict entries until the cache is within its budgets."""
+        while self._entries and (
+            len(self._entries) > self._max_entries or self._stats.size > self._max_size
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._stats.size -= size
+            self._stats.evictions += 1
+        self._stats.entries = len(self._entries)
+
+    def get(self, key: Hashable, factory: Callable[[], CachedT]) -> CachedT:
+        """Get a value from the cache, creating it if it isn't there.
+
+        Args:
+            key: The key for the value.
+            factory: A function that creates the value if it isn't cached.
+
+        Returns:
+            The value.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return self._entries[key][0]
+            self._stats.misses += 1
+            value = factory()
+            size = self._sizer(value)
+            # Anything that would blow the budget on its own isn't worth
+            # keeping.
+            if size <= self._max_size and self._max_entries > 0:
+                self._entries[key] = (value, size)
+                self._stats.size += size
+                self._evict()
+            return value
+
+    def values(self) -> list[CachedT]:
+        """Get the values currently held in the cache.
+
+        Returns:
+            The values, from least to most recently used.
+        """
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+
+    def cache_clear(self) -> None:
+        """Clear the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.size = 0
+            self._stats.entries = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._entries
+
+
+### cache.py ends here
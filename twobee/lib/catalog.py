@@ -0,0 +1,253 @@
+"""Provides a catalog of many 2bit files, with a bounded number of them open.
+
+A `TwoBitCatalog` maps genome (assembly) names to 2bit files. The header and
+index of each file are read the first time it's used, and are kept for as
+long as the catalog is; the files themselves are only held open in a pool
+of a fixed size, with the least recently used file being closed to make
+room for another. A file that has been closed is opened again, without
+reading its header or index again, when it's next needed.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from threading import Lock
+from types import TracebackType
+from typing import TYPE_CHECKING, Final, Mapping
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Local imports.
+from .file_reader import TwoBitFileReader
+from .reader import TwoBitError
+
+
+##############################################################################
+class UnknownGenome(TwoBitError):
+    """Exception thrown when a genome that isn't in a catalog is requested."""
+
+
+##############################################################################
+@dataclass
+class CatalogStats:
+    """Statistics for a catalog."""
+
+    fetches: int = 0
+    """The number of regions that have been fetched."""
+    loads: int = 0
+    """The number of files whose header and index have been read."""
+    evictions: int = 0
+    """The number of times a file was closed to make room for another."""
+
+
+##############################################################################
+@dataclass(eq=False)
+class _Genome:
+    """A genome in a catalog."""
+
+    path: str
+    """The path to the genome's 2bit file."""
+    lock: Lock = field(default_factory=Lock)
+    """The lock that must be held to use the genome's reader."""
+    reader: TwoBitFileReader | None = None
+    """The reader for the genome, once it has been loaded."""
+
+
+##############################################################################
+class TwoBitCatalog:
+    """A catalog of 2bit files, holding a bounded number of them open.
+
+    It's safe to fetch from a catalog from many threads at once. Fetches
+    from different genomes happen in parallel, while fetches from the same
+    genome take turns.
+    """
+
+    MAX_OPEN: Final = 64
+    """The default maximum number of files to hold open."""
+
+    def __init__(
+        self,
+        genomes: Mapping[str, str | Path],
+        masking: bool = False,
+        max_open: int | None = None,
+    ) -> None:
+        """Initialise the catalog.
+
+        Args:
+            genomes: The paths to the 2bit files, keyed by genome name.
+            masking: Should masking be taken into account?
+            max_open: The maximum number of files to hold open.
+
+        Note:
+            Nothing is read from the files until they're fetched from.
+        """
+        self._genomes = {name: _Genome(str(path)) for name, path in genomes.items()}
+        self._masking = masking
+        self._max_open = max(1, max_open or self.MAX_OPEN)
+        self._lock = Lock()
+        self._open: OrderedDict[str, _Genome] = OrderedDict()
+        self._stats = CatalogStats()
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield "genomes", len(self._genomes)
+        yield "open", len(self._open)
+        yield "max_open", self._max_open
+
+    @property
+    def genomes(self) -> tuple[str, ...]:
+        """The names of the genomes in the catalog."""
+        return tuple(self._genomes)
+
+    @property
+    def open_count(self) -> int:
+        """The number of files that are currently open."""
+        return len(self._open)
+
+    @property
+    def stats(self) -> CatalogStats:
+        """A snapshot of the statistics for the catalog."""
+        return replace(self._stats)
+
+    def _make_room(self, name: str, genome: _Genome) -> None:
+        """Mark a genome as being in use, closing others to make room for it.
+
+        Args:
+            name: The name of the genome.
+            genome: The genome.
+
+        Note:
+            The caller must hold the genome's lock. A file that's in use by
+            another thread is never closed, so while lots of threads are
+            fetching at once the number of open files can briefly go over
+            the limit, by at most the number of threads.
+        """
+        with self._lock:
+            self._open[name] = genome
+            self._open.move_to_end(name)
+            for victim_name, victim in list(self._open.items()):
+                if len(self._open) <= self._max_open:
+                    break
+                if victim is genome or not victim.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if victim.reader is not None:
+                        victim.reader.release()
+                    del self._open[victim_name]
+                    self._stats.evictions += 1
+                finally:
+                    victim.lock.release()
+
+    def _genome(self, name: str) -> _Genome:
+        """Get a genome from the catalog.
+
+        Args:
+            name: The name of the genome.
+
+        Returns:
+            The genome.
+
+        Raises:
+            UnknownGenome: If the genome isn't in the catalog.
+        """
+        try:
+            return self._genomes[name]
+        except KeyError:
+            raise UnknownGenome(f"'{name}' is not a genome in the catalog") from None
+
+    def reader(self, name: str) -> TwoBitFileReader:
+        """Get the reader for a genome.
+
+        Args:
+            name: The name of the genome.
+
+        Returns:
+            The reader for the genome.
+
+        Raises:
+            UnknownGenome: If the genome isn't in the catalog.
+
+        Note:
+            The reader isn't safe to use at the same time as the catalog is
+            fetching from the same genome.
+        """
+        genome = self._genome(name)
+        with genome.lock:
+            self._make_room(name, genome)
+            return self._load(genome)
+
+    def _load(self, genome: _Genome) -> TwoBitFileReader:
+        """Load a genome's reader, if it hasn't been already.
+
+        Args:
+            genome: The genome to load.
+
+        Returns:
+            The reader for the genome.
+
+        Note:
+            The caller must hold the genome's lock.
+        """
+        if genome.reader is None:
+            genome.reader = TwoBitFileReader(genome.path, masking=self._masking)
+            with self._lock:
+                self._stats.loads += 1
+        return genome.reader
+
+    def fetch(self, genome: str, sequence: str, start: int, end: int) -> str:
+        """Fetch a region of a sequence from a genome.
+
+        Args:
+            genome: The name of the genome.
+            sequence: The name of the sequence.
+            start: The start of the region (inclusive).
+            end: The end of the region (exclusive).
+
+        Returns:
+            The bases in the region.
+
+        Raises:
+            UnknownGenome: If the genome isn't in the catalog.
+            UnknownSequence: If the sequence isn't in the genome.
+        """
+        entry = self._genome(genome)
+        with entry.lock:
+            self._make_room(genome, entry)
+            bases = str(self._load(entry)[sequence][start:end])
+        with self._lock:
+            self._stats.fetches += 1
+        return bases
+
+    def close(self) -> None:
+        """Close all of the files in the catalog."""
+        with self._lock:
+            self._open.clear()
+        for genome in self._genomes.values():
+            with genome.lock:
+                if genome.reader is not None:
+                    genome.reader.close()
+                    genome.reader = None
+
+    def __enter__(self) -> TwoBitCatalog:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+### catalog.py ends here
@@ -0,0 +1,203 @@
+"""Fast decoding of packed 2bit DNA into bases."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from typing import Final, Iterator, Sequence
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .sequence_protocol import TwoBitSequenceInterface
+
+##############################################################################
+# The bases, in the correct index ordering.
+BASES: Final = "TCAG"
+
+##############################################################################
+# For each of the four bases packed into a byte (most significant bits
+# first), a translation table that turns a packed byte into that base.
+PLANES: Final = tuple(
+    bytes(ord(BASES[(byte >> shift) & 0b11]) for byte in range(256))
+    for shift in (6, 4, 2, 0)
+)
+
+##############################################################################
+# The default number of bases to decode in one go when streaming.
+STREAM_CHUNK: Final = 4 * 1024 * 1024
+
+
+##############################################################################
+def decode(packed: bytes, offset: int, start: int, end: int) -> bytearray:
+    """Decode a range of packed DNA.
+
+    Args:
+        packed: The packed DNA.
+        offset: The location of the first base in `packed`.
+        start: The start of the range to decode (inclusive).
+        end: The end of the range to decode (exclusive).
+
+    Returns:
+        The upper case bases, as ASCII.
+
+    Note:
+        `offset` must fall on a byte boundary. N and mask blocks are not
+        taken into account; see `overlay_n_blocks` and `overlay_mask_blocks`.
+
+        Rather than decoding a byte at a time, each of the four bases in
+        every byte is pulled out with a translation table and the results
+        are interleaved with slice assignment, so all of the work happens
+        in C.
+    """
+    first = (start - offset) // 4
+    data = packed[first : (end - offset + 3) // 4]
+    bases = bytearray(4 * len(data))
+    for plane, table in enumerate(PLANES):
+        bases[plane::4] = data.translate(table)
+    skip = (start - offset) % 4
+    del bases[skip + (end - start) :]
+    del bases[:skip]
+    return bases
+
+
+##############################################################################
+def blocks_overlapping(
+    blocks: Sequence[TwoBitBlock], start: int, end: int
+) -> Iterator[TwoBitBlock]:
+    """Find the blocks that overlap a range.
+
+    Args:
+        blocks: The blocks to look in, in order.
+        start: The start of the range (inclusive).
+        end: The end of the range (exclusive).
+
+    Yields:
+        The blocks that overlap the range.
+
+    Note:
+        The blocks in a 2bit file are in order and don't overlap, so the
+        first of the blocks can be found with a binary search.
+    """
+    low, high = 0, len(blocks)
+    while low < high:
+        middle = (low + high) // 2
+        if blocks[middle].end <= start:
+            low = middle + 1
+        else:
+            high = middle
+    while low < len(blocks) and blocks[low].start < end:
+        yield blocks[low]
+        low += 1
+
+
+##############################################################################
+def overlay_n_blocks(
+    bases: bytearray, start: int, blocks: Sequence[TwoBitBlock]
+) -> None:
+    """Overlay N blocks on some decoded bases.
+
+    Args:
+        bases: The decoded bases.
+        start: The location of the first of the bases.
+        blocks: The N blocks of the sequence.
+    """
+    end = start + len(bases)
+    for block in blocks_overlapping(blocks, start, end):
+        first, last = max(block.start, start) - start, min(block.end, end) - start
+        bases[first:last] = b"N" * (last - first)
+
+
+##############################################################################
+def overlay_mask_blocks(
+    bases: bytearray, start: int, blocks: Sequence[TwoBitBlock]
+) -> None:
+    """Overlay mask blocks on some decoded bases.
+
+    Args:
+        bases: The decoded bases.
+        start: The location of the first of the bases.
+        blocks: The mask blocks of the sequence.
+    """
+    end = start + len(bases)
+    for block in blocks_overlapping(blocks, start, end):
+        first, last = max(block.start, start) - start, min(block.end, end) - start
+        bases[first:last] = bases[first:last].lower()
+
+
+##############################################################################
+def decode_region(
+    sequence: TwoBitSequenceInterface,
+    start: int,
+    end: int,
+    mask_blocks: Sequence[TwoBitBlock] = (),
+) -> bytearray:
+    """Read and decode a region of a sequence.
+
+    Args:
+        sequence: The sequence to decode.
+        start: The start of the region (inclusive).
+        end: The end of the region (exclusive).
+        mask_blocks: The mask blocks to apply, if masking is wanted.
+
+    Returns:
+        The decoded bases, as ASCII.
+
+    Note:
+        The region is read with a single read from an absolute position,
+        so regions of the same sequence can be decoded from different
+        threads at the same time. Ns take priority over masking, so a
+        masked N is still an upper case N.
+    """
+    first = start - (start % 4)
+    packed = sequence.reader.read(
+        (end - first + 3) // 4, sequence.dna_file_location + first // 4
+    )
+    bases = decode(packed, first, start, end)
+    if mask_blocks:
+        overlay_mask_blocks(bases, start, mask_blocks)
+    overlay_n_blocks(bases, start, sequence.n_blocks)
+    return bases
+
+
+##############################################################################
+def stream_bases(
+    sequence: TwoBitSequenceInterface,
+    start: int = 0,
+    end: int | None = None,
+    chunk_size: int = STREAM_CHUNK,
+    masking: bool = False,
+) -> Iterator[bytearray]:
+    """Stream the decoded bases of a sequence, a chunk at a time.
+
+    Args:
+        sequence: The sequence to stream.
+        start: The start of the range to stream (inclusive).
+        end: The end of the range to stream (exclusive); the end of the
+            sequence if `None`.
+        chunk_size: The number of bases in each chunk.
+        masking: Should the masked bases be in lower case?
+
+    Yields:
+        The decoded bases, as ASCII, a chunk at a time.
+    """
+    end = sequence.dna_size if end is None else min(end, sequence.dna_size)
+    chunk_size = max(chunk_size - (chunk_size % 4), 4)
+    position = start - (start % 4)
+    while start < end:
+        chunk_end = min(position + chunk_size, end)
+        packed = sequence.reader.read(
+            (chunk_end - position + 3) // 4,
+            sequence.dna_file_location + position // 4,
+        )
+        bases = decode(packed, position, start, chunk_end)
+        if masking:
+            overlay_mask_blocks(bases, start, sequence.mask_blocks)
+        overlay_n_blocks(bases, start, sequence.n_blocks)
+        yield bases
+        start = position = chunk_end
+
+
+### decode.py ends here
@@ -0,0 +1,500 @@
+"""Provides a memory-mappable, already decoded, copy of a 2bit file.
+
+For jobs that read the same genome over and over (training a model, for
+example), a 2bit file can be exported, once, to a file that holds one byte
+per base: a code that says which base it is (see `CODES`). The export is
+then memory mapped by a `TwoBitDecodedReader`, which hands out regions of
+a sequence as views of the map, without any reading, unpacking or copying.
+
+The layout of an export is a small header followed by, for each sequence,
+its codes and then its N and mask blocks (as arrays of starts and sizes),
+each of which starts on a 64 byte boundary:
+
+    magic (4 bytes) | version (uint32) | header size (uint32) | JSON header
+    codes | N starts | N sizes | mask starts | mask sizes
+    ...
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import os
+from array import array
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from struct import calcsize, pack, unpack_from
+from sys import byteorder
+from types import TracebackType
+from typing import IO, TYPE_CHECKING, Any, Final, Iterable, Iterator, Sequence
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .decode import overlay_mask_blocks, overlay_n_blocks, stream_bases
+from .identity import file_identity
+from .location import location_range
+from .reader import (
+    InvalidSignature,
+    InvalidVersion,
+    TwoBitError,
+    TwoBitReader,
+    UnknownSequence,
+)
+from .sequence import TwoBitSequence
+
+##############################################################################
+# The bases, in the order of their codes.
+CODES: Final = "ACGTN"
+
+##############################################################################
+# Translation tables between ASCII bases and codes; anything that isn't a
+# base is taken to be an N.
+_TO_CODES: Final = bytes(
+    CODES.index(chr(byte).upper()) if chr(byte).upper() in CODES else CODES.index("N")
+    for byte in range(256)
+)
+_FROM_CODES: Final = bytes(
+    ord(CODES[byte]) if byte < len(CODES) else ord("N") for byte in range(256)
+)
+
+##############################################################################
+# The signature, version and layout of an export.
+_MAGIC: Final = b"2BDC"
+_VERSION: Final = 1
+_PREAMBLE: Final = "<4sII"
+_ALIGNMENT: Final = 64
+
+##############################################################################
+# The suffix given to an export made next to its 2bit file.
+DECODED_SUFFIX: Final = ".twobee-decoded"
+
+
+##############################################################################
+def _aligned(position: int) -> int:
+    """Round a position up to the next alignment boundary.
+
+    Args:
+        position: The position to round up.
+
+    Returns:
+        The aligned position.
+    """
+    return -(-position // _ALIGNMENT) * _ALIGNMENT
+
+
+##############################################################################
+def _pad(output: IO[bytes], position: int) -> int:
+    """Pad an output up to the next alignment boundary.
+
+    Args:
+        output: The output to pad.
+        position: The current position in the output.
+
+    Returns:
+        The position after the padding.
+    """
+    output.write(bytes(_aligned(position) - position))
+    return _aligned(position)
+
+
+##############################################################################
+def _layout(sequences: Iterable[TwoBitSequence]) -> list[list[Any]]:
+    """Work out where everything goes in an export.
+
+    Args:
+        sequences: The sequences to export.
+
+    Returns:
+        The name, size, location of the codes, N block count, location of
+        the N blocks, mask block count and location of the mask blocks of
+        each sequence; the locations are relative to the end of the header.
+    """
+    layout: list[list[Any]] = []
+    position = 0
+    for sequence in sequences:
+        codes = position
+        n_blocks = _aligned(codes + sequence.dna_size)
+        mask_blocks = _aligned(n_blocks + 8 * len(sequence.n_blocks))
+        position = _aligned(mask_blocks + 8 * len(sequence.mask_blocks))
+        layout.append(
+            [
+                sequence.name,
+                sequence.dna_size,
+                codes,
+                len(sequence.n_blocks),
+                n_blocks,
+                len(sequence.mask_blocks),
+                mask_blocks,
+            ]
+        )
+    return layout
+
+
+##############################################################################
+def export_decoded(
+    reader: TwoBitReader,
+    path: str | Path | None = None,
+    names: Iterable[str] | None = None,
+) -> Path:
+    """Export the sequences of a 2bit file, decoded, to a memory-mappable file.
+
+    Args:
+        reader: The reader for the 2bit file.
+        path: The path to export to; next to the 2bit file if `None`.
+        names: The names of the sequences to export; all of them if `None`.
+
+    Returns:
+        The path that was exported to.
+
+    Raises:
+        UnknownSequence: If asked to export a sequence that isn't in the file.
+
+    Note:
+        Each sequence is decoded a chunk at a time, so the export never
+        holds more than a chunk of bases in memory. The export is written
+        next to where it's going, and only moved into place once it's
+        complete.
+    """
+    target = Path(path or f"{reader.uri}{DECODED_SUFFIX}")
+    sequences = [
+        reader[name] for name in (reader.sequences if names is None else names)
+    ]
+    header = dumps(
+        {
+            "source": reader.uri,
+            "identity": None if reader.identity is None else list(reader.identity),
+            "byteorder": byteorder,
+            "sequences": _layout(sequences),
+        }
+    ).encode()
+    partial = target.with_name(f".{target.name}.{os.getpid()}.partial")
+    try:
+        with partial.open("wb") as output:
+            output.write(pack(_PREAMBLE, _MAGIC, _VERSION, len(header)))
+            output.write(header)
+            _pad(output, calcsize(_PREAMBLE) + len(header))
+            position = 0
+            for sequence in sequences:
+                for bases in stream_bases(sequence):
+                    output.write(bases.translate(_TO_CODES))
+                position = _pad(output, position + sequence.dna_size)
+                for blocks in (sequence.n_blocks, sequence.mask_blocks):
+                    array("I", (block.start for block in blocks)).tofile(output)
+                    array("I", (block.size for block in blocks)).tofile(output)
+                    position = _pad(output, position + 8 * len(blocks))
+        partial.replace(target)
+    finally:
+        partial.unlink(missing_ok=True)
+    return target
+
+
+##############################################################################
+class TwoBitDecodedSequence:
+    """A sequence in an export made by `export_decoded`.
+
+    Regions of the sequence can be had as codes, straight from the memory
+    map, or as bases, in the same way as with a `TwoBitSequence`.
+    """
+
+    def __init__(
+        self,
+        reader: TwoBitDecodedReader,
+        name: str,
+        dna_size: int,
+        codes: memoryview,
+        n_blocks: Sequence[TwoBitBlock],
+        mask_blocks: Sequence[TwoBitBlock],
+    ) -> None:
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        """Initialise the sequence.
+
+        Args:
+            reader: The reader that the sequence belongs to.
+            name: The name of the sequence.
+            dna_size: The number of bases in the sequence.
+            codes: The codes of the bases, as a view of the memory map.
+            n_blocks: The N blocks of the sequence.
+            mask_blocks: The mask blocks of the sequence.
+        """
+        self.reader = reader
+        """The reader that the sequence belongs to."""
+        self._name = name
+        self._dna_size = dna_size
+        self._codes = codes
+        self.n_blocks = n_blocks
+        """The N blocks of the sequence."""
+        self.mask_blocks = mask_blocks
+        """The mask blocks of the sequence."""
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield self.name
+        yield "size", self.dna_size
+
+    @property
+    def name(self) -> str:
+        """The name of the sequence."""
+        return self._name
+
+    @property
+    def dna_size(self) -> int:
+        """The number of bases in the sequence."""
+        return self._dna_size
+
+    def __len__(self) -> int:
+        return self._dna_size
+
+    def codes(self, start: int = 0, end: int | None = None) -> memoryview:
+        """Get the codes of the bases in a region of the sequence.
+
+        Args:
+            start: The start of the region (inclusive).
+            end: The end of the region (exclusive); the end of the sequence
+                if `None`.
+
+        Returns:
+            A view of the codes, one byte per base, from the memory map.
+
+        Note:
+            No data is copied; the view can be handed straight to, for
+            example, `numpy.frombuffer`. The codes are the index of each
+            base in `CODES`; masking isn't included in them, see
+            `mask_blocks`.
+        """
+        return self._codes[start : self._dna_size if end is None else end]
+
+    def bases(self, start: int, end: int) -> str:
+        """Get bases from the sequence.
+
+        Args:
+            start: The start location to get the bases from (inclusive).
+            end: The end location to get the bases from (exclusive).
+
+        Returns:
+            The bases between those locations.
+
+        Note:
+            As with a `TwoBitSequence`, the masked bases (other than Ns)
+            are in lower case if the reader was asked to take masking into
+            account.
+        """
+        start = min(start, self._dna_size)
+        bases = bytearray(self.codes(start, max(start, end))).translate(_FROM_CODES)
+        if self.reader.masking:
+            # Ns take priority over masking, as they do in a 2bit file.
+            overlay_mask_blocks(bases, start, self.mask_blocks)
+            overlay_n_blocks(bases, start, self.n_blocks)
+        return bases.decode("ascii")
+
+    def __getitem__(self, location: int | slice | tuple[int, int] | str) -> str:
+        if (span := location_range(location, len(self))) is None:
+            raise TypeError(f"Can't get bases at {location!r}")
+        return self.bases(*span)
+
+
+##############################################################################
+class TwoBitDecodedReader:
+    """Reads an export made by `export_decoded`.
+
+    A `TwoBitDecodedReader` provides the same sequence and region API as
+    a `TwoBitReader`, so switching to the export is a change of reader.
+    """
+
+    def __init__(
+        self, path: str | Path, masking: bool = False, validate: bool = True
+    ) -> None:
+        """Initialise the reader.
+
+        Args:
+            path: The path to the export.
+            masking: Should masking be taken into account?
+            validate: Should the 2bit file the export was made from be
+                checked to make sure it hasn't changed since?
+
+        Raises:
+            InvalidSignature: If the file isn't an export.
+            InvalidVersion: If the export is of a version that isn't supported.
+            TwoBitError: If the export is incomplete, or the 2bit file it
+                was made from has changed since.
+
+        Note:
+            The 2bit file can only be checked if it's a local file; if it
+            isn't there any more (perhaps the export has been copied
+            elsewhere) the export is used as is.
+        """
+        self._path = Path(path)
+        self._masking = masking
+        self._validate = validate
+        with self._path.open("rb") as export:
+            self._map = mmap(export.fileno(), 0, access=ACCESS_READ)
+        try:
+            self._header = self._read_header()
+        except (TwoBitError, ValueError, KeyError, TypeError) as error:
+            self._map.close()
+            if isinstance(error, TwoBitError):
+                raise
+            raise TwoBitError(f"'{self._path}' is not a valid export") from error
+        self._sequences: dict[str, TwoBitDecodedSequence] = {}
+
+    def _read_header(self) -> dict[str, Any]:
+        """Read and check the header of the export.
+
+        Returns:
+            The header.
+        """
+        if len(self._map) < calcsize(_PREAMBLE):
+            raise InvalidSignature(f"'{self._path}' is not a decoded 2bit export")
+        magic, version, header_size = unpack_from(_PREAMBLE, self._map)
+        if magic != _MAGIC:
+            raise InvalidSignature(f"'{self._path}' is not a decoded 2bit export")
+        if version != _VERSION:
+            raise InvalidVersion(f"'{self._path}' is version {version} of the export")
+        header: dict[str, Any] = loads(
+            self._map[calcsize(_PREAMBLE) : calcsize(_PREAMBLE) + header_size]
+        )
+        header["start"] = _aligned(calcsize(_PREAMBLE) + header_size)
+        header["sequences"] = {entry[0]: entry[1:] for entry in header["sequences"]}
+        if header["sequences"]:
+            *_, mask_count, mask_blocks = list(header["sequences"].values())[-1]
+            if header["start"] + mask_blocks + 8 * mask_count > len(self._map):
+                raise TwoBitError(f"'{self._path}' is incomplete")
+        if (
+            self._validate
+            and header["identity"] is not None
+            and Path(header["source"]).is_file()
+            and file_identity(header["source"]) != header["identity"]
+        ):
+            raise TwoBitError(
+                f"'{header['source']}' has changed since '{self._path}' was made"
+            )
+        return header
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield str(self._path)
+        yield "source", self.source
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (type(self), (self._path, self._masking, False))
+
+    @property
+    def uri(self) -> str:
+        """The path to the export."""
+        return str(self._path)
+
+    @property
+    def source(self) -> str:
+        """The 2bit file that the export was made from."""
+        return str(self._header["source"])
+
+    @property
+    def masking(self) -> bool:
+        """Is masking being taken into account?"""
+        return self._masking
+
+    @property
+    def sequences(self) -> tuple[str, ...]:
+        """The collection of sequences found in the export."""
+        return tuple(self._header["sequences"])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sequences)
+
+    def __len__(self) -> int:
+        return len(self._header["sequences"])
+
+    def sequence_sizes(self) -> dict[str, int]:
+        """Get the size of every sequence in the export.
+
+        Returns:
+            The size of each sequence, keyed by name.
+        """
+        return {name: entry[0] for name, entry in self._header["sequences"].items()}
+
+    def _blocks(self, count: int, offset: int) -> tuple[TwoBitBlock, ...]:
+        """Load a table of blocks from the export.
+
+        Args:
+            count: The number of blocks.
+            offset: The location of the table, relative to the header.
+
+        Returns:
+            The blocks.
+        """
+        offset += self._header["start"]
+        starts, sizes = array("I"), array("I")
+        starts.frombytes(self._map[offset : offset + 4 * count])
+        sizes.frombytes(self._map[offset + 4 * count : offset + 8 * count])
+        if self._header["byteorder"] != byteorder:
+            starts.byteswap()
+            sizes.byteswap()
+        return tuple(
+            TwoBitBlock(start, start + size, size) for start, size in zip(starts, sizes)
+        )
+
+    def sequence(self, name: str) -> TwoBitDecodedSequence:
+        """Get a sequence given its name.
+
+        Args:
+            name: The name of the sequence to get.
+
+        Returns:
+            An object for reading the sequence.
+
+        Raises:
+            UnknownSequence: When an unknown sequence is requested.
+        """
+        if name not in self._sequences:
+            if name not in self._header["sequences"]:
+                raise UnknownSequence(f"'{name}' is not a sequence in '{self._path}'")
+            dna_size, codes, n_count, n_blocks, mask_count, mask_blocks = self._header[
+                "sequences"
+            ][name]
+            codes += self._header["start"]
+            self._sequences[name] = TwoBitDecodedSequence(
+                self,
+                name,
+                dna_size,
+                memoryview(self._map)[codes : codes + dna_size],
+                self._blocks(n_count, n_blocks),
+                self._blocks(mask_count, mask_blocks),
+            )
+        return self._sequences[name]
+
+    def __getitem__(self, name: str) -> TwoBitDecodedSequence:
+        return self.sequence(name)
+
+    def close(self) -> None:
+        """Close the export.
+
+        Note:
+            Any views of the codes must have been released first.
+        """
+        for sequence in self._sequences.values():
+            # pylint: disable=protected-access
+            sequence._codes.release()
+        self._sequences.clear()
+        self._map.close()
+
+    def __enter__(self) -> TwoBitDecodedReader:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+### decoded.py ends here
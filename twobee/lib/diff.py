@@ -0,0 +1,300 @@
+"""Provides a comparison of two 2bit files, without decoding either of them.
+
+Sequences are compared by name. For each pair, the block tables are
+compared as sets of intervals, and the packed DNA is read from both files a
+large chunk at a time; chunks whose bytes are equal are skipped without
+looking any closer, and in a chunk that differs only the bytes that differ
+are decoded to find the bases that have changed.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import dataclass
+from re import finditer
+from typing import TYPE_CHECKING, Final, Iterator, Sequence
+
+##############################################################################
+# Imports only needed for type checking.
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .decode import blocks_overlapping, decode, overlay_n_blocks
+from .reader import TwoBitReader
+from .sequence_protocol import TwoBitSequenceInterface
+
+##############################################################################
+# The number of bytes of packed DNA to compare in one go.
+DIFF_CHUNK: Final = 4 * 1024 * 1024
+
+##############################################################################
+# The kinds of difference that can be found.
+DIFFERENCE_KINDS: Final = (
+    "added",
+    "removed",
+    "resized",
+    "substitution",
+    "n_added",
+    "n_removed",
+    "mask_added",
+    "mask_removed",
+)
+
+
+##############################################################################
+@dataclass(frozen=True)
+class Difference:
+    """A difference between two 2bit files."""
+
+    sequence: str
+    """The name of the sequence the difference is in."""
+    start: int
+    """The start of the difference (inclusive)."""
+    end: int
+    """The end of the difference (exclusive)."""
+    kind: str
+    """The kind of difference; one of `DIFFERENCE_KINDS`."""
+    first: str = ""
+    """The bases in the first file, for a substitution."""
+    second: str = ""
+    """The bases in the second file, for a substitution."""
+
+
+##############################################################################
+def interval_difference(
+    first: Sequence[TwoBitBlock], second: Sequence[TwoBitBlock]
+) -> list[tuple[int, int]]:
+    """Find the parts of one set of blocks that aren't covered by another.
+
+    Args:
+        first: The blocks to look in, in order and not overlapping.
+        second: The blocks to take away, in order and not overlapping.
+
+    Returns:
+        The start (inclusive) and end (exclusive) of each part of `first`
+        that isn't covered by `second`.
+    """
+    uncovered: list[tuple[int, int]] = []
+    for block in first:
+        position = block.start
+        for other in blocks_overlapping(second, block.start, block.end):
+            if other.start > position:
+                uncovered.append((position, other.start))
+            position = max(position, other.end)
+        if position < block.end:
+            uncovered.append((position, block.end))
+    return uncovered
+
+
+##############################################################################
+def _xor(first: bytes, second: bytes) -> bytes:
+    """XOR two runs of bytes together.
+
+    Args:
+        first: The first run of bytes.
+        second: The second run of bytes, the same length as the first.
+
+    Returns:
+        The bytes XORed together; a byte is only zero where they're equal.
+    """
+    return (int.from_bytes(first, "big") ^ int.from_bytes(second, "big")).to_bytes(
+        len(first), "big"
+    )
+
+
+##############################################################################
+def _substitutions(
+    first: TwoBitSequenceInterface,
+    second: TwoBitSequenceInterface,
+    packed: tuple[bytes, bytes],
+    start: int,
+    end: int,
+) -> Iterator[Difference]:
+    """Find the bases that have changed in a region that differs.
+
+    Args:
+        first: The sequence in the first file.
+        second: The sequence in the second file.
+        packed: The packed DNA of the region in each of the files.
+        start: The start of the region (inclusive; on a byte boundary).
+        end: The end of the region (exclusive).
+
+    Yields:
+        The substitutions, with runs of changed bases as one substitution.
+
+    Note:
+        What's packed underneath an N could be anything, so a base that's
+        an N in either file is never reported as a substitution; any change
+        to the Ns is found by comparing the block tables.
+    """
+    bases = [decode(data, start, start, end) for data in packed]
+    for sequence in (first, second):
+        for decoded in bases:
+            overlay_n_blocks(decoded, start, sequence.n_blocks)
+    for run in finditer(rb"[^\x00]+", _xor(bytes(bases[0]), bytes(bases[1]))):
+        yield Difference(
+            first.name,
+            start + run.start(),
+            start + run.end(),
+            "substitution",
+            bases[0][run.start() : run.end()].decode("ascii"),
+            bases[1][run.start() : run.end()].decode("ascii"),
+        )
+
+
+##############################################################################
+def _packed_differences(
+    first: TwoBitSequenceInterface, second: TwoBitSequenceInterface, size: int
+) -> Iterator[Difference]:
+    """Compare the packed DNA of two sequences.
+
+    Args:
+        first: The sequence in the first file.
+        second: The sequence in the second file.
+        size: The number of bases to compare.
+
+    Yields:
+        The substitutions.
+
+    Note:
+        A run of changed bases that crosses from one chunk into the next is
+        still yielded as one substitution.
+    """
+    pending: Difference | None = None
+    for chunk in range(0, (size + 3) // 4, DIFF_CHUNK):
+        length = min(DIFF_CHUNK, (size + 3) // 4 - chunk)
+        first_packed = first.reader.read(length, first.dna_file_location + chunk)
+        second_packed = second.reader.read(length, second.dna_file_location + chunk)
+        if first_packed == second_packed:
+            continue
+        # Only the runs of bytes that differ need to be decoded.
+        for run in finditer(rb"[^\x00]+", _xor(first_packed, second_packed)):
+            for substitution in _substitutions(
+                first,
+                second,
+                (
+                    first_packed[run.start() : run.end()],
+                    second_packed[run.start() : run.end()],
+                ),
+                4 * (chunk + run.start()),
+                min(4 * (chunk + run.end()), size),
+            ):
+                if pending is not None and pending.end == substitution.start:
+                    pending = Difference(
+                        pending.sequence,
+                        pending.start,
+                        substitution.end,
+                        "substitution",
+                        pending.first + substitution.first,
+                        pending.second + substitution.second,
+                    )
+                    continue
+                if pending is not None:
+                    yield pending
+                pending = substitution
+    if pending is not None:
+        yield pending
+
+
+##############################################################################
+def diff_sequence(
+    first: TwoBitSequenceInterface, second: TwoBitSequenceInterface
+) -> list[Difference]:
+    """Find the differences between two versions of a sequence.
+
+    Args:
+        first: The sequence in the first file.
+        second: The sequence in the second file.
+
+    Returns:
+        The differences, in order of position.
+
+    Note:
+        If the sequence has changed size, that's reported as a `resized`
+        difference covering the bases that only one of them has, and the
+        bases they both have are compared as they are.
+    """
+    differences: list[Difference] = []
+    size = min(first.dna_size, second.dna_size)
+    if first.dna_size != second.dna_size:
+        differences.append(
+            Difference(
+                first.name, size, max(first.dna_size, second.dna_size), "resized"
+            )
+        )
+    for kind, first_blocks, second_blocks in (
+        ("n", first.n_blocks, second.n_blocks),
+        ("mask", first.mask_blocks, second.mask_blocks),
+    ):
+        if tuple(first_blocks) == tuple(second_blocks):
+            continue
+        differences.extend(
+            Difference(first.name, start, end, f"{kind}_removed")
+            for start, end in interval_difference(first_blocks, second_blocks)
+        )
+        differences.extend(
+            Difference(first.name, start, end, f"{kind}_added")
+            for start, end in interval_difference(second_blocks, first_blocks)
+        )
+    differences.extend(_packed_differences(first, second, size))
+    return sorted(
+        differences,
+        key=lambda difference: (
+            difference.start,
+            DIFFERENCE_KINDS.index(difference.kind),
+        ),
+    )
+
+
+##############################################################################
+def diff(
+    first: TwoBitReader, second: TwoBitReader, executor: Executor | None = None
+) -> Iterator[Difference]:
+    """Find the differences between two 2bit files.
+
+    Args:
+        first: The reader for the first file.
+        second: The reader for the second file.
+        executor: A pool of workers to compare the sequences on.
+
+    Yields:
+        The differences, a sequence at a time; the sequences are in the
+        order of the first file, followed by any only in the second.
+
+    Note:
+        A sequence that's only in the first file is reported as `removed`,
+        and one that's only in the second as `added`. With an executor,
+        the sequences are compared in parallel; a pool of processes works,
+        as the sequences can be pickled.
+    """
+    shared = [name for name in first.sequences if name in second.sequences]
+    sizes = {**second.sequence_sizes(), **first.sequence_sizes()}
+    firsts = (first[name] for name in shared)
+    seconds = (second[name] for name in shared)
+    compared = (
+        map(diff_sequence, firsts, seconds)
+        if executor is None
+        else executor.map(diff_sequence, firsts, seconds)
+    )
+    pending = iter(first.sequences)
+    for name, differences in zip(shared, compared):
+        # Report any sequences that were removed before this one.
+        for earlier in pending:
+            if earlier == name:
+                break
+            yield Difference(earlier, 0, sizes[earlier], "removed")
+        yield from differences
+    for name in pending:
+        yield Difference(name, 0, sizes[name], "removed")
+    for name in second.sequences:
+        if name not in first.sequences:
+            yield Difference(name, 0, sizes[name], "added")
+
+
+### diff.py ends here
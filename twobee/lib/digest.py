@@ -0,0 +1,265 @@
+"""Content digests of the sequences in a 2bit file.
+
+The digests follow the conventions of the GA4GH refget and sequence
+collections (seqcol) standards: each sequence is digested as its upper case
+bases, with N blocks included as `N`, and no masking.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from base64 import urlsafe_b64encode
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from hashlib import md5, sha512
+from json import dumps, loads
+from os import cpu_count
+from pathlib import Path
+from typing import Final, Iterable
+
+##############################################################################
+# Local imports.
+from .decode import STREAM_CHUNK, stream_bases
+from .file_reader import TwoBitFileReader
+from .identity import file_identity
+from .reader import UnknownSequence
+from .sequence_protocol import TwoBitSequenceInterface
+
+##############################################################################
+# The suffix of the file that digests are saved to.
+SIDECAR_SUFFIX: Final = ".twobee-digests"
+
+
+##############################################################################
+def sha512t24u(data: bytes) -> str:
+    """Create a GA4GH sha512t24u digest.
+
+    Args:
+        data: The data to digest.
+
+    Returns:
+        The base64url encoding of the first 24 bytes of the SHA-512 digest.
+    """
+    return urlsafe_b64encode(sha512(data).digest()[:24]).decode()
+
+
+##############################################################################
+@dataclass(frozen=True)
+class SequenceDigest:
+    """The digests of a sequence (or part of a sequence)."""
+
+    name: str
+    """The name of the sequence."""
+    length: int
+    """The number of bases that were digested."""
+    md5: str
+    """The MD5 digest of the upper case bases, as hex."""
+    sha512t24u: str
+    """The GA4GH sha512t24u digest of the upper case bases."""
+
+    @property
+    def refget(self) -> str:
+        """The refget identifier of the sequence."""
+        return f"SQ.{self.sha512t24u}"
+
+
+##############################################################################
+def digest_sequence(
+    sequence: TwoBitSequenceInterface,
+    start: int = 0,
+    end: int | None = None,
+    chunk_size: int = STREAM_CHUNK,
+) -> SequenceDigest:
+    """Digest a sequence, or a region of a sequence.
+
+    Args:
+        sequence: The sequence to digest.
+        start: The start of the region to digest (inclusive).
+        end: The end of the region to digest (exclusive); the end of the
+            sequence if `None`.
+        chunk_size: The number of bases to decode and digest in one go.
+
+    Returns:
+        The digests.
+
+    Note:
+        The bases are streamed through the digests a chunk at a time, so
+        the whole sequence is never held in memory.
+    """
+    md5_digest = md5()
+    sha512_digest = sha512()
+    length = 0
+    for bases in stream_bases(sequence, start, end, chunk_size):
+        md5_digest.update(bases)
+        sha512_digest.update(bases)
+        length += len(bases)
+    return SequenceDigest(
+        sequence.name,
+        length,
+        md5_digest.hexdigest(),
+        urlsafe_b64encode(sha512_digest.digest()[:24]).decode(),
+    )
+
+
+##############################################################################
+# The reader used by a worker process.
+_WORKER_READER: TwoBitFileReader | None = None
+
+
+##############################################################################
+def _open_worker_reader(path: str) -> None:
+    """Open the reader for a worker process.
+
+    Args:
+        path: The path to the 2bit file.
+    """
+    global _WORKER_READER  # pylint: disable=global-statement
+    _WORKER_READER = TwoBitFileReader(path, readahead=False)
+
+
+##############################################################################
+def _digest_in_worker(name: str) -> SequenceDigest:
+    """Digest a sequence in a worker process.
+
+    Args:
+        name: The name of the sequence to digest.
+
+    Returns:
+        The digests.
+    """
+    assert _WORKER_READER is not None
+    return digest_sequence(_WORKER_READER[name])
+
+
+##############################################################################
+def digest_file(
+    path: str | Path,
+    names: Iterable[str] | None = None,
+    workers: int | None = None,
+    cache: bool = True,
+) -> dict[str, SequenceDigest]:
+    """Digest the sequences in a 2bit file.
+
+    Args:
+        path: The path to the 2bit file.
+        names: The names of the sequences to digest; all of them if `None`.
+        workers: The number of processes to digest with; one per CPU if `None`.
+        cache: Should the digests be cached alongside the 2bit file?
+
+    Returns:
+        The digests, keyed by sequence name, in the order of the file's index.
+
+    Raises:
+        UnknownSequence: If an unknown sequence is asked for.
+
+    Note:
+        Sequences are digested in parallel, biggest first. When caching, the
+        cache is tied to the size and modification time of the 2bit file, so
+        once a file has been digested, digesting it again is instant until
+        it changes.
+    """
+    path = str(path)
+    reader = TwoBitFileReader(path)
+    try:
+        sizes = reader.sequence_sizes()
+    finally:
+        reader.close()
+    wanted = list(sizes) if names is None else list(names)
+    for name in wanted:
+        if name not in sizes:
+            raise UnknownSequence(f"'{name}' is not a sequence in '{path}'")
+
+    # Pick up anything we've already digested.
+    sidecar = Path(f"{path}{SIDECAR_SUFFIX}")
+    digests: dict[str, SequenceDigest] = {}
+    identity = file_identity(path)
+    if cache:
+        with suppress(OSError, ValueError, KeyError, TypeError):
+            saved = loads(sidecar.read_text(encoding="utf-8"))
+            if saved["identity"] == identity:
+                digests = {
+                    name: SequenceDigest(**digest)
+                    for name, digest in saved["digests"].items()
+                }
+
+    # Digest whatever is left, biggest first, so that the workers finish at
+    # around the same time.
+    if todo := sorted(
+        (name for name in wanted if name not in digests),
+        key=lambda name: -sizes[name],
+    ):
+        with ProcessPoolExecutor(
+            max_workers=min(workers or cpu_count() or 1, len(todo)),
+            initializer=_open_worker_reader,
+            initargs=(path,),
+        ) as pool:
+            digests.update(zip(todo, pool.map(_digest_in_worker, todo)))
+        if cache:
+            # Saving the digests is only ever an optimisation, so if they
+            # can't be saved just carry on without them.
+            with suppress(OSError):
+                sidecar.write_text(
+                    dumps(
+                        {
+                            "identity": identity,
+                            "digests": {
+                                name: asdict(digest) for name, digest in digests.items()
+                            },
+                        }
+                    ),
+                    encoding="utf-8",
+                )
+
+    return {name: digests[name] for name in sizes if name in wanted}
+
+
+##############################################################################
+def _canonical(value: object) -> bytes:
+    """Produce the canonical JSON for a value.
+
+    Args:
+        value: The value to encode.
+
+    Returns:
+        The canonical JSON.
+
+    Note:
+        This is enough of RFC-8785 for the strings, integers, lists and
+        objects used in a sequence collection.
+    """
+    return dumps(
+        value, separators=(",", ":"), sort_keys=True, ensure_ascii=False
+    ).encode()
+
+
+##############################################################################
+def seqcol_digest(digests: Iterable[SequenceDigest]) -> str:
+    """Create the GA4GH sequence collection digest for a set of sequences.
+
+    Args:
+        digests: The digests of the sequences, in collection order.
+
+    Returns:
+        The (level 0) digest of the collection.
+    """
+    collected = list(digests)
+    return sha512t24u(
+        _canonical(
+            {
+                "lengths": sha512t24u(
+                    _canonical([digest.length for digest in collected])
+                ),
+                "names": sha512t24u(_canonical([digest.name for digest in collected])),
+                "sequences": sha512t24u(
+                    _canonical([digest.refget for digest in collected])
+                ),
+            }
+        )
+    )
+
+
+### digest.py ends here
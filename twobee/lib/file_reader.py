@@ -4,23 +4,175 @@
 # Python imports.
 from __future__ import annotations
 
+from dataclasses import dataclass
+from os import fstat
+from threading import Lock
+from typing import TYPE_CHECKING, Any, BinaryIO, Final
+
+##############################################################################
+# Imports only needed for type checking; the thread pool used for background
+# readahead is only imported when it's first needed.
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    from rich.repr import Result
+
 ##############################################################################
 # Local imports.
-from .reader import TwoBitReader
+from .reader import TwoBitError, TwoBitReader
+
+
+##############################################################################
+@dataclass
+class ReadaheadStats:
+    """Counters that show how the readahead of a file reader is doing."""
+
+    reads: int = 0
+    """The number of reads that have been asked of the reader."""
+    buffer_hits: int = 0
+    """The number of reads that were served from the readahead buffer."""
+    file_reads: int = 0
+    """The number of reads that actually went to the file."""
+    bytes_from_file: int = 0
+    """The number of bytes that have been read from the file."""
+    background_fills: int = 0
+    """The number of readahead windows that were filled in the background."""
+    window: int = 0
+    """The current size of the readahead window."""
 
 
 ##############################################################################
-class TwoBitFileReader(TwoBitReader):
-    """Class for reading data from a local 2bit file."""
+class TwoBitFileReader(TwoBitReader):  # pylint: disable=too-many-instance-attributes
+    """Class for reading data from a local 2bit file.
+
+    The reader watches for reads that carry on from (or a little after)
+    where the last one finished. While that keeps happening the reader grows a
+    readahead window, doubling it each time up to a limit, and serves later
+    reads from what it read ahead; optionally the next window can be filled
+    on a background thread. As soon as the reads look random the reader
+    goes back to reading exactly what it's asked for.
+    """
+
+    MIN_READAHEAD: Final = 4 * 1024
+    """The initial size of the readahead window."""
+
+    MAX_READAHEAD: Final = 8 * 1024 * 1024
+    """The default maximum size of the readahead window."""
+
+    SEQUENTIAL_GAP: Final = 4 * 1024
+    """How far after the end of the last read a read can start and still be sequential."""
+
+    def __init__(
+        self,
+        uri: str,
+        masking: bool = False,
+        *,
+        readahead: bool = True,
+        max_readahead: int | None = None,
+        background: bool = False,
+    ) -> None:
+        """Initialise the reader.
+
+        Args:
+            uri: The URI to read the data from.
+            masking: Should masking be taken into account?
+            readahead: Should the reader read ahead on sequential access?
+            max_readahead: The maximum size of the readahead window.
+            background: Should the next readahead window be filled on a
+                background thread?
+        """
+        self._readahead = readahead
+        self._max_readahead = max_readahead or self.MAX_READAHEAD
+        self._background = background
+        self._lock = Lock()
+        self._file_lock = Lock()
+        self._filler: ThreadPoolExecutor | None = None
+        self._pending: tuple[int, Future[bytes]] | None = None
+        self._buffer = b""
+        self._buffer_start = 0
+        self._position = 0
+        self._last_end = -1
+        self._stats = ReadaheadStats()
+        self._file: BinaryIO | None = None
+        super().__init__(uri, masking)
+        if self._file is None and self._identity is not None:
+            # We've been recreated from a reference, so the file will be
+            # opened when it's first read from; until then go with what we
+            # knew of it.
+            self._file_size = self._identity[0]
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield from super().__rich_repr__()
+        yield "stats", self._stats
+
+    @property
+    def stats(self) -> ReadaheadStats:
+        """The readahead counters for the reader."""
+        return self._stats
+
+    def _arguments(self) -> dict[str, Any]:
+        """Get the arguments needed to create the reader again.
+
+        Returns:
+            The arguments, keyed by name.
+        """
+        return {
+            **super()._arguments(),
+            "readahead": self._readahead,
+            "max_readahead": self._max_readahead,
+            "background": self._background,
+        }
 
     def open(self) -> None:
-        """Open a file for reading."""
+        """Open a file for reading.
+
+        Raises:
+            TwoBitError: If the file isn't the one the reader was created
+                from.
+        """
         # pylint: disable=consider-using-with
         self._file = open(self._uri, "rb")
+        status = fstat(self._file.fileno())
+        identity = (status.st_size, status.st_mtime_ns)
+        if self._identity is not None and identity != self._identity:
+            self._file.close()
+            self._file = None
+            raise TwoBitError(f"'{self._uri}' has changed since it was first read")
+        self._identity = identity
+        self._file_size = status.st_size
 
     def close(self) -> None:
         """Close the file."""
-        self._file.close()
+        self.release()
+
+    def release(self) -> None:
+        """Close the file, keeping only the header and index read from it.
+
+        Any readahead, and any background readahead thread, are dropped,
+        along with the cached sequences.
+
+        Note:
+            The file is opened again the next time it's read from; it's an
+            error if it has changed in the meantime.
+        """
+        with self._lock:
+            if self._filler is not None:
+                self._filler.shutdown(wait=True)
+                self._filler = None
+            self._pending = None
+            self._buffer = b""
+            self._last_end = -1
+            with self._file_lock:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+        super().close()
+
+    @property
+    def is_open(self) -> bool:
+        """Does the reader currently have the file open?"""
+        return self._file is not None
 
     def goto(self, position: int) -> None:
         """Go to a specific position within the file.
@@ -28,7 +180,7 @@ class TwoBitFileReader(TwoBitReader):
         Args:
             position: The position to go to in the file.
         """
-        self._file.seek(position)
+        self._position = position
 
     def position(self) -> int:
         """Get the current position within the 2bit file.
@@ -36,7 +188,101 @@ class TwoBitFileReader(TwoBitReader):
         Returns:
            The current position.
         """
-        return self._file.tell()
+        return self._position
+
+    def _read_file(self, size: int, position: int) -> bytes:
+        """Read directly from the file.
+
+        Args:
+            size: The number of bytes to read.
+            position: The location to start reading from.
+
+        Returns:
+            The bytes read.
+        """
+        with self._file_lock:
+            if self._file is None:
+                self.open()
+                assert self._file is not None
+            self._file.seek(position)
+            data = self._file.read(size)
+        self._stats.bytes_from_file += len(data)
+        return data
+
+    def _buffered(self, start: int, end: int) -> bytes | None:
+        """Get some bytes from the readahead buffer.
+
+        Args:
+            start: The start of the bytes to get (inclusive).
+            end: The end of the bytes to get (exclusive).
+
+        Returns:
+            The bytes, or `None` if the buffer doesn't hold all of them.
+        """
+        # Note that the buffer can come up short if it ran into the end of
+        # the file, in which case it still holds all there is to have.
+        buffer_end = self._buffer_start + len(self._buffer)
+        if self._buffer and self._buffer_start <= start <= buffer_end:
+            if end <= buffer_end or self._at_eof(buffer_end):
+                return self._buffer[
+                    start - self._buffer_start : end - self._buffer_start
+                ]
+        return None
+
+    def _at_eof(self, position: int) -> bool:
+        """Is the given position the end of the file?
+
+        Args:
+            position: The position to check.
+
+        Returns:
+            `True` if the position is at (or past) the end of the file.
+        """
+        return position >= self._file_size
+
+    def _take_pending(self, start: int, wait: bool) -> None:
+        """Move any background readahead into the buffer.
+
+        Args:
+            start: The start of the read that is about to be served.
+            wait: Should we wait for the background read to finish?
+        """
+        if self._pending is None:
+            return
+        pending_start, pending = self._pending
+        if not (wait or pending.done()):
+            return
+        self._pending = None
+        data = pending.result()
+        buffer_end = self._buffer_start + len(self._buffer)
+        if self._buffer_start <= start <= buffer_end == pending_start:
+            # The background read carries on from the buffer we have, so
+            # keep the part of the buffer we're still in and tack it on.
+            self._buffer = self._buffer[start - self._buffer_start :] + data
+            self._buffer_start = start
+        else:
+            self._buffer, self._buffer_start = data, pending_start
+        self._stats.background_fills += 1
+
+    def _fill_in_background(self, window: int) -> None:
+        """Fill the next readahead window on a background thread.
+
+        Args:
+            window: The size of the window to fill.
+        """
+        position = self._buffer_start + len(self._buffer)
+        if self._pending is None and not self._at_eof(position):
+            if self._filler is None:
+                # pylint: disable=import-outside-toplevel
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._filler = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="twobee-readahead"
+                )
+            self._pending = (
+                position,
+                self._filler.submit(self._read_file, window, position),
+            )
 
     def read(self, size: int, position: int | None = None) -> bytes:
         """Read a number of bytes from the 2bit file.
@@ -48,9 +294,58 @@ class TwoBitFileReader(TwoBitReader):
         Returns:
             The bytes read.
         """
-        if position is not None:
-            self.goto(position)
-        return self._file.read(size)
+        with self._lock:
+            start = self._position if position is None else position
+            end = start + size
+            self._stats.reads += 1
+
+            # Is this read carrying on from (or a little after) where the last
+            # one finished? If it is grow the readahead window, otherwise
+            # drop back to exact reads.
+            if (
+                self._readahead
+                and self._last_end >= 0
+                and 0 <= start - self._last_end <= self.SEQUENTIAL_GAP
+            ):
+                self._stats.window = min(
+                    max(self._stats.window * 2, self.MIN_READAHEAD), self._max_readahead
+                )
+            else:
+                self._stats.window = 0
+
+            # See if we can serve the read from what we've read ahead,
+            # including anything that's been read in the background.
+            self._take_pending(start, wait=False)
+            data = self._buffered(start, end)
+            if data is None and self._pending is not None and self._pending[0] <= end:
+                self._take_pending(start, wait=True)
+                data = self._buffered(start, end)
+
+            if data is None:
+                # We need to go to the file. If we're reading ahead, read the
+                # window along with what we've been asked for.
+                self._stats.file_reads += 1
+                if self._stats.window:
+                    self._buffer = self._read_file(size + self._stats.window, start)
+                    self._buffer_start = start
+                    data = self._buffer[:size]
+                else:
+                    data = self._read_file(size, start)
+            else:
+                self._stats.buffer_hits += 1
+
+            # If we're filling in the background, and we're well into the
+            # buffer, start getting the next window.
+            if (
+                self._background
+                and self._stats.window
+                and (self._buffer_start + len(self._buffer)) - end
+                < self._stats.window // 2
+            ):
+                self._fill_in_background(self._stats.window)
+
+            self._position = self._last_end = start + len(data)
+            return data
 
 
 ### file_reader.py ends here
@@ -0,0 +1,484 @@
+"""Provides a structural check of a 2bit file, without reading any bases.
+
+The header and index are checked first, then the metadata of each sequence
+(its size, block tables and reserved field) is read, visiting the sequences
+in the order they appear in the file. The packed DNA is never read; all
+that's checked is that it would fit where the metadata says it is. Batches
+of sequences can be checked in parallel, with each batch opening the file
+for itself and reading through it from start to end.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import sys
+from array import array
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+from operator import add, gt
+from os import fstat
+from pathlib import Path
+from struct import unpack
+from typing import IO, TYPE_CHECKING, Final, Iterator, Sequence
+
+##############################################################################
+# Imports only needed for type checking.
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+##############################################################################
+# Local imports.
+from .reader import TwoBitReader
+
+##############################################################################
+# The size of the header of a 2bit file.
+HEADER_SIZE: Final = 16
+
+##############################################################################
+# The approximate number of bytes of the file to give to each batch.
+FSCK_BATCH: Final = 64 * 1024 * 1024
+
+
+##############################################################################
+@dataclass(frozen=True)
+class Problem:
+    """A problem found in the structure of a 2bit file."""
+
+    message: str
+    """The description of the problem."""
+    sequence: str | None = None
+    """The name of the sequence with the problem, if it's in a sequence."""
+    offset: int | None = None
+    """The offset in the file where the problem was found, if it's known."""
+
+
+##############################################################################
+@dataclass(frozen=True)
+class _Entry:
+    """A sequence from the index, as it's to be checked."""
+
+    name: str
+    """The name of the sequence."""
+    offset: int
+    """The offset of the sequence's record in the file."""
+    limit: int
+    """Where the record should end; where the next starts, or the end of the file."""
+    following: str | None
+    """The name of the sequence that follows this one, if there is one."""
+
+
+##############################################################################
+def _read_blocks(
+    source: IO[bytes], count: int, byteorder: str
+) -> tuple[array[int], array[int]]:
+    """Read a block table.
+
+    Args:
+        source: The file to read from, positioned at the start of the table.
+        count: The number of blocks in the table.
+        byteorder: The byte order of the file.
+
+    Returns:
+        The starts and the sizes of the blocks.
+    """
+    table = array("I", source.read(8 * count))
+    if byteorder != sys.byteorder:
+        table.byteswap()
+    return table[:count], table[count:]
+
+
+##############################################################################
+def _check_blocks(
+    kind: str, starts: Sequence[int], sizes: Sequence[int], dna_size: int
+) -> list[str]:
+    """Check a block table against the sequence it belongs to.
+
+    Args:
+        kind: The kind of block being checked.
+        starts: The starts of the blocks.
+        sizes: The sizes of the blocks.
+        dna_size: The size of the sequence.
+
+    Returns:
+        A description of each problem with the blocks.
+
+    Note:
+        The blocks must be in order and not overlap, and must be within the
+        sequence. Each kind of problem is counted, and only the first of
+        them is described.
+    """
+    problems: list[str] = []
+    if unordered := sum(map(gt, map(add, starts, sizes), islice(starts, 1, None))):
+        first = next(
+            block
+            for block in range(1, len(starts))
+            if starts[block - 1] + sizes[block - 1] > starts[block]
+        )
+        problems.append(
+            f"{unordered} {kind} block(s) are out of order or overlap the one "
+            f"before, the first being block {first} at {starts[first]}"
+        )
+    # If the blocks are in order only the last of them can run past the
+    # end of the sequence, so there's no need to look at the others.
+    if starts and (unordered or starts[-1] + sizes[-1] > dna_size):
+        if beyond := sum(map(dna_size.__lt__, map(add, starts, sizes))):
+            first = next(
+                block
+                for block in range(len(starts))
+                if starts[block] + sizes[block] > dna_size
+            )
+            problems.append(
+                f"{beyond} {kind} block(s) run past the end of the sequence "
+                f"({dna_size} bases), the first being block {first} at "
+                f"{starts[first]}"
+            )
+    return problems
+
+
+##############################################################################
+def _check_sequence(
+    source: IO[bytes], file_size: int, byteorder: str, entry: _Entry
+) -> Iterator[Problem]:
+    """Check the record of a sequence.
+
+    Args:
+        source: The file to read from.
+        file_size: The size of the file.
+        byteorder: The byte order of the file.
+        entry: The sequence to check.
+
+    Yields:
+        The problems found with the sequence.
+    """
+    endianness = "<" if byteorder == "little" else ">"
+    # Each table is checked to fit in the file before it's read, so that a
+    # count that's garbage doesn't lead to an enormous read.
+    if entry.offset + 8 > file_size:
+        yield Problem(
+            "The record is cut short by the end of the file", entry.name, entry.offset
+        )
+        return
+    source.seek(entry.offset)
+    dna_size, n_count = unpack(f"{endianness}LL", source.read(8))
+    if entry.offset + 12 + 8 * n_count > file_size:
+        yield Problem(
+            "The N block table runs past the end of the file", entry.name, entry.offset
+        )
+        return
+    n_blocks = _read_blocks(source, n_count, byteorder)
+    (mask_count,) = unpack(f"{endianness}L", source.read(4))
+    dna_start = entry.offset + 16 + 8 * (n_count + mask_count)
+    if dna_start > file_size:
+        yield Problem(
+            "The mask block table runs past the end of the file",
+            entry.name,
+            entry.offset,
+        )
+        return
+    mask_blocks = _read_blocks(source, mask_count, byteorder)
+    if reserved := unpack(f"{endianness}L", source.read(4))[0]:
+        yield Problem(
+            f"The reserved field is {reserved} rather than 0",
+            entry.name,
+            dna_start - 4,
+        )
+    for message in _check_blocks("N", *n_blocks, dna_size):
+        yield Problem(message, entry.name, entry.offset)
+    for message in _check_blocks("mask", *mask_blocks, dna_size):
+        yield Problem(message, entry.name, entry.offset)
+    dna_end = dna_start + (dna_size + 3) // 4
+    if dna_end > file_size:
+        yield Problem(
+            f"The packed DNA runs {dna_end - file_size} byte(s) past the end "
+            "of the file",
+            entry.name,
+            dna_start,
+        )
+    elif dna_end > entry.limit:
+        yield Problem(
+            f"The packed DNA overlaps the record of '{entry.following}'",
+            entry.name,
+            dna_start,
+        )
+    elif dna_end < entry.limit:
+        yield Problem(
+            f"The packed DNA is followed by {entry.limit - dna_end} byte(s) "
+            "that belong to no sequence",
+            entry.name,
+            dna_end,
+        )
+
+
+##############################################################################
+def _check_batch(
+    path: str, file_size: int, byteorder: str, entries: tuple[_Entry, ...]
+) -> list[Problem]:
+    """Check a batch of sequences.
+
+    Args:
+        path: The path to the file.
+        file_size: The size of the file.
+        byteorder: The byte order of the file.
+        entries: The sequences to check, in the order they're in the file.
+
+    Returns:
+        The problems found with the sequences.
+    """
+    with open(path, "rb") as source:
+        return [
+            problem
+            for entry in entries
+            for problem in _check_sequence(source, file_size, byteorder, entry)
+        ]
+
+
+##############################################################################
+def _read_header(source: IO[bytes]) -> Problem | tuple[str, int, list[Problem]]:
+    """Read and check the header of the file.
+
+    Args:
+        source: The file to read from, positioned at its start.
+
+    Returns:
+        The byte order of the file, the number of sequences in it and the
+        problems found with the header; or, if the header can't be made
+        sense of, the problem with it.
+    """
+    header = source.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        return Problem("The file is too short to hold a 2bit header", offset=0)
+    for endianness, byteorder in (("<", "little"), (">", "big")):
+        signature, version, count, reserved = unpack(f"{endianness}IIII", header)
+        if signature == TwoBitReader.SIGNATURE:
+            break
+    else:
+        return Problem("The file doesn't have a 2bit signature", offset=0)
+    if version != TwoBitReader.VERSION:
+        return Problem(f"Version {version} 2bit files aren't supported", offset=4)
+    return (
+        byteorder,
+        count,
+        (
+            [
+                Problem(
+                    f"The reserved field of the header is {reserved} rather than 0",
+                    offset=12,
+                )
+            ]
+            if reserved
+            else []
+        ),
+    )
+
+
+##############################################################################
+def _read_index(
+    source: IO[bytes], file_size: int, byteorder: str, count: int
+) -> tuple[list[tuple[str, int]], list[Problem], int]:
+    """Read and check the index of the file.
+
+    Args:
+        source: The file to read from, positioned at the start of the index.
+        file_size: The size of the file.
+        byteorder: The byte order of the file.
+        count: The number of sequences the header says are in the file.
+
+    Returns:
+        The name and offset of each sequence that was read from the index,
+        the problems found, and where the index ends.
+    """
+    endianness = "<" if byteorder == "little" else ">"
+    raw = source.read(min((1 + 255 + 4) * count, file_size))
+    index: list[tuple[str, int]] = []
+    problems: list[Problem] = []
+    seen: set[str] = set()
+    position = 0
+    for entry in range(count):
+        length = raw[position] if position < len(raw) else 0
+        if position + 1 + length + 4 > len(raw):
+            problems.append(
+                Problem(
+                    f"The index is cut short by the end of the file after "
+                    f"{entry} of {count} sequence(s)",
+                    offset=HEADER_SIZE + position,
+                )
+            )
+            break
+        try:
+            name = raw[position + 1 : position + 1 + length].decode()
+        except UnicodeDecodeError:
+            name = raw[position + 1 : position + 1 + length].decode(errors="replace")
+            problems.append(
+                Problem(
+                    "The name isn't valid UTF-8",
+                    name,
+                    HEADER_SIZE + position,
+                )
+            )
+        if not name:
+            problems.append(
+                Problem(
+                    f"Index entry {entry} has an empty name",
+                    offset=HEADER_SIZE + position,
+                )
+            )
+        elif name in seen:
+            problems.append(
+                Problem(
+                    "The name is in the index more than once",
+                    name,
+                    HEADER_SIZE + position,
+                )
+            )
+        seen.add(name)
+        (offset,) = unpack(
+            f"{endianness}L", raw[position + 1 + length : position + 1 + length + 4]
+        )
+        index.append((name, offset))
+        position += 1 + length + 4
+    return index, problems, HEADER_SIZE + position
+
+
+##############################################################################
+def _batches(entries: list[_Entry]) -> Iterator[tuple[_Entry, ...]]:
+    """Split the sequences into batches to check.
+
+    Args:
+        entries: The sequences to check, in the order they're in the file.
+
+    Yields:
+        Batches of sequences that each cover about `FSCK_BATCH` bytes of
+        the file, or a single sequence if it covers more.
+    """
+    batch: list[_Entry] = []
+    for entry in entries:
+        if batch and entry.limit - batch[0].offset > FSCK_BATCH:
+            yield tuple(batch)
+            batch = []
+        batch.append(entry)
+    if batch:
+        yield tuple(batch)
+
+
+##############################################################################
+def _layout(
+    index: list[tuple[str, int]], index_end: int, file_size: int
+) -> tuple[list[_Entry], list[Problem]]:
+    """Work out where each sequence's record should be.
+
+    Args:
+        index: The name and offset of each sequence, in index order.
+        index_end: Where the index ends.
+        file_size: The size of the file.
+
+    Returns:
+        The sequences that can be checked, in the order they're in the
+        file, and the problems found with where they are.
+    """
+    problems: list[Problem] = []
+    placed: list[tuple[str, int]] = []
+    for name, offset in index:
+        if offset < index_end:
+            problems.append(
+                Problem("The record starts inside the header or index", name, offset)
+            )
+        elif offset >= file_size:
+            problems.append(
+                Problem("The record starts past the end of the file", name, offset)
+            )
+        else:
+            placed.append((name, offset))
+    if unordered := sum(
+        map(gt, (offset for _, offset in placed), (offset for _, offset in placed[1:]))
+    ):
+        first = next(
+            name
+            for (_, before), (name, offset) in zip(placed, placed[1:])
+            if before > offset
+        )
+        problems.append(
+            Problem(
+                f"{unordered} sequence(s) are in a different order in the index "
+                f"than in the file, the first being '{first}'",
+                first,
+            )
+        )
+    placed.sort(key=lambda entry: entry[1])
+    if placed and placed[0][1] > index_end:
+        problems.append(
+            Problem(
+                f"The index is followed by {placed[0][1] - index_end} byte(s) "
+                "that belong to no sequence",
+                offset=index_end,
+            )
+        )
+    elif not index and file_size > index_end:
+        problems.append(
+            Problem(
+                f"The file holds no sequences, but has {file_size - index_end} "
+                "byte(s) after the header",
+                offset=index_end,
+            )
+        )
+    return [
+        _Entry(name, offset, following[1], following[0])
+        for (name, offset), following in zip(placed, [*placed[1:], (None, file_size)])
+    ], problems
+
+
+##############################################################################
+def fsck(path: str | Path, executor: Executor | None = None) -> list[Problem]:
+    """Check the structure of a 2bit file.
+
+    Args:
+        path: The path to the 2bit file.
+        executor: A pool of workers to check batches of sequences on.
+
+    Returns:
+        The problems found with the file; an empty list if there are none.
+
+    Raises:
+        OSError: If the file can't be opened.
+
+    Note:
+        The header is checked for its signature, version and reserved
+        field; the index for entries that are cut short, have names that
+        are empty, repeated or not UTF-8, or are in a different order than
+        the records; and each record for a reserved field that isn't zero,
+        blocks that are out of order, overlap or run past the end of the
+        sequence, and packed DNA that runs past the end of the file, into
+        the next record, or is followed by bytes that belong to nothing.
+        If the header or index can't be made sense of, the checks stop
+        there. With an executor, batches of sequences are checked in
+        parallel; a pool of threads or processes works.
+    """
+    path = str(path)
+    with open(path, "rb") as source:
+        file_size = fstat(source.fileno()).st_size
+        header = _read_header(source)
+        if isinstance(header, Problem):
+            return [header]
+        byteorder, count, problems = header
+        index, index_problems, index_end = _read_index(
+            source, file_size, byteorder, count
+        )
+    problems.extend(index_problems)
+    if len(index) < count:
+        return problems
+    entries, layout_problems = _layout(index, index_end, file_size)
+    problems.extend(layout_problems)
+    check = partial(_check_batch, path, file_size, byteorder)
+    for found in (
+        map(check, _batches(entries))
+        if executor is None
+        else executor.map(check, _batches(entries))
+    ):
+        problems.extend(found)
+    return problems
+
+
+### fsck.py ends here
@@ -0,0 +1,483 @@
+"""Provides haplotype sequences, made by applying variants to a reference.
+
+Regions are built for many haplotypes at once. The regions asked for are
+sorted and those that are close to each other are coalesced into spans;
+each span is decoded from the reference just the once, and every region
+within it, for every haplotype, is then built by stitching together slices
+of the decoded span and the alternate alleles of the haplotype's variants.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import (
+    TYPE_CHECKING,
+    Collection,
+    Final,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Local imports.
+from .sequence import TwoBitSequence
+
+##############################################################################
+# A haplotype is identified by the name of a sample and which of the
+# sample's haplotypes it is (0 for the first allele of the genotype, 1 for
+# the second, and so on).
+HaplotypeKey = tuple[str, int]
+
+
+##############################################################################
+@dataclass(frozen=True)
+class Variant:
+    """A variant, as carried by a haplotype."""
+
+    position: int
+    """The position of the variant on the reference (0-based)."""
+    reference: str
+    """The reference allele."""
+    alternate: str
+    """The alternate allele."""
+
+    @property
+    def end(self) -> int:
+        """The end of the reference allele on the reference (exclusive)."""
+        return self.position + len(self.reference)
+
+
+##############################################################################
+def _is_symbolic(allele: str) -> bool:
+    """Is an allele one that can't be applied as a sequence?
+
+    Args:
+        allele: The allele to check.
+
+    Returns:
+        `True` if the allele is symbolic, missing or a breakend.
+    """
+    return allele in (".", "*") or any(mark in allele for mark in "<>[]")
+
+
+##############################################################################
+def _alleles(fields: list[str], number: int) -> tuple[list[str], list[list[str]]]:
+    """Pull the alternate alleles and the genotypes out of a VCF record.
+
+    Args:
+        fields: The fields of the record.
+        number: The line number of the record.
+
+    Returns:
+        The alternate alleles, and the alleles of each sample's genotype.
+
+    Raises:
+        ValueError: If the record doesn't have genotypes.
+    """
+    try:
+        genotype = fields[8].split(":").index("GT")
+    except ValueError:
+        raise ValueError(f"Line {number} is not a VCF record with genotypes") from None
+    genotypes: list[list[str]] = []
+    for details in fields[9:]:
+        calls = details.split(":")
+        genotypes.append(
+            calls[genotype].replace("|", "/").split("/")
+            if genotype < len(calls)
+            else []
+        )
+    return fields[4].upper().split(","), genotypes
+
+
+##############################################################################
+def read_vcf(
+    lines: Iterable[str], samples: Collection[str] | None = None
+) -> dict[str, dict[HaplotypeKey, list[Variant]]]:
+    """Read the variants carried by each haplotype from the lines of a VCF file.
+
+    Args:
+        lines: The lines of the VCF file.
+        samples: The samples to read the variants of; all of them if `None`.
+
+    Returns:
+        The variants carried by each haplotype, keyed by haplotype, keyed
+        by the sequence (chromosome) they're on. The variants are in the
+        order they're found in the file.
+
+    Raises:
+        ValueError: If a record can't be understood.
+
+    Note:
+        Only the subset of VCF needed to apply sequence variants is
+        understood: the `GT` field of each sample gives the alleles of its
+        haplotypes, and records whose alternate allele is symbolic (such
+        as `<DEL>`), a breakend or `*` are skipped. The `FILTER` column
+        isn't looked at, so filter the file first if that matters. Every
+        haplotype of a sample has an entry for every sequence that sample
+        has a genotype on, even if it carries no variants there.
+    """
+    names: list[str] = []
+    haplotypes: dict[str, dict[HaplotypeKey, list[Variant]]] = {}
+    for number, line in enumerate(lines, start=1):
+        if line.startswith("##") or not line.strip():
+            continue
+        fields = line.rstrip("\r\n").split("\t")
+        if line.startswith("#"):
+            names = fields[9:]
+            continue
+        if len(fields) < 10:
+            continue
+        if not fields[1].isdigit():
+            raise ValueError(f"Line {number} has a bad position")
+        alternates, genotypes = _alleles(fields, number)
+        sequence = haplotypes.setdefault(fields[0], {})
+        for name, alleles in zip(names, genotypes):
+            if samples is not None and name not in samples:
+                continue
+            for haplotype, allele in enumerate(alleles):
+                variants = sequence.setdefault((name, haplotype), [])
+                if allele in (".", "0"):
+                    continue
+                if not allele.isdigit() or int(allele) > len(alternates):
+                    raise ValueError(f"Line {number} has a bad genotype for {name}")
+                if not _is_symbolic(alternates[int(allele) - 1]):
+                    variants.append(
+                        Variant(
+                            int(fields[1]) - 1,
+                            fields[3].upper(),
+                            alternates[int(allele) - 1],
+                        )
+                    )
+    return haplotypes
+
+
+##############################################################################
+@dataclass(frozen=True)
+class HaplotypeRegion:  # pylint: disable=too-many-instance-attributes
+    """A region of a haplotype, with the variants of the haplotype applied."""
+
+    haplotype: HaplotypeKey
+    """The haplotype the region is from."""
+    start: int
+    """The start of the region on the reference (inclusive)."""
+    end: int
+    """The end of the region on the reference (exclusive)."""
+    bases: str
+    """The bases of the region of the haplotype."""
+    reference_starts: array[int]
+    """The start of each applied variant on the reference."""
+    reference_ends: array[int]
+    """The end of each applied variant on the reference."""
+    haplotype_starts: array[int]
+    """The start of each applied variant's alternate allele within `bases`."""
+    haplotype_ends: array[int]
+    """The end of each applied variant's alternate allele within `bases`."""
+    skipped: int = 0
+    """The number of variants in the region that couldn't be applied."""
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield self.haplotype
+        yield "region", f"{self.start}..{self.end}"
+        yield "applied", len(self.reference_starts)
+        yield "skipped", self.skipped, 0
+
+    def __str__(self) -> str:
+        return self.bases
+
+    def __len__(self) -> int:
+        return len(self.bases)
+
+    @staticmethod
+    def _map(
+        position: int,
+        origins: tuple[int, int],
+        from_starts: array[int],
+        from_ends: array[int],
+        to_starts: array[int],
+        to_ends: array[int],
+    ) -> int:
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        """Map a position from one coordinate system to the other.
+
+        Args:
+            position: The position to map.
+            origins: Where the region starts in the system mapped from, and
+                in the system mapped to.
+            from_starts: The starts of the variants in the system mapped from.
+            from_ends: The ends of the variants in the system mapped from.
+            to_starts: The starts of the variants in the system mapped to.
+            to_ends: The ends of the variants in the system mapped to.
+
+        Returns:
+            The mapped position.
+        """
+        variant = bisect_right(from_starts, position) - 1
+        if variant < 0:
+            return origins[1] + position - origins[0]
+        if position < from_ends[variant]:
+            return to_starts[variant] + min(
+                position - from_starts[variant], to_ends[variant] - to_starts[variant]
+            )
+        return to_ends[variant] + position - from_ends[variant]
+
+    def to_haplotype(self, position: int) -> int:
+        """Map a position on the reference to a location within `bases`.
+
+        Args:
+            position: The position on the reference.
+
+        Returns:
+            The location within the bases of the haplotype.
+
+        Note:
+            A position within the reference allele of a variant maps to the
+            same offset into the alternate allele, clamped to its end; so
+            the bases removed by a deletion map to just after what's left
+            of it.
+        """
+        return self._map(
+            position,
+            (self.start, 0),
+            self.reference_starts,
+            self.reference_ends,
+            self.haplotype_starts,
+            self.haplotype_ends,
+        )
+
+    def to_reference(self, location: int) -> int:
+        """Map a location within `bases` to a position on the reference.
+
+        Args:
+            location: The location within the bases of the haplotype.
+
+        Returns:
+            The position on the reference.
+
+        Note:
+            A location within the alternate allele of a variant maps to the
+            same offset into the reference allele, clamped to its end; so
+            the bases added by an insertion map to just after the reference
+            allele.
+        """
+        return self._map(
+            location,
+            (0, self.start),
+            self.haplotype_starts,
+            self.haplotype_ends,
+            self.reference_starts,
+            self.reference_ends,
+        )
+
+
+##############################################################################
+class HaplotypeBuilder:
+    """Builds regions of many haplotypes of a sequence, sharing reference reads."""
+
+    COALESCE_GAP: Final = 64 * 1024
+    """Regions closer together than this are read from the reference together."""
+
+    MAX_SPAN: Final = 4 * 1024 * 1024
+    """The most bases to decode in one go, unless a single region is larger."""
+
+    def __init__(
+        self,
+        sequence: TwoBitSequence,
+        haplotypes: Mapping[HaplotypeKey, Sequence[Variant]],
+    ) -> None:
+        """Initialise the builder.
+
+        Args:
+            sequence: The reference sequence.
+            haplotypes: The variants carried by each haplotype, on the
+                sequence, in order of position.
+
+        Raises:
+            ValueError: If the variants of a haplotype aren't in order.
+        """
+        self._sequence = sequence
+        self._haplotypes = {
+            key: tuple(variants) for key, variants in haplotypes.items()
+        }
+        self._positions: dict[HaplotypeKey, array[int]] = {}
+        self._reaches: dict[HaplotypeKey, array[int]] = {}
+        for key, variants in self._haplotypes.items():
+            positions = array("Q", (variant.position for variant in variants))
+            if any(
+                positions[index] > positions[index + 1]
+                for index in range(len(positions) - 1)
+            ):
+                raise ValueError(f"The variants of {key} aren't in order")
+            self._positions[key] = positions
+            # How far along the reference the variants up to each one reach.
+            self._reaches[key] = array(
+                "Q", accumulate((variant.end for variant in variants), max)
+            )
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield self._sequence.name
+        yield "haplotypes", len(self._haplotypes)
+
+    @property
+    def haplotypes(self) -> tuple[HaplotypeKey, ...]:
+        """The haplotypes the builder builds."""
+        return tuple(self._haplotypes)
+
+    def _spans(
+        self, regions: Sequence[tuple[int, int]]
+    ) -> Iterator[tuple[int, int, list[int]]]:
+        """Coalesce regions into spans to read from the reference.
+
+        Args:
+            regions: The regions.
+
+        Yields:
+            The start and end of each span, and the index of each region
+            within it.
+        """
+        span: list[int] = []
+        span_start = span_end = 0
+        for index in sorted(range(len(regions)), key=lambda index: regions[index]):
+            start, end = regions[index]
+            if span and (
+                start > span_end + self.COALESCE_GAP
+                or max(end, span_end) - span_start > self.MAX_SPAN
+            ):
+                yield span_start, span_end, span
+                span = []
+            if not span:
+                span_start, span_end = start, end
+            span.append(index)
+            span_end = max(span_end, end)
+        if span:
+            yield span_start, span_end, span
+
+    def _build(
+        self, key: HaplotypeKey, reference: str, offset: int, start: int, end: int
+    ) -> HaplotypeRegion:
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # pylint: disable=too-many-locals
+        """Build a region of a haplotype.
+
+        Args:
+            key: The haplotype.
+            reference: The decoded reference that covers the region.
+            offset: The position of the decoded reference on the sequence.
+            start: The start of the region (inclusive).
+            end: The end of the region (exclusive).
+
+        Returns:
+            The region of the haplotype.
+
+        Raises:
+            ValueError: If a variant's reference allele doesn't match the
+                reference.
+        """
+        variants, positions = self._haplotypes[key], self._positions[key]
+        pieces: list[str] = []
+        starts, ends = array("Q"), array("Q")
+        hap_starts, hap_ends = array("Q"), array("Q")
+        position = start
+        length = skipped = 0
+        first, last = bisect_left(positions, start), bisect_left(positions, end)
+        # Variants that start before the region but run into it can't be
+        # applied either.
+        reaches, earlier = self._reaches[key], first - 1
+        while earlier >= 0 and reaches[earlier] > start:
+            skipped += variants[earlier].end > start
+            earlier -= 1
+        for variant in variants[first:last]:
+            # Variants that overlap one that has already been applied, or
+            # that run off the end of the region, can't be applied.
+            if variant.position < position or variant.end > end:
+                skipped += 1
+                continue
+            allele = reference[variant.position - offset : variant.end - offset]
+            if allele.upper() != variant.reference.upper():
+                raise ValueError(
+                    f"{variant} doesn't match the reference ({allele}) in {key}"
+                )
+            pieces.append(reference[position - offset : variant.position - offset])
+            length += variant.position - position
+            starts.append(variant.position)
+            ends.append(variant.end)
+            hap_starts.append(length)
+            pieces.append(variant.alternate)
+            length += len(variant.alternate)
+            hap_ends.append(length)
+            position = variant.end
+        pieces.append(reference[position - offset : end - offset])
+        return HaplotypeRegion(
+            key,
+            start,
+            end,
+            "".join(pieces),
+            starts,
+            ends,
+            hap_starts,
+            hap_ends,
+            skipped,
+        )
+
+    def build(
+        self,
+        regions: Iterable[tuple[int, int]],
+        haplotypes: Iterable[HaplotypeKey] | None = None,
+    ) -> Iterator[HaplotypeRegion]:
+        """Build regions of haplotypes.
+
+        Args:
+            regions: The start (inclusive) and end (exclusive) of each region.
+            haplotypes: The haplotypes to build; all of them if `None`.
+
+        Yields:
+            Each region of each haplotype.
+
+        Raises:
+            KeyError: If asked for a haplotype the builder doesn't know about.
+            ValueError: If a variant's reference allele doesn't match the
+                reference.
+
+        Note:
+            The regions are built in order of position (the regions that
+            are read from the reference together, for every haplotype,
+            before moving on), so use the `start`, `end` and `haplotype`
+            of each to tell them apart. A variant is only applied if its
+            reference allele is wholly within the region, and if it doesn't
+            overlap a variant of the haplotype that has already been
+            applied; those that aren't are counted in `skipped`.
+        """
+        wanted = self.haplotypes if haplotypes is None else tuple(haplotypes)
+        for key in wanted:
+            if key not in self._haplotypes:
+                raise KeyError(key)
+        clipped = [
+            (min(max(start, 0), len(self._sequence)), min(end, len(self._sequence)))
+            for start, end in regions
+        ]
+        for span_start, span_end, members in self._spans(clipped):
+            reference = str(self._sequence[span_start:span_end])
+            for index in members:
+                start, end = clipped[index]
+                for key in wanted:
+                    yield self._build(
+                        key, reference, span_start, start, max(start, end)
+                    )
+
+
+### haplotype.py ends here
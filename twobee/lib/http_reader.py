@@ -0,0 +1,306 @@
+"""Code for reading 2bit data from a web server, using HTTP range requests."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from collections import OrderedDict
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from re import match
+from typing import TYPE_CHECKING, Any, Final
+from urllib.parse import urlsplit
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Local imports.
+from .reader import TwoBitReader
+
+
+##############################################################################
+class TwoBitHTTPReader(TwoBitReader):  # pylint: disable=too-many-instance-attributes
+    """Class for reading data from a 2bit file served over HTTP(S).
+
+    Data is pulled from the server with `Range` requests over a single
+    keep-alive connection. Everything that is read is held in a small cache
+    of fixed-size blocks, so that the header, index and block table traffic
+    doesn't cause lots of tiny requests; any run of blocks that isn't in the
+    cache is pulled in with a single request. When the reads look to be
+    sequential, the reader also reads ahead, doubling the size of the
+    readahead window each time, up to a limit.
+
+    If the server ignores the `Range` header and sends the whole file, the
+    whole file is kept and every read from then on is served from it,
+    rather than downloading it all over again on the next cache miss.
+    """
+
+    BLOCK_SIZE: Final = 64 * 1024
+    """The default size of a cache block."""
+
+    CACHE_BLOCKS: Final = 64
+    """The default number of blocks to keep in the cache."""
+
+    MAX_READAHEAD: Final = 4 * 1024 * 1024
+    """The default maximum number of bytes to read ahead."""
+
+    def __init__(
+        self,
+        uri: str,
+        masking: bool = False,
+        *,
+        block_size: int | None = None,
+        cache_blocks: int | None = None,
+        max_readahead: int | None = None,
+    ) -> None:
+        """Initialise the reader.
+
+        Args:
+            uri: The URL to read the data from.
+            masking: Should masking be taken into account?
+            block_size: The size of a cache block.
+            cache_blocks: The number of blocks to keep in the cache.
+            max_readahead: The maximum number of bytes to read ahead.
+        """
+        self._block_size = block_size or self.BLOCK_SIZE
+        self._cache_blocks = cache_blocks or self.CACHE_BLOCKS
+        self._max_readahead = (
+            self.MAX_READAHEAD if max_readahead is None else max_readahead
+        )
+        self._cache: OrderedDict[int, bytes] = OrderedDict()
+        self._connection: HTTPConnection | None = None
+        self._path = ""
+        self._position = 0
+        self._last_end = -1
+        self._readahead = 0
+        self._size: int | None = None
+        self._whole: bytes | None = None
+        self._requests = 0
+        super().__init__(uri, masking)
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield from super().__rich_repr__()
+        yield "requests", self._requests
+
+    @property
+    def request_count(self) -> int:
+        """The number of HTTP requests that have been made."""
+        return self._requests
+
+    @property
+    def size(self) -> int | None:
+        """The size of the remote file, if it is known yet."""
+        return self._size
+
+    def _connect(self) -> HTTPConnection:
+        """Create the connection to the server.
+
+        Returns:
+            The connection.
+        """
+        url = urlsplit(self._uri)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"'{self._uri}' is not a HTTP or HTTPS URL")
+        self._path = url.path or "/"
+        if url.query:
+            self._path += f"?{url.query}"
+        return (HTTPSConnection if url.scheme == "https" else HTTPConnection)(
+            url.hostname, url.port
+        )
+
+    def _arguments(self) -> dict[str, Any]:
+        """Get the arguments needed to create the reader again.
+
+        Returns:
+            The arguments, keyed by name.
+        """
+        return {
+            **super()._arguments(),
+            "block_size": self._block_size,
+            "cache_blocks": self._cache_blocks,
+            "max_readahead": self._max_readahead,
+        }
+
+    def open(self) -> None:
+        """Open the URL for reading."""
+        self._connection = self._connect()
+
+    def close(self) -> None:
+        """Close the connection to the server."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self._cache.clear()
+        self._whole = None
+        super().close()
+
+    def goto(self, position: int) -> None:
+        """Go to a specific position within the file.
+
+        Args:
+            position: The position to go to in the file.
+        """
+        self._position = position
+
+    def position(self) -> int:
+        """Get the current position within the 2bit file.
+
+        Returns:
+           The current position.
+        """
+        return self._position
+
+    def _request(self, start: int, end: int) -> bytes:
+        """Make a single range request of the server.
+
+        Args:
+            start: The first byte to request (inclusive).
+            end: The last byte to request (exclusive).
+
+        Returns:
+            The bytes sent back by the server.
+
+        Raises:
+            OSError: If the server didn't send back the data.
+        """
+        headers = {"Range": f"bytes={start}-{end - 1}", "Connection": "keep-alive"}
+        # The server is allowed to drop a keep-alive connection whenever it
+        # wants to, so if the request fails give it one more go on a fresh
+        # connection.
+        for retry in (False, True):
+            if self._connection is None:
+                self._connection = self._connect()
+            try:
+                self._connection.request("GET", self._path, headers=headers)
+                response = self._connection.getresponse()
+                body = response.read()
+                break
+            except (HTTPException, ConnectionError):
+                self._connection.close()
+                self._connection = None
+                if retry:
+                    raise
+        self._requests += 1
+        if response.status == 206:
+            if hit := match(
+                r"^bytes\s+\d+-\d+/(?P<size>\d+)$",
+                response.getheader("Content-Range", ""),
+            ):
+                self._size = int(hit["size"])
+            return body
+        if response.status == 200:
+            # The server ignored the range and sent the whole thing; hang on
+            # to it, as asking again would only get the whole thing again.
+            self._whole = body
+            self._size = len(body)
+            return body[start:end]
+        if response.status == 416:
+            # We asked for something past the end of the file.
+            if hit := match(
+                r"^bytes\s+\*/(?P<size>\d+)$", response.getheader("Content-Range", "")
+            ):
+                self._size = int(hit["size"])
+            return b""
+        raise OSError(
+            f"Error reading '{self._uri}': {response.status} {response.reason}"
+        )
+
+    def _fetch(self, first: int, last: int) -> dict[int, bytes]:
+        """Fetch a run of blocks from the server.
+
+        Args:
+            first: The first block to fetch.
+            last: The last block to fetch (inclusive).
+
+        Returns:
+            The blocks that were fetched, keyed by block number.
+        """
+        data = self._request(first * self._block_size, (last + 1) * self._block_size)
+        return {
+            block: data[offset : offset + self._block_size]
+            for block, offset in zip(
+                range(first, last + 1), range(0, len(data), self._block_size)
+            )
+        }
+
+    def read(self, size: int, position: int | None = None) -> bytes:
+        """Read a number of bytes from the 2bit file.
+
+        Args:
+            size: The number of bytes to read.
+            position: The optional location to start reading from.
+
+        Returns:
+            The bytes read.
+        """
+        if position is not None:
+            self.goto(position)
+        start = self._position
+        if self._size is not None:
+            size = min(size, self._size - start)
+        if size <= 0:
+            return b""
+        end = start + size
+
+        # If the server has already sent us the whole file, there's no need
+        # to go back to it.
+        if self._whole is not None:
+            self._position = self._last_end = end
+            return self._whole[start:end]
+
+        # If this read carries on from where the last one finished, grow the
+        # readahead window; otherwise drop back to reading just what we're
+        # asked for.
+        if start == self._last_end and self._max_readahead:
+            self._readahead = min(
+                max(self._readahead * 2, self._block_size), self._max_readahead
+            )
+        else:
+            self._readahead = 0
+
+        # Work out which blocks we need, and which of those we don't have.
+        first = start // self._block_size
+        last = (end - 1) // self._block_size
+        blocks = {block: self._cache.get(block) for block in range(first, last + 1)}
+        missing = [block for block, data in blocks.items() if data is None]
+
+        # If there's anything missing, go get it all in one request, pulling
+        # in the readahead too while we're at it.
+        if missing:
+            fetch_last = max(
+                missing[-1], (end - 1 + self._readahead) // self._block_size
+            )
+            if self._size is not None:
+                fetch_last = min(fetch_last, (self._size - 1) // self._block_size)
+            fetched = self._fetch(missing[0], fetch_last)
+            if self._whole is not None:
+                # The server sent the whole file rather than the range.
+                self._position = self._last_end = end
+                return self._whole[start:end]
+            blocks.update(
+                (block, data) for block, data in fetched.items() if block in blocks
+            )
+            self._cache.update(fetched)
+
+        # Pull the bytes we were asked for together.
+        for block in range(first, last + 1):
+            if block in self._cache:
+                self._cache.move_to_end(block)
+        data = b"".join(blocks[block] or b"" for block in range(first, last + 1))
+        offset = start - (first * self._block_size)
+        data = data[offset : offset + size]
+
+        # Keep the cache within its limit.
+        while len(self._cache) > self._cache_blocks:
+            self._cache.popitem(last=False)
+
+        self._position = self._last_end = start + len(data)
+        return data
+
+
+### http_reader.py ends here
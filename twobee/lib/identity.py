@@ -0,0 +1,32 @@
+"""Provides a cheap way of identifying a particular version of a local file."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from os import stat
+from pathlib import Path
+
+
+##############################################################################
+def file_identity(path: str | Path) -> list[int]:
+    """Get the identity of a file.
+
+    Args:
+        path: The path to the file.
+
+    Returns:
+        A value that will change if the file changes.
+
+    Note:
+        The identity is made up of the size and the modification time of
+        the file; it's intended for deciding if anything saved alongside a
+        file is still good, without having to read the file itself.
+    """
+    details = stat(path)
+    return [details.st_size, details.st_mtime_ns]
+
+
+### identity.py ends here
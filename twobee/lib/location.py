@@ -0,0 +1,50 @@
+"""Provides the parsing of the locations used to get bases from a sequence."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from re import match
+
+
+##############################################################################
+def location_range(location: object, size: int) -> tuple[int, int] | None:
+    """Work out the range of bases that a location refers to.
+
+    Args:
+        location: The location; a single base, a slice, a `(start, end)`
+            tuple, or a string like `"100:200"` or `"100..200"`.
+        size: The size of the sequence the location is in.
+
+    Returns:
+        The start (inclusive) and end (exclusive) of the range, or `None`
+        if the location isn't understood.
+    """
+    # Getting a single base.
+    if isinstance(location, int):
+        return location, location + 1
+
+    # Getting a range of bases with a slice.
+    if isinstance(location, slice):
+        return (
+            0 if location.start is None else location.start,
+            size if location.stop is None else location.stop,
+        )
+
+    # Getting a range of bases with a tuple.
+    if isinstance(location, tuple) and len(location) == 2:
+        return location[0], location[1]
+
+    # Getting a range of bases with a string like "100:200" or "100..200".
+    if isinstance(location, str):
+        hit = match(r"^(?P<start>\d+)(?::|\.\.)(?P<end>\d+)$", location)
+        if hit is not None:
+            return int(hit["start"]), int(hit["end"])
+
+    # Give up, I don't understand what's being asked for.
+    return None
+
+
+### location.py ends here
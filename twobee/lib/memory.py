@@ -0,0 +1,62 @@
+"""Provides a way of finding out how much memory a process is using."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final
+
+##############################################################################
+# Where the kernel reports the memory use of the current process.
+SMAPS_ROLLUP: Final = Path("/proc/self/smaps_rollup")
+
+
+##############################################################################
+@dataclass(frozen=True)
+class ProcessMemory:
+    """The memory used by a process, in bytes."""
+
+    rss: int
+    """The resident set size; all the memory the process has in use."""
+    pss: int
+    """The proportional set size; shared memory is split between the processes sharing it."""
+    private: int
+    """The memory used by this process alone."""
+
+    def __sub__(self, other: ProcessMemory) -> ProcessMemory:
+        return ProcessMemory(
+            self.rss - other.rss, self.pss - other.pss, self.private - other.private
+        )
+
+
+##############################################################################
+def process_memory() -> ProcessMemory:
+    """Get the memory used by the current process.
+
+    Returns:
+        The memory used.
+
+    Raises:
+        OSError: If the memory use can't be found out.
+
+    Note:
+        This relies on `/proc/self/smaps_rollup`, so is only available on
+        Linux.
+    """
+    fields: dict[str, int] = {}
+    for line in SMAPS_ROLLUP.read_text(encoding="ascii").splitlines():
+        name, _, value = line.partition(":")
+        if value.strip().endswith(" kB"):
+            fields[name] = int(value.split()[0]) * 1024
+    return ProcessMemory(
+        fields.get("Rss", 0),
+        fields.get("Pss", 0),
+        fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    )
+
+
+### memory.py ends here
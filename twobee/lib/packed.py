@@ -0,0 +1,350 @@
+"""Provides a class for working with bases while they're still packed."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from typing import TYPE_CHECKING, Final, Iterable, Sequence
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .decode import blocks_overlapping, decode, overlay_mask_blocks, overlay_n_blocks
+from .sequence_protocol import TwoBitSequenceInterface
+
+##############################################################################
+# The number of bits set in each possible byte.
+POPCOUNT: Final = bytes(bin(byte).count("1") for byte in range(256))
+
+##############################################################################
+# For each possible packed byte, the byte holding the reverse complement of
+# its four bases. In 2bit files T is 0b00, C is 0b01, A is 0b10 and G is
+# 0b11, so complementing a base is a matter of flipping its high bit.
+REVERSE_COMPLEMENT: Final = bytes(
+    sum((((byte >> (6 - 2 * base)) & 0b11) ^ 0b10) << (2 * base) for base in range(4))
+    for byte in range(256)
+)
+
+
+##############################################################################
+def _popcount(value: int, size: int) -> int:
+    """Count the bits that are set in a value.
+
+    Args:
+        value: The value to count the bits of.
+        size: The number of bytes the value fits in.
+
+    Returns:
+        The number of bits that are set.
+    """
+    counts = value.to_bytes(size, "big").translate(POPCOUNT)
+    return sum(bits * counts.count(bits) for bits in range(1, 9))
+
+
+##############################################################################
+def _low_bits(size: int) -> int:
+    """Get a value with the low bit of every base set.
+
+    Args:
+        size: The number of bytes in the value.
+
+    Returns:
+        The value.
+    """
+    return int.from_bytes(b"\x55" * size, "big")
+
+
+##############################################################################
+def _block_bits(blocks: Iterable[TwoBitBlock], size: int) -> int:
+    """Get a value with the low bit of every base within some blocks set.
+
+    Args:
+        blocks: The blocks to set the bits of.
+        size: The number of bytes in the value.
+
+    Returns:
+        The value.
+    """
+    bits = bytearray(size)
+    for block in blocks:
+        start, end = block.start, block.end
+        while start < end and start % 4:
+            bits[start // 4] |= 0b01 << (6 - 2 * (start % 4))
+            start += 1
+        while start < end and end % 4:
+            end -= 1
+            bits[end // 4] |= 0b01 << (6 - 2 * (end % 4))
+        bits[start // 4 : end // 4] = b"\x55" * ((end - start) // 4)
+    return int.from_bytes(bits, "big")
+
+
+##############################################################################
+def realign(packed: bytes, skip: int, length: int) -> bytes:
+    """Realign some packed bases so that they start on a byte boundary.
+
+    Args:
+        packed: The packed bases.
+        skip: The number of bases at the start of `packed` to skip.
+        length: The number of bases to keep.
+
+    Returns:
+        The bases, starting at the top of the first byte, with any spare
+        bases at the end of the last byte cleared.
+    """
+    size = (length + 3) // 4
+    if not skip and len(packed) == size and not length % 4:
+        return bytes(packed)
+    value = int.from_bytes(packed, "big") >> (2 * (4 * len(packed) - skip - length))
+    value &= (1 << (2 * length)) - 1
+    return (value << (2 * (-length % 4))).to_bytes(size, "big")
+
+
+##############################################################################
+def clip_blocks(
+    blocks: Sequence[TwoBitBlock], start: int, end: int
+) -> tuple[TwoBitBlock, ...]:
+    """Clip some blocks to a range, relative to the start of the range.
+
+    Args:
+        blocks: The blocks to clip, in order.
+        start: The start of the range (inclusive).
+        end: The end of the range (exclusive).
+
+    Returns:
+        The parts of the blocks that fall within the range.
+    """
+    return tuple(
+        TwoBitBlock(
+            max(block.start, start) - start,
+            min(block.end, end) - start,
+            min(block.end, end) - max(block.start, start),
+        )
+        for block in blocks_overlapping(blocks, start, end)
+        if start < end
+    )
+
+
+##############################################################################
+class PackedBases:
+    """Holds bases in their packed, 2 bits per base, form.
+
+    The bases are held as the raw bytes from the 2bit file, realigned so
+    that the first base is at the top of the first byte, with N and mask
+    blocks held alongside them. Reverse complementing, comparing, counting
+    mismatches and counting bases all work on whole bytes (so four bases at
+    a time); the bases are only decoded when they're turned into a string.
+    """
+
+    MAX_REPR_BASES: Final = 50
+    """The maximum number of bases to emit from a repr."""
+
+    def __init__(
+        self,
+        packed: bytes,
+        length: int,
+        n_blocks: Sequence[TwoBitBlock] = (),
+        mask_blocks: Sequence[TwoBitBlock] = (),
+    ) -> None:
+        """Initialise the packed bases.
+
+        Args:
+            packed: The packed bases, starting at the top of the first byte.
+            length: The number of bases.
+            n_blocks: The N blocks within the bases, in order.
+            mask_blocks: The mask blocks within the bases, in order.
+
+        Raises:
+            ValueError: If `packed` isn't the right size for `length` bases.
+        """
+        size = (length + 3) // 4
+        if len(packed) != size:
+            raise ValueError(f"{length} bases need {size} bytes, not {len(packed)}")
+        self._length = length
+        self.n_blocks = tuple(n_blocks)
+        """The N blocks within the bases."""
+        self.mask_blocks = tuple(mask_blocks)
+        """The mask blocks within the bases."""
+        # Whatever is packed underneath an N, and in any spare bases at the
+        # end, is cleared, so that the bytes can be compared as they are.
+        if self.n_blocks or length % 4:
+            value = int.from_bytes(packed, "big")
+            value &= ~(_block_bits(self.n_blocks, size) * 0b11)
+            value &= ~((1 << (2 * (-length % 4))) - 1)
+            packed = value.to_bytes(size, "big")
+        self._packed = bytes(packed)
+
+    @classmethod
+    def from_sequence(
+        cls, sequence: TwoBitSequenceInterface, start: int = 0, end: int | None = None
+    ) -> PackedBases:
+        """Load packed bases from a sequence.
+
+        Args:
+            sequence: The sequence to load the bases from.
+            start: The start location of the bases (inclusive).
+            end: The end location of the bases (exclusive); the end of the
+                sequence if `None`.
+
+        Returns:
+            The packed bases.
+
+        Note:
+            The mask blocks are only loaded if the sequence's reader is
+            taking masking into account.
+        """
+        end = sequence.dna_size if end is None else min(end, sequence.dna_size)
+        start = min(start, end)
+        first = start // 4
+        packed = sequence.reader.read(
+            (end + 3) // 4 - first, sequence.dna_file_location + first
+        )
+        return cls(
+            realign(packed, start % 4, end - start),
+            end - start,
+            clip_blocks(sequence.n_blocks, start, end),
+            (
+                clip_blocks(sequence.mask_blocks, start, end)
+                if sequence.reader.masking
+                else ()
+            ),
+        )
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield "length", self._length
+        yield "bases", (
+            f"{str(self[: self.MAX_REPR_BASES - 3])}..."
+            if len(self) > self.MAX_REPR_BASES
+            else str(self)
+        )
+
+    @property
+    def packed(self) -> bytes:
+        """The packed bases."""
+        return self._packed
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, location: slice) -> PackedBases:
+        if not isinstance(location, slice) or location.step not in (None, 1):
+            raise TypeError("Packed bases can only be sliced, with a step of 1")
+        start, end, _ = location.indices(self._length)
+        end = max(start, end)
+        return PackedBases(
+            realign(self._packed[start // 4 : (end + 3) // 4], start % 4, end - start),
+            end - start,
+            clip_blocks(self.n_blocks, start, end),
+            clip_blocks(self.mask_blocks, start, end),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackedBases):
+            return NotImplemented
+        return (
+            len(self) == len(other)
+            and self._packed == other.packed
+            and [(block.start, block.end) for block in self.n_blocks]
+            == [(block.start, block.end) for block in other.n_blocks]
+        )
+
+    def __hash__(self) -> int:
+        return hash(
+            (
+                self._length,
+                self._packed,
+                tuple((block.start, block.end) for block in self.n_blocks),
+            )
+        )
+
+    def __str__(self) -> str:
+        bases = decode(self._packed, 0, 0, self._length)
+        overlay_mask_blocks(bases, 0, self.mask_blocks)
+        overlay_n_blocks(bases, 0, self.n_blocks)
+        return bases.decode()
+
+    def reverse_complement(self) -> PackedBases:
+        """Get the reverse complement of the bases.
+
+        Returns:
+            The reverse complement.
+        """
+        size = len(self._packed)
+        value = int.from_bytes(self._packed[::-1].translate(REVERSE_COMPLEMENT), "big")
+        # The spare bases that were at the end are now at the start, so
+        # shift them back off the end.
+        value = (value << (2 * (-self._length % 4))) & ((1 << (8 * size)) - 1)
+        return PackedBases(
+            value.to_bytes(size, "big"),
+            self._length,
+            tuple(
+                TwoBitBlock(
+                    self._length - block.end, self._length - block.start, block.size
+                )
+                for block in reversed(self.n_blocks)
+            ),
+            tuple(
+                TwoBitBlock(
+                    self._length - block.end, self._length - block.start, block.size
+                )
+                for block in reversed(self.mask_blocks)
+            ),
+        )
+
+    def hamming_distance(self, other: PackedBases) -> int:
+        """Count the bases that differ between these bases and some others.
+
+        Args:
+            other: The bases to compare against.
+
+        Returns:
+            The number of positions where the bases differ.
+
+        Raises:
+            ValueError: If the bases aren't the same length.
+
+        Note:
+            Masking is ignored. An N only matches another N.
+        """
+        if len(self) != len(other):
+            raise ValueError(f"Can't compare {len(self)} bases with {len(other)} bases")
+        size = len(self._packed)
+        difference = int.from_bytes(self._packed, "big") ^ int.from_bytes(
+            other.packed, "big"
+        )
+        # A base differs if either of its bits differ.
+        differs = (difference | (difference >> 1)) & _low_bits(size)
+        if self.n_blocks or other.n_blocks:
+            ours = _block_bits(self.n_blocks, size)
+            theirs = _block_bits(other.n_blocks, size)
+            differs = (differs & ~(ours | theirs)) | (ours ^ theirs)
+        return _popcount(differs, size)
+
+    def counts(self) -> dict[str, int]:
+        """Count the bases.
+
+        Returns:
+            The count of each of `A`, `C`, `G`, `T` and `N`.
+        """
+        size = len(self._packed)
+        value = int.from_bytes(self._packed, "big")
+        low_bits = _low_bits(size)
+        low = value & low_bits
+        high = (value >> 1) & low_bits
+        g = _popcount(high & low, size)
+        c = _popcount(low, size) - g
+        a = _popcount(high, size) - g
+        n = sum(block.size for block in self.n_blocks)
+        # N and any spare bases at the end are packed as T, so T is whatever
+        # is left.
+        return {"A": a, "C": c, "G": g, "T": self._length - a - c - g - n, "N": n}
+
+
+### packed.py ends here
@@ -0,0 +1,188 @@
+"""Decoding of large regions of a sequence, split across a pool of workers.
+
+A large region is split into byte-aligned segments, each of which is read
+and decoded by a worker straight into its place in a buffer that's made
+for the whole region up front. With a thread pool the buffer is ordinary
+memory; with a process pool it's shared memory, and each worker is handed
+the (pickled) sequence so that it can do its own reading.
+
+Note:
+    The decoding is done with `bytes.translate` and slice assignment, which
+    hold the GIL; so a thread pool only helps on a free-threaded build of
+    Python, and a process pool is the way to use more cores otherwise.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Final
+
+##############################################################################
+# Local imports.
+from .decode import decode_region
+from .sequence_protocol import TwoBitSequenceInterface
+from .shared_memory import attach_shared_memory, release_shared_memory
+
+##############################################################################
+# The default number of bases in each segment handed to a worker.
+SEGMENT_SIZE: Final = 8 * 1024 * 1024
+
+
+##############################################################################
+def segments(
+    start: int, end: int, segment_size: int = SEGMENT_SIZE
+) -> list[tuple[int, int]]:
+    """Split a region into segments that start and end on byte boundaries.
+
+    Args:
+        start: The start of the region (inclusive).
+        end: The end of the region (exclusive).
+        segment_size: The number of bases in each segment.
+
+    Returns:
+        The start (inclusive) and end (exclusive) of each segment.
+
+    Note:
+        Other than the start of the first segment and the end of the last,
+        every segment boundary falls on a byte boundary of the packed DNA,
+        so no byte is read by more than one worker.
+    """
+    segment_size = max(segment_size - (segment_size % 4), 4)
+    boundaries = [
+        start,
+        *range(start - (start % 4) + segment_size, end, segment_size),
+        end,
+    ]
+    return list(zip(boundaries, boundaries[1:]))
+
+
+##############################################################################
+def _decode_into(
+    target: memoryview,
+    sequence: TwoBitSequenceInterface,
+    start: int,
+    end: int,
+    masking: bool,
+) -> None:
+    """Decode a segment of a sequence into its place in the output.
+
+    Args:
+        target: The part of the output that the segment goes in.
+        sequence: The sequence to decode.
+        start: The start of the segment (inclusive).
+        end: The end of the segment (exclusive).
+        masking: Should the masked bases be in lower case?
+    """
+    target[:] = decode_region(
+        sequence, start, end, sequence.mask_blocks if masking else ()
+    )
+
+
+##############################################################################
+def _decode_into_shared(
+    name: str,
+    offset: int,
+    sequence: TwoBitSequenceInterface,
+    start: int,
+    end: int,
+    masking: bool,
+) -> None:
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """Decode a segment of a sequence into its place in shared memory.
+
+    Args:
+        name: The name of the shared memory that holds the output.
+        offset: The location of the segment in the output.
+        sequence: The sequence to decode.
+        start: The start of the segment (inclusive).
+        end: The end of the segment (exclusive).
+        masking: Should the masked bases be in lower case?
+    """
+    memory = attach_shared_memory(name)
+    try:
+        assert memory.buf is not None
+        with memory.buf[offset : offset + end - start] as target:
+            _decode_into(target, sequence, start, end, masking)
+    finally:
+        memory.close()
+
+
+##############################################################################
+def decode_parallel(
+    sequence: TwoBitSequenceInterface,
+    start: int,
+    end: int,
+    executor: Executor,
+    *,
+    masking: bool = False,
+    segment_size: int = SEGMENT_SIZE,
+) -> bytearray:
+    # pylint: disable=too-many-arguments
+    """Decode a region of a sequence, with the segments decoded in parallel.
+
+    Args:
+        sequence: The sequence to decode.
+        start: The start of the region (inclusive).
+        end: The end of the region (exclusive).
+        executor: The pool of workers to decode the segments with.
+        masking: Should the masked bases be in lower case?
+        segment_size: The number of bases in each segment.
+
+    Returns:
+        The decoded bases, as ASCII.
+
+    Note:
+        If `executor` is a `ProcessPoolExecutor` the segments are decoded
+        into shared memory, and the sequence (which must be able to be
+        pickled, as `TwoBitSequence` can) is handed to each worker;
+        otherwise the workers are assumed to be threads, and the sequence's
+        reader must be safe to read from more than one thread at once (as
+        `TwoBitFileReader` and `TwoBitSharedReader` are).
+    """
+    end = min(end, sequence.dna_size)
+    if end <= start:
+        return bytearray()
+    size = end - start
+    if isinstance(executor, ProcessPoolExecutor):
+        memory = SharedMemory(create=True, size=size)
+        try:
+            for result in [
+                executor.submit(
+                    _decode_into_shared,
+                    memory.name,
+                    segment_start - start,
+                    sequence,
+                    segment_start,
+                    segment_end,
+                    masking,
+                )
+                for segment_start, segment_end in segments(start, end, segment_size)
+            ]:
+                result.result()
+            assert memory.buf is not None
+            return bytearray(memory.buf[:size])
+        finally:
+            release_shared_memory(memory)
+    bases = bytearray(size)
+    with memoryview(bases) as output:
+        for result in [
+            executor.submit(
+                _decode_into,
+                output[segment_start - start : segment_end - start],
+                sequence,
+                segment_start,
+                segment_end,
+                masking,
+            )
+            for segment_start, segment_end in segments(start, end, segment_size)
+        ]:
+            result.result()
+    return bases
+
+
+### parallel.py ends here
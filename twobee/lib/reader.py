@@ -6,18 +6,25 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
+import os
 from abc import ABC, abstractmethod
-from functools import lru_cache
+from array import array
+from dataclasses import dataclass
 from struct import unpack
-from typing import Iterator
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Final, Iterator
+from weakref import WeakValueDictionary
 
 ##############################################################################
-# Rich imports.
-from rich.repr import Result
-from typing_extensions import Final
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
 
 ##############################################################################
 # Local imports.
+from .block import TwoBitBlock
+from .cache import BoundedCache
+from .scan import SCAN_FIELDS, TwoBitScan
 from .sequence import TwoBitSequence
 
 
@@ -41,6 +48,96 @@ class UnknownSequence(TwoBitError):
     """Exception thrown when an unknown sequence is requested."""
 
 
+##############################################################################
+@dataclass(frozen=True)
+class TwoBitReaderReference:
+    """A reference to a reader, from which it can be recreated in another process.
+
+    The reference holds everything needed to create the reader again, along
+    with the details from the header of the file, but not the index; so
+    it's small to pickle.
+    """
+
+    reader_class: type[TwoBitReader]
+    """The class of the reader."""
+    arguments: tuple[tuple[str, Any], ...]
+    """The arguments the reader was created with."""
+    identity: tuple[int, ...] | None
+    """The identity of the file when it was first read, if known."""
+    endianness: str
+    """The endianness of the file."""
+    sequence_count: int
+    """The number of sequences in the file."""
+
+    def open(self) -> TwoBitReader:
+        """Get the reader that the reference refers to.
+
+        Returns:
+            The reader.
+
+        Note:
+            Within a process, all references to the same reader give the
+            same reader, for as long as it's in use. A reader created from a
+            reference doesn't read anything from the file until it needs
+            to, and only reads the index if it's asked for.
+        """
+        with _REHYDRATED_LOCK:
+            if (reader := _REHYDRATED.get(self)) is None:
+                reader = self.reader_class.__new__(self.reader_class)
+                # Hand the details over to TwoBitReader.__init__, so that it
+                # knows not to go reading them from the file.
+                reader.__dict__["_reference"] = self
+                # pylint: disable-next=unnecessary-dunder-call
+                reader.__init__(**dict(self.arguments))  # type: ignore[misc]
+                _REHYDRATED[self] = reader
+            return reader
+
+
+##############################################################################
+# The readers that have been recreated from references, in this process.
+_REHYDRATED: WeakValueDictionary[
+    TwoBitReaderReference, TwoBitReader
+] = WeakValueDictionary()
+_REHYDRATED_LOCK = Lock()
+
+
+##############################################################################
+def _forget_rehydrated() -> None:
+    """Forget the readers recreated by the parent of a forked process.
+
+    A forked process inherits the parent's readers, along with their open
+    files; if it went on to use them it would be seeking and reading the
+    same file descriptions as the parent and its other children.
+    """
+    global _REHYDRATED_LOCK  # pylint: disable=global-statement
+    _REHYDRATED_LOCK = Lock()
+    _REHYDRATED.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_rehydrated)
+
+
+##############################################################################
+def _rehydrate_reader(
+    reference: TwoBitReaderReference, index: dict[str, int] | None
+) -> TwoBitReader:
+    """Recreate a reader that has been pickled.
+
+    Args:
+        reference: The reference to the reader.
+        index: The index of the file.
+
+    Returns:
+        The reader.
+    """
+    reader = reference.open()
+    # pylint: disable=protected-access
+    if index is not None and reader._loaded_index is None:
+        reader._loaded_index = index
+    return reader
+
+
 ##############################################################################
 class TwoBitReader(ABC):
     """Abstract base class for 2bit reader classes."""
@@ -54,6 +151,12 @@ class TwoBitReader(ABC):
     _HEADER_SIZE: Final = 16
     """The size of a 2bit file header."""
 
+    SEQUENCE_CACHE_ENTRIES: Final = 256
+    """The default number of sequences to cache."""
+
+    SEQUENCE_CACHE_SIZE: Final = 512 * 1024 * 1024
+    """The default approximate number of bytes of sequences to cache."""
+
     def __init__(self, uri: str, masking: bool = False) -> None:
         """Initialise the reader.
 
@@ -67,6 +170,27 @@ class TwoBitReader(ABC):
         """
         self._uri = uri
         self._masking = masking
+        self._sequences: BoundedCache[TwoBitSequence] = BoundedCache(
+            self,
+            self.SEQUENCE_CACHE_ENTRIES,
+            self.SEQUENCE_CACHE_SIZE,
+            lambda sequence: sequence.memory_size,
+        )
+
+        # If the reader is being recreated from a reference we already know
+        # what's in the header; the index will be loaded if and when it's
+        # needed, and the URI will be opened when it's first read from.
+        reference: TwoBitReaderReference | None = self.__dict__.pop("_reference", None)
+        if reference is not None:
+            self._identity = reference.identity
+            self._endianness = reference.endianness
+            self._sequence_count = reference.sequence_count
+            self._loaded_index: dict[str, int] | None = None
+            return
+
+        # Start out not knowing the identity of what we're reading.
+        self._identity = None
+
         self.open()
 
         # Start out not knowing what endianness the data is in.
@@ -75,32 +199,87 @@ class TwoBitReader(ABC):
         # Start out assuming there are no sequences.
         self._sequence_count = 0
 
-        # Start out with an empty index.
-        self._index: dict[str, int] = {}
-
         # Read the header.
         self._read_header()
 
         # Read the index.
-        self._read_index()
+        self._loaded_index = self._read_index()
 
     def __rich_repr__(self) -> Result:
         """Make the object look nice in Rich."""
         yield self._uri
         yield "sequence_count", self._sequence_count
 
+    @property
+    def uri(self) -> str:
+        """The URI that the data is being read from."""
+        return self._uri
+
     @property
     def masking(self) -> bool:
         """Should masking be taken into account?"""
         return self._masking
 
+    @property
+    def identity(self) -> tuple[int, ...] | None:
+        """A value that will change if the file changes, if it's known."""
+        return self._identity
+
+    def _arguments(self) -> dict[str, Any]:
+        """Get the arguments needed to create the reader again.
+
+        Returns:
+            The arguments, keyed by name.
+
+        Note:
+            Child classes that take extra arguments should add them to
+            these.
+        """
+        return {"uri": self._uri, "masking": self._masking}
+
+    def reference(self) -> TwoBitReaderReference:
+        """Get a reference to the reader.
+
+        Returns:
+            A reference from which the reader can be recreated, in this or
+            another process.
+        """
+        return TwoBitReaderReference(
+            type(self),
+            tuple(self._arguments().items()),
+            self._identity,
+            self._endianness,
+            self._sequence_count,
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # A reader is pickled as a reference to it, along with its index,
+        # so that it can be recreated without reading anything.
+        return (_rehydrate_reader, (self.reference(), self._index))
+
     @abstractmethod
     def open(self) -> None:
         """Open the URI for reading."""
 
     @abstractmethod
     def close(self) -> None:
-        """Close the URI for reading."""
+        """Close the URI for reading.
+
+        Note:
+            Child classes should call this to release any cached data.
+        """
+        self.cache_clear()
+
+    @property
+    def sequence_cache(self) -> BoundedCache[TwoBitSequence]:
+        """The cache of sequences that have been loaded."""
+        return self._sequences
+
+    def cache_clear(self) -> None:
+        """Clear all the cached data held by the reader and its sequences."""
+        for sequence in self._sequences.values():
+            sequence.cache_clear()
+        self._sequences.cache_clear()
 
     @abstractmethod
     def goto(self, position: int) -> None:
@@ -132,6 +311,17 @@ class TwoBitReader(ABC):
         """
         return NotImplemented
 
+    def read_long_at(self, position: int) -> int:
+        """Read a long integer from a given position in the file.
+
+        Args:
+            position: The location to read the long integer from.
+
+        Returns:
+            The long integer value read.
+        """
+        return int(unpack(f"{self._endianness}L", self.read(4, position))[0])
+
     def read_long(self) -> int:
         """Read a long integer from the file.
 
@@ -143,16 +333,19 @@ class TwoBitReader(ABC):
         """
         return int(unpack(f"{self._endianness}L", self.read(4))[0])
 
-    def read_long_array(self, count: int) -> tuple[int, ...]:
+    def read_long_array(
+        self, count: int, position: int | None = None
+    ) -> tuple[int, ...]:
         """Read an array of long integers from the file.
 
         Args:
             count: The count of long integers to read.
+            position: The optional location to start reading from.
 
         Returns:
             A tuple of long integers read.
         """
-        return unpack(f"{self._endianness}{'L' * count}", self.read(count * 4))
+        return unpack(f"{self._endianness}{count}L", self.read(count * 4, position))
 
     def _read_header(self) -> None:
         """Read the header of the 2bit file.
@@ -187,26 +380,39 @@ class TwoBitReader(ABC):
                 f"{version} is not a valid 2bit version; '{self._uri}' is not a supported 2bit file"
             )
 
-    def _read_index(self) -> None:
-        """Read the index of the 2bit file."""
+    def _read_index(self) -> dict[str, int]:
+        """Read the index of the 2bit file.
+
+        Returns:
+            The offset of each sequence in the file, keyed by name.
+        """
 
         # An index entry is 1 byte for the name length, length number of
         # bytes for the name, and then 4 bytes for the offset to the actual
         # data. This means each record is variable in length. Because we
         # might be reading from a slow source, let's load up the maximum
         # buffer.
-        raw_index = self.read((1 + 255 + 4) * self._sequence_count)
+        raw_index = self.read((1 + 255 + 4) * self._sequence_count, self._HEADER_SIZE)
 
+        index: dict[str, int] = {}
         offset = 0
         for _ in range(self._sequence_count):
             name_length = raw_index[offset]
             offset += 1
             name = raw_index[offset : offset + name_length].decode()
             offset += name_length
-            self._index[name], *_ = unpack(
+            index[name], *_ = unpack(
                 f"{self._endianness}L", raw_index[offset : offset + 4]
             )
             offset += 4
+        return index
+
+    @property
+    def _index(self) -> dict[str, int]:
+        """The offset of each sequence in the file, keyed by name."""
+        if self._loaded_index is None:
+            self._loaded_index = self._read_index()
+        return self._loaded_index
 
     @property
     def sequences(self) -> tuple[str, ...]:
@@ -219,7 +425,85 @@ class TwoBitReader(ABC):
     def __len__(self) -> int:
         return self._sequence_count
 
-    @lru_cache()
+    def scan(self, *fields: str) -> TwoBitScan:
+        """Scan the headers of all of the sequences in the 2bit file.
+
+        Args:
+            fields: The fields to scan for; all of them if none are given.
+
+        Returns:
+            The result of the scan, in index order.
+
+        Raises:
+            ValueError: If an unknown field is asked for.
+
+        Note:
+            The sequences are visited in the order they appear in the file,
+            only the parts of each header needed for the requested fields
+            are read, and no sequence objects are created. The fields that
+            can be asked for are `size`, `n_count`, `n_bases` and
+            `mask_count`.
+        """
+        if unknown := set(fields) - set(SCAN_FIELDS):
+            raise ValueError(f"Unknown scan fields: {', '.join(sorted(unknown))}")
+        wanted = set(fields or SCAN_FIELDS)
+        need_n_count = bool(wanted - {"size"})
+        results = {field: array("I", bytes(4 * len(self._index))) for field in wanted}
+        slots = {name: slot for slot, name in enumerate(self._index)}
+        for name, offset in sorted(self._index.items(), key=lambda entry: entry[1]):
+            slot = slots[name]
+            # The size and the N block count sit next to each other, so if
+            # we need the count it's no extra work to read both.
+            if need_n_count:
+                size, n_count = unpack(f"{self._endianness}LL", self.read(8, offset))
+            else:
+                size, n_count = self.read_long_at(offset), 0
+            if "size" in results:
+                results["size"][slot] = size
+            if "n_count" in results:
+                results["n_count"][slot] = n_count
+            if "n_bases" in results and n_count:
+                results["n_bases"][slot] = sum(
+                    self.read_long_array(n_count, offset + 8 + 4 * n_count)
+                )
+            if "mask_count" in results:
+                results["mask_count"][slot] = self.read_long_at(
+                    offset + 8 + 8 * n_count
+                )
+        return TwoBitScan(self.sequences, **results)
+
+    def scan_n_blocks(self) -> Iterator[tuple[str, tuple[TwoBitBlock, ...]]]:
+        """Scan the N blocks of all the sequences in the 2bit file.
+
+        Yields:
+            The name and the N blocks of each sequence.
+
+        Note:
+            The sequences are visited in the order they appear in the file,
+            and only the N block tables are read.
+        """
+        for name, offset in sorted(self._index.items(), key=lambda entry: entry[1]):
+            n_count = self.read_long_at(offset + 4)
+            starts = self.read_long_array(n_count, offset + 8)
+            sizes = self.read_long_array(n_count)
+            yield name, tuple(
+                TwoBitBlock(start, start + size, size)
+                for start, size in zip(starts, sizes)
+            )
+
+    def sequence_sizes(self) -> dict[str, int]:
+        """Get the size of every sequence in the 2bit file.
+
+        Returns:
+            The size of each sequence, keyed by name, in index order.
+
+        Note:
+            This is a convenience wrapper around `scan`.
+        """
+        scan = self.scan("size")
+        assert scan.size is not None
+        return dict(zip(scan.names, scan.size))
+
     def sequence(self, name: str) -> TwoBitSequence:
         """Get a 2bit sequence given its name.
 
@@ -234,7 +518,36 @@ class TwoBitReader(ABC):
         """
         if name not in self._index:
             raise UnknownSequence(f"'{name}' is not a sequence in '{self._uri}'")
-        return TwoBitSequence(self, name, self._index[name])
+        return self._sequences.get(
+            name, lambda: self._new_sequence(name, self._index[name])
+        )
+
+    def _new_sequence(self, name: str, offset: int) -> TwoBitSequence:
+        """Create the object for reading a sequence.
+
+        Args:
+            name: The name of the sequence.
+            offset: The offset of the sequence in the file.
+
+        Returns:
+            An object for reading the sequence.
+        """
+        return TwoBitSequence(self, name, offset)
+
+    def _adopt_sequence(
+        self, name: str, factory: Callable[[], TwoBitSequence]
+    ) -> TwoBitSequence:
+        """Adopt a sequence that was created without looking it up in the index.
+
+        Args:
+            name: The name of the sequence.
+            factory: A function that creates the sequence, if the reader
+                doesn't already have it.
+
+        Returns:
+            The reader's sequence with that name.
+        """
+        return self._sequences.get(name, factory)
 
     def __getitem__(self, name: str) -> TwoBitSequence:
         return self.sequence(name)
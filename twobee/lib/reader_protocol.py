@@ -6,7 +6,12 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
-from typing_extensions import Protocol
+from typing import TYPE_CHECKING, Protocol
+
+##############################################################################
+# Local imports; only needed for type checking.
+if TYPE_CHECKING:
+    from .reader import TwoBitReaderReference
 
 
 ##############################################################################
@@ -19,6 +24,9 @@ class TwoBitReaderInterface(Protocol):
     def masking(self) -> bool:
         ...
 
+    def reference(self) -> TwoBitReaderReference:
+        ...
+
     def goto(self, position: int) -> None:
         ...
 
@@ -31,7 +39,9 @@ class TwoBitReaderInterface(Protocol):
     def read_long(self) -> int:
         ...
 
-    def read_long_array(self, count: int) -> tuple[int, ...]:
+    def read_long_array(
+        self, count: int, position: int | None = None
+    ) -> tuple[int, ...]:
         ...
 
 
@@ -0,0 +1,365 @@
+"""Provides random sampling of fixed-length windows, and batched loading of them.
+
+A `WindowSampler` draws windows uniformly from all of the places in a
+genome where a window of a given length can go without touching an N; a
+`WindowLoader` turns those windows into batches of decoded bases, ready for
+training a model.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from array import array
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from random import Random
+from threading import Lock
+from typing import TYPE_CHECKING, Final, Iterable, Iterator, NamedTuple, Sequence
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .decode import decode, overlay_mask_blocks, overlay_n_blocks
+from .reader import TwoBitReader, UnknownSequence
+
+
+##############################################################################
+class Window(NamedTuple):
+    """A window on a sequence."""
+
+    sequence: str
+    """The name of the sequence."""
+    start: int
+    """The start of the window (inclusive)."""
+    end: int
+    """The end of the window (exclusive)."""
+
+
+##############################################################################
+class WindowSampler:
+    """Draws fixed-length windows uniformly from the N-free parts of a genome.
+
+    When the sampler is created the N block tables are used to find every
+    run of bases that doesn't contain an N, and a running total of the
+    number of windows that fit in each run is built; drawing a window is
+    then a random number and a binary search of those totals.
+    """
+
+    def __init__(
+        self,
+        reader: TwoBitReader,
+        length: int,
+        names: Iterable[str] | None = None,
+        seed: int | None = None,
+    ) -> None:
+        """Initialise the sampler.
+
+        Args:
+            reader: The reader for the genome to sample.
+            length: The length of the windows.
+            names: The names of the sequences to sample from; all of them if `None`.
+            seed: The seed for the random number generator.
+
+        Raises:
+            UnknownSequence: If an unknown sequence is asked for.
+            ValueError: If there is nowhere for a window to go.
+        """
+        if length < 1:
+            raise ValueError("The length of a window must be at least 1")
+        self._length = length
+        self._random = Random(seed)
+        sizes = reader.sequence_sizes()
+        wanted = set(sizes if names is None else names)
+        if unknown := wanted - set(sizes):
+            raise UnknownSequence(
+                f"Not sequences in '{reader.uri}': {', '.join(sorted(unknown))}"
+            )
+        self._names: list[str] = []
+        self._sequences = array("L")
+        self._run_starts = array("Q")
+        self._totals = array("Q")
+        total = 0
+        for name, n_blocks in reader.scan_n_blocks():
+            if name not in wanted:
+                continue
+            slot = len(self._names)
+            self._names.append(name)
+            for run_start, run_end in self._runs(n_blocks, sizes[name]):
+                if (windows := run_end - run_start - length + 1) > 0:
+                    total += windows
+                    self._sequences.append(slot)
+                    self._run_starts.append(run_start)
+                    self._totals.append(total)
+        if not total:
+            raise ValueError(f"There is nowhere for a window of {length} bases to go")
+
+    @staticmethod
+    def _runs(n_blocks: Sequence[TwoBitBlock], size: int) -> Iterator[tuple[int, int]]:
+        """Find the runs of bases that don't contain an N.
+
+        Args:
+            n_blocks: The N blocks of the sequence, in order.
+            size: The size of the sequence.
+
+        Yields:
+            The start (inclusive) and end (exclusive) of each run.
+        """
+        start = 0
+        for block in n_blocks:
+            if block.start > start:
+                yield start, block.start
+            start = max(start, block.end)
+        if start < size:
+            yield start, size
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield "length", self._length
+        yield "sequences", len(self._names)
+        yield "window_count", self.window_count
+
+    @property
+    def length(self) -> int:
+        """The length of the windows."""
+        return self._length
+
+    @property
+    def window_count(self) -> int:
+        """The number of different windows that can be drawn."""
+        return self._totals[-1]
+
+    def seed(self, seed: int | None) -> None:
+        """Reseed the random number generator.
+
+        Args:
+            seed: The new seed.
+        """
+        self._random.seed(seed)
+
+    def sample(self) -> Window:
+        """Draw a window.
+
+        Returns:
+            The window.
+        """
+        choice = self._random.randrange(self._totals[-1])
+        run = bisect_right(self._totals, choice)
+        start = self._run_starts[run] + choice - (self._totals[run - 1] if run else 0)
+        return Window(self._names[self._sequences[run]], start, start + self._length)
+
+    def samples(self, count: int) -> list[Window]:
+        """Draw a number of windows.
+
+        Args:
+            count: The number of windows to draw.
+
+        Returns:
+            The windows.
+        """
+        return [self.sample() for _ in range(count)]
+
+
+##############################################################################
+@dataclass(frozen=True)
+class WindowBatch:
+    """A batch of windows, along with their bases."""
+
+    windows: tuple[Window, ...]
+    """The windows in the batch."""
+    length: int
+    """The length of each window."""
+    bases: bytearray
+    """The bases of all the windows, as ASCII, one window after another."""
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def __getitem__(self, index: int) -> memoryview:
+        if not -len(self.windows) <= index < len(self.windows):
+            raise IndexError("window index out of range")
+        index %= len(self.windows)
+        return memoryview(self.bases)[index * self.length : (index + 1) * self.length]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        return (self[index] for index in range(len(self.windows)))
+
+
+##############################################################################
+class WindowLoader:  # pylint: disable=too-many-instance-attributes
+    """Loads batches of windows drawn by a `WindowSampler`.
+
+    The windows in a batch are sorted so that those that are close to each
+    other on the same sequence can be read in one go, and each run of bases
+    that is read is decoded in one go, straight into the buffer for the
+    batch. Upcoming batches are loaded on background threads while the
+    current one is being used.
+    """
+
+    COALESCE_GAP: Final = 1024
+    """How far apart two windows can be and still be read in one go."""
+
+    def __init__(
+        self,
+        reader: TwoBitReader,
+        sampler: WindowSampler,
+        batch_size: int,
+        batches: int | None = None,
+        *,
+        prefetch: int = 2,
+        threads: int = 1,
+    ) -> None:
+        # pylint: disable=too-many-arguments
+        """Initialise the loader.
+
+        Args:
+            reader: The reader for the genome.
+            sampler: The sampler to draw the windows with.
+            batch_size: The number of windows in each batch.
+            batches: The number of batches to load; no limit if `None`.
+            prefetch: The number of batches to load ahead of time.
+            threads: The number of threads to load batches with.
+
+        Note:
+            If the reader is taking masking into account, masked bases will
+            be in lower case.
+        """
+        self._reader = reader
+        self._sampler = sampler
+        self._batch_size = batch_size
+        self._batches = batches
+        self._prefetch = prefetch
+        self._threads = threads
+        self._lock = Lock()
+        self._located: dict[
+            str, tuple[int, int, Sequence[TwoBitBlock], Sequence[TwoBitBlock]]
+        ] = {}
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield self._sampler
+        yield "batch_size", self._batch_size
+        yield "batches", self._batches
+
+    def _locate(
+        self, name: str
+    ) -> tuple[int, int, Sequence[TwoBitBlock], Sequence[TwoBitBlock]]:
+        """Locate a sequence.
+
+        Args:
+            name: The name of the sequence.
+
+        Returns:
+            The location of the sequence's DNA, its size, its N blocks and
+            its mask blocks.
+        """
+        if name not in self._located:
+            with self._lock:
+                sequence = self._reader[name]
+            self._located[name] = (
+                sequence.dna_file_location,
+                sequence.dna_size,
+                sequence.n_blocks,
+                sequence.mask_blocks if self._reader.masking else (),
+            )
+        return self._located[name]
+
+    def load(self, windows: Sequence[Window]) -> WindowBatch:
+        """Load the bases for some windows.
+
+        Args:
+            windows: The windows to load.
+
+        Returns:
+            The batch of windows.
+
+        Raises:
+            ValueError: If a window isn't the sampler's length, or runs off
+                the end of its sequence.
+        """
+        length = self._sampler.length
+        bases = bytearray(len(windows) * length)
+        for window in windows:
+            if window.end - window.start != length:
+                raise ValueError(f"{window} isn't {length} bases long")
+            if window.start < 0 or window.end > self._locate(window.sequence)[1]:
+                raise ValueError(f"{window} isn't within its sequence")
+
+        order = sorted(range(len(windows)), key=lambda index: windows[index])
+        run: list[int] = []
+        run_end = -1
+
+        def read_run() -> None:
+            """Read and decode a run of coalesced windows, and share out the bases."""
+            location, _, n_blocks, mask_blocks = self._located[windows[run[0]].sequence]
+            start = windows[run[0]].start
+            first = start // 4
+            # Reading a sequence's details moves the reader's position, so
+            # don't read while that might be happening on another thread.
+            with self._lock:
+                packed = self._reader.read((run_end + 3) // 4 - first, location + first)
+            decoded = decode(packed, first * 4, start, run_end)
+            if mask_blocks:
+                overlay_mask_blocks(decoded, start, mask_blocks)
+            overlay_n_blocks(decoded, start, n_blocks)
+            for index in run:
+                offset = windows[index].start - start
+                bases[index * length : (index + 1) * length] = decoded[
+                    offset : offset + length
+                ]
+
+        for index in order:
+            window = windows[index]
+            if run and (
+                window.sequence != windows[run[0]].sequence
+                or window.start > run_end + self.COALESCE_GAP
+            ):
+                read_run()
+                run = []
+            run_end = max(run_end, window.end) if run else window.end
+            run.append(index)
+        if run:
+            read_run()
+        return WindowBatch(tuple(windows), length, bases)
+
+    def __iter__(self) -> Iterator[WindowBatch]:
+        """Iterate the batches.
+
+        Yields:
+            Each batch in turn.
+
+        Note:
+            The windows are drawn, and their sequences are looked up, on the
+            calling thread, so the batches are the same whatever the number
+            of threads; only the reading and decoding happen in the
+            background.
+        """
+        pending: deque[Future[WindowBatch]] = deque()
+        submitted = 0
+        with ThreadPoolExecutor(
+            max_workers=self._threads, thread_name_prefix="twobee-loader"
+        ) as loaders:
+            while True:
+                while len(pending) <= self._prefetch and (
+                    self._batches is None or submitted < self._batches
+                ):
+                    windows = self._sampler.samples(self._batch_size)
+                    for window in windows:
+                        self._locate(window.sequence)
+                    pending.append(loaders.submit(self.load, windows))
+                    submitted += 1
+                if not pending:
+                    return
+                yield pending.popleft().result()
+
+
+### sampling.py ends here
@@ -0,0 +1,65 @@
+"""Provides the class for holding the result of a bulk scan of a 2bit file."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final, Iterator
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# The fields that can be asked for when scanning a 2bit file.
+SCAN_FIELDS: Final = ("size", "n_count", "n_bases", "mask_count")
+
+
+##############################################################################
+@dataclass(frozen=True)
+class TwoBitScan:
+    """The result of a bulk scan of the sequence headers of a 2bit file.
+
+    Each field is a column, in the same order as `names`; any field that
+    wasn't asked for when the scan was made will be `None`.
+    """
+
+    names: tuple[str, ...]
+    """The names of the sequences."""
+    size: array[int] | None = None
+    """The size of each sequence."""
+    n_count: array[int] | None = None
+    """The number of N blocks in each sequence."""
+    n_bases: array[int] | None = None
+    """The number of N bases in each sequence."""
+    mask_count: array[int] | None = None
+    """The number of mask blocks in each sequence."""
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield "sequences", len(self.names)
+        yield "fields", self.fields
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """The fields that were scanned."""
+        return tuple(field for field in SCAN_FIELDS if getattr(self, field) is not None)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def rows(self) -> Iterator[tuple[str | int, ...]]:
+        """Iterate the scan as rows.
+
+        Yields:
+            A tuple of the name and then the scanned fields, for each sequence.
+        """
+        return zip(self.names, *(getattr(self, field) for field in self.fields))
+
+
+### scan.py ends here
@@ -0,0 +1,126 @@
+"""Searching a sequence for a motif, a chunk at a time."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from array import array
+from re import fullmatch
+from typing import Iterator
+
+##############################################################################
+# Local imports.
+from .decode import STREAM_CHUNK, stream_bases
+from .sequence_protocol import TwoBitSequenceInterface
+
+
+##############################################################################
+def search(
+    sequence: TwoBitSequenceInterface,
+    motif: str,
+    start: int = 0,
+    end: int | None = None,
+    chunk_size: int = STREAM_CHUNK,
+) -> Iterator[tuple[int, array[int]]]:
+    """Search a sequence for a motif, a chunk at a time.
+
+    Args:
+        sequence: The sequence to search.
+        motif: The motif to search for.
+        start: The start of the range to search (inclusive).
+        end: The end of the range to search (exclusive); the end of the
+            sequence if `None`.
+        chunk_size: The number of bases to search in each chunk.
+
+    Returns:
+        An iterator of how far the search has got, along with the start of
+        each hit found in the chunk that has just been searched.
+
+    Raises:
+        ValueError: If the motif is empty, or isn't made of A, C, G and T.
+
+    Note:
+        The search doesn't care about case, overlapping hits are all
+        found, and an N in the sequence never matches anything. A chunk is
+        yielded even if it has no hits, so the caller can keep track of how
+        the search is going, and stop when it likes.
+    """
+    if not fullmatch("[ACGT]+", motif.upper()):
+        raise ValueError(f"'{motif}' is not a motif made of A, C, G and T")
+    return _search(
+        sequence,
+        motif.upper().encode("ascii"),
+        start,
+        sequence.dna_size if end is None else min(end, sequence.dna_size),
+        chunk_size,
+    )
+
+
+##############################################################################
+def _search(
+    sequence: TwoBitSequenceInterface,
+    pattern: bytes,
+    start: int,
+    end: int,
+    chunk_size: int,
+) -> Iterator[tuple[int, array[int]]]:
+    """Search a sequence for a pattern, a chunk at a time.
+
+    Args:
+        sequence: The sequence to search.
+        pattern: The pattern to search for, as upper case ASCII.
+        start: The start of the range to search (inclusive).
+        end: The end of the range to search (exclusive).
+        chunk_size: The number of bases to search in each chunk.
+
+    Yields:
+        How far the search has got, and the hits in the chunk just searched.
+    """
+    # Keep the end of each chunk, so that a hit that spans two chunks is
+    # found when the second chunk is searched.
+    tail = b""
+    for bases in stream_bases(sequence, start, end, chunk_size):
+        window = tail + bases
+        offset = start - len(tail)
+        hits = array("Q")
+        found = window.find(pattern)
+        while found >= 0:
+            hits.append(offset + found)
+            found = window.find(pattern, found + 1)
+        start += len(bases)
+        tail = bytes(window[max(len(window) - len(pattern) + 1, 0) :])
+        yield start, hits
+
+
+##############################################################################
+def find_motif(
+    sequence: TwoBitSequenceInterface,
+    motif: str,
+    start: int = 0,
+    end: int | None = None,
+) -> Iterator[int]:
+    """Find where a motif occurs in a sequence.
+
+    Args:
+        sequence: The sequence to search.
+        motif: The motif to search for.
+        start: The start of the range to search (inclusive).
+        end: The end of the range to search (exclusive); the end of the
+            sequence if `None`.
+
+    Yields:
+        The start of each hit, in order.
+
+    Raises:
+        ValueError: If the motif is empty, or isn't made of A, C, G and T.
+
+    Note:
+        This is a convenience wrapper around `search`.
+    """
+    for _, hits in search(sequence, motif, start, end):
+        yield from hits
+
+
+### search.py ends here
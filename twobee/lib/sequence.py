@@ -6,24 +6,44 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
-from functools import lru_cache
-from re import match
+from array import array
+from typing import TYPE_CHECKING, Any, Final, Sequence
 
 ##############################################################################
-# Rich imports.
-from rich.repr import Result
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Imports only needed for type checking.
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .reader import TwoBitReaderReference
 
 ##############################################################################
 # Local imports.
 from .bases import TwoBitBases
 from .block import TwoBitBlock
+from .cache import BoundedCache
+from .location import location_range
+from .packed import PackedBases
 from .reader_protocol import TwoBitReaderInterface
 
 
 ##############################################################################
-class TwoBitSequence:
+class TwoBitSequence:  # pylint: disable=too-many-instance-attributes
     """Class for reading a sequence from a 2bit file."""
 
+    MASK_CACHE_ENTRIES: Final = 1024
+    """The default number of mask block lookups to cache."""
+
+    MASK_CACHE_SIZE: Final = 16 * 1024 * 1024
+    """The default approximate number of bytes of mask block lookups to cache."""
+
+    BLOCK_SIZE: Final = 100
+    """The approximate number of bytes a block takes up in memory."""
+
     def __init__(self, reader: TwoBitReaderInterface, name: str, offset: int):
         """Initialise the 2bit sequence object.
 
@@ -36,6 +56,7 @@ class TwoBitSequence:
         # Store off the key data.
         self.reader = reader
         self._name = name
+        self._offset = offset
 
         # Jump to the start of the sequence in the file.
         self.reader.goto(offset)
@@ -44,10 +65,10 @@ class TwoBitSequence:
         self._dna_size = self.reader.read_long()
 
         # Get the N block data.
-        self.n_blocks = self._load_blocks()
+        self.n_blocks: Sequence[TwoBitBlock] = self._load_blocks()
 
         # Get the mask block data.
-        self.mask_blocks = self._load_blocks()
+        self.mask_blocks: Sequence[TwoBitBlock] = self._load_blocks()
 
         # We should now be on the reserved long integer. It should always be
         # zero.
@@ -58,7 +79,118 @@ class TwoBitSequence:
         # that.
         self._dna_start = self.reader.position()
 
-    def _load_blocks(self) -> tuple[TwoBitBlock, ...]:
+        # Set up the cache of mask block lookups.
+        self._mask_cache = self._new_mask_cache()
+
+    def _new_mask_cache(self) -> BoundedCache[tuple[TwoBitBlock, ...]]:
+        """Create the cache for mask block lookups.
+
+        Returns:
+            The cache.
+        """
+        # Lookups of mask blocks are cached, within a budget. Note that the
+        # sizer mustn't refer back to us, as the cache mustn't keep us alive.
+        block_size = self.BLOCK_SIZE
+        return BoundedCache(
+            self,
+            self.MASK_CACHE_ENTRIES,
+            self.MASK_CACHE_SIZE,
+            lambda blocks: block_size * (len(blocks) + 1),
+        )
+
+    @staticmethod
+    def _pack_blocks(blocks: Sequence[TwoBitBlock]) -> tuple[array[int], array[int]]:
+        """Pack a block table into a compact form for pickling.
+
+        Args:
+            blocks: The blocks to pack.
+
+        Returns:
+            The starts and the sizes of the blocks.
+        """
+        return (
+            array("I", (block.start for block in blocks)),
+            array("I", (block.size for block in blocks)),
+        )
+
+    @staticmethod
+    def _unpack_blocks(
+        starts: array[int], sizes: array[int]
+    ) -> tuple[TwoBitBlock, ...]:
+        """Unpack a block table that was packed for pickling.
+
+        Args:
+            starts: The starts of the blocks.
+            sizes: The sizes of the blocks.
+
+        Returns:
+            The blocks.
+        """
+        return tuple(
+            TwoBitBlock(start, start + size, size) for start, size in zip(starts, sizes)
+        )
+
+    def _pickle_state(self) -> tuple[Any, ...] | None:
+        """Get the state of the sequence that needs to be pickled.
+
+        Returns:
+            The state, or `None` if the sequence should be created afresh
+            from the file when it's unpickled.
+        """
+        return (
+            self._dna_size,
+            self._dna_start,
+            *self._pack_blocks(self.n_blocks),
+            *self._pack_blocks(self.mask_blocks),
+        )
+
+    @classmethod
+    def _restore(
+        cls,
+        reader: TwoBitReaderInterface,
+        name: str,
+        offset: int,
+        state: tuple[Any, ...],
+    ) -> TwoBitSequence:
+        """Restore a sequence from its pickled state, without reading the file.
+
+        Args:
+            reader: The reader to load data from the file.
+            name: The name of the sequence.
+            offset: The offset of the sequence in the file.
+            state: The state from `_pickle_state`.
+
+        Returns:
+            The sequence.
+        """
+        dna_size, dna_start, n_starts, n_sizes, mask_starts, mask_sizes = state
+        sequence = cls.__new__(cls)
+        sequence.reader = reader
+        sequence._name = name
+        sequence._offset = offset
+        sequence._dna_size = dna_size
+        sequence._dna_start = dna_start
+        sequence.n_blocks = cls._unpack_blocks(n_starts, n_sizes)
+        sequence.mask_blocks = cls._unpack_blocks(mask_starts, mask_sizes)
+        sequence._mask_cache = sequence._new_mask_cache()
+        return sequence
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # A sequence is pickled as a reference to its reader, along with its
+        # location and its (compacted) block tables, so that it can be
+        # recreated without reading anything.
+        return (
+            _rehydrate_sequence,
+            (
+                type(self),
+                self.reader.reference(),
+                self._name,
+                self._offset,
+                self._pickle_state(),
+            ),
+        )
+
+    def _load_blocks(self) -> Sequence[TwoBitBlock]:
         """Load the block data at the current location.
 
         Returns:
@@ -101,44 +233,57 @@ class TwoBitSequence:
     def __len__(self) -> int:
         return self._dna_size
 
-    def bases(self, start: int, end: int) -> TwoBitBases:
+    @property
+    def memory_size(self) -> int:
+        """The approximate number of bytes the sequence's block tables take up."""
+        return self.BLOCK_SIZE * (len(self.n_blocks) + len(self.mask_blocks) + 1)
+
+    @property
+    def mask_cache(self) -> BoundedCache[tuple[TwoBitBlock, ...]]:
+        """The cache of mask block lookups."""
+        return self._mask_cache
+
+    def cache_clear(self) -> None:
+        """Clear any cached data held by the sequence."""
+        self._mask_cache.cache_clear()
+
+    def bases(
+        self, start: int, end: int, executor: Executor | None = None
+    ) -> TwoBitBases:
         """Get bases from the 2bit file.
 
         Args:
             start: The start location to get the bases from (inclusive).
             end: The end location to get the bases from (exclusive).
+            executor: A pool of workers to decode a large range of bases with.
 
         Returns:
             The bases loaded between those locations.
+
+        Note:
+            The executor is only used for ranges of at least
+            `TwoBitBases.PARALLEL_THRESHOLD` bases.
+        """
+        return TwoBitBases(self, start, max(start, end), executor)
+
+    def packed(self, start: int = 0, end: int | None = None) -> PackedBases:
+        """Get bases from the 2bit file, without decoding them.
+
+        Args:
+            start: The start location to get the bases from (inclusive).
+            end: The end location to get the bases from (exclusive); the end
+                of the sequence if `None`.
+
+        Returns:
+            The packed bases loaded between those locations.
         """
-        return TwoBitBases(self, start, max(start, end))
+        return PackedBases.from_sequence(self, start, end)
 
     def __getitem__(self, location: int | slice | tuple[int, int] | str) -> TwoBitBases:
-        # Getting a single base.
-        if isinstance(location, int):
-            return self.bases(location, location + 1)
-
-        # Getting a range of bases with a slice.
-        if isinstance(location, slice):
-            return self.bases(
-                0 if location.start is None else location.start,
-                len(self) if location.stop is None else location.stop,
-            )
-
-        # Getting a range of bases with a tuple.
-        if isinstance(location, tuple) and len(location) == 2:
-            return self.bases(*location)
-
-        # Getting a range of bases with a string like "100:200" or "100..200".
-        if isinstance(location, str):
-            hit = match(r"^(?P<start>\d+)(?::|\.\.)(?P<end>\d+)$", location)
-            if hit is not None:
-                return self[(int(hit["start"]), int(hit["end"]))]
-
-        # Give up, I don't understand what you're asking for.
-        return NotImplemented
-
-    @lru_cache()
+        if (span := location_range(location, len(self))) is None:
+            return NotImplemented
+        return self.bases(*span)
+
     def mask_blocks_intersecting(self, start: int, end: int) -> tuple[TwoBitBlock, ...]:
         """Get all mask blocks that intersect the given range.
 
@@ -149,15 +294,46 @@ class TwoBitSequence:
         Returns:
             The mask blocks that intersect the given range.
         """
-        return (
-            tuple(
+        if not self.reader.masking:
+            return ()
+        return self._mask_cache.get(
+            (start, end),
+            lambda: tuple(
                 block
                 for block in self.mask_blocks
                 if not (block.end < start or block.start > end)
-            )
-            if self.reader.masking
-            else ()
+            ),
         )
 
 
+##############################################################################
+def _rehydrate_sequence(
+    sequence_class: type[TwoBitSequence],
+    reference: TwoBitReaderReference,
+    name: str,
+    offset: int,
+    state: tuple[Any, ...] | None,
+) -> TwoBitSequence:
+    """Recreate a sequence that has been pickled.
+
+    Args:
+        sequence_class: The class of the sequence.
+        reference: The reference to the sequence's reader.
+        name: The name of the sequence.
+        offset: The offset of the sequence in the file.
+        state: The pickled state of the sequence.
+
+    Returns:
+        The sequence.
+    """
+    reader = reference.open()
+    # pylint: disable=protected-access
+    return reader._adopt_sequence(
+        name,
+        lambda: reader._new_sequence(name, offset)
+        if state is None
+        else sequence_class._restore(reader, name, offset, state),
+    )
+
+
 ### sequence.py ends here
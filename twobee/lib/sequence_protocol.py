@@ -6,7 +6,7 @@ from __future__ import annotations
 
 ##############################################################################
 # Python imports.
-from typing_extensions import Protocol
+from typing import Protocol, Sequence
 
 ##############################################################################
 # Local imports.
@@ -19,8 +19,8 @@ class TwoBitSequenceInterface(Protocol):
     """Interface of a 2bit sequence."""
 
     reader: TwoBitReaderInterface
-    n_blocks: tuple[TwoBitBlock, ...]
-    mask_blocks: tuple[TwoBitBlock, ...]
+    n_blocks: Sequence[TwoBitBlock]
+    mask_blocks: Sequence[TwoBitBlock]
 
     # pylint: disable=missing-docstring
 
@@ -0,0 +1,406 @@
+"""Provides a way of sharing a 2bit file between many processes.
+
+A `TwoBitSharedGenome` loads a 2bit file into shared memory once; worker
+processes are then given its (small, picklable) `SharedGenomeHandle` and
+use that to open a `TwoBitSharedReader`. The reader reads straight out of
+the shared memory, and the N and mask block tables of its sequences are
+views of the tables in the shared copy of the file, rather than being
+built up in each process.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from struct import iter_unpack, unpack_from
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Iterator, Sequence, overload
+from weakref import finalize
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .decode import blocks_overlapping
+from .reader import TwoBitError, TwoBitReader
+from .sequence import TwoBitSequence
+from .shared_memory import attach_shared_memory, release_shared_memory
+
+
+##############################################################################
+class SharedBlocks(Sequence[TwoBitBlock]):
+    """A view of a block table held in shared memory.
+
+    The starts and sizes of the blocks stay where they are, in the shared
+    copy of the 2bit file; a `TwoBitBlock` is only created when a block is
+    looked at.
+    """
+
+    __slots__ = ("_data", "_format", "_starts", "_count")
+
+    def __init__(
+        self, data: memoryview, endianness: str, offset: int, count: int
+    ) -> None:
+        """Initialise the blocks.
+
+        Args:
+            data: The shared copy of the 2bit file.
+            endianness: The endianness of the 2bit file.
+            offset: The location of the table in the file.
+            count: The number of blocks in the table.
+        """
+        self._data = data
+        self._format = f"{endianness}L"
+        self._starts = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> TwoBitBlock:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> tuple[TwoBitBlock, ...]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> TwoBitBlock | tuple[TwoBitBlock, ...]:
+        if isinstance(index, slice):
+            return tuple(self[block] for block in range(*index.indices(self._count)))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("block index out of range")
+        start, *_ = unpack_from(self._format, self._data, self._starts + 4 * index)
+        size, *_ = unpack_from(
+            self._format, self._data, self._starts + 4 * (self._count + index)
+        )
+        return TwoBitBlock(start, start + size, size)
+
+    def __iter__(self) -> Iterator[TwoBitBlock]:
+        middle = self._starts + 4 * self._count
+        for (start,), (size,) in zip(
+            iter_unpack(self._format, self._data[self._starts : middle]),
+            iter_unpack(self._format, self._data[middle : middle + 4 * self._count]),
+        ):
+            yield TwoBitBlock(start, start + size, size)
+
+
+##############################################################################
+@dataclass(frozen=True)
+class SharedGenomeHandle:
+    """A handle for attaching to a 2bit file held in shared memory.
+
+    The handle is small and can be pickled, so it can be handed to worker
+    processes.
+    """
+
+    name: str
+    """The name of the shared memory that holds the file."""
+    size: int
+    """The size of the file."""
+    source: str
+    """The path of the file that was loaded into shared memory."""
+
+    def open(self, masking: bool = False) -> TwoBitSharedReader:
+        """Open a reader for the file.
+
+        Args:
+            masking: Should masking be taken into account?
+
+        Returns:
+            The reader.
+        """
+        return TwoBitSharedReader(self, masking)
+
+
+##############################################################################
+class TwoBitSharedSequence(TwoBitSequence):
+    """Class for reading a sequence from a 2bit file held in shared memory.
+
+    The N and mask block tables are views of the tables in shared memory,
+    so they take up next to no memory in the process.
+    """
+
+    def __init__(self, reader: TwoBitSharedReader, name: str, offset: int):
+        """Initialise the 2bit sequence object.
+
+        Args:
+            reader: The reader to load data from the file.
+            name: The name of the sequence.
+            offset: The initial offset of the sequence.
+        """
+        self._shared = reader
+        super().__init__(reader, name, offset)
+
+    def _load_blocks(self) -> Sequence[TwoBitBlock]:
+        """Load the block data at the current location.
+
+        Returns:
+            The blocks.
+        """
+        return self._shared.blocks(self._shared.read_long())
+
+    def _pickle_state(self) -> tuple[Any, ...] | None:
+        """Get the state of the sequence that needs to be pickled.
+
+        Returns:
+            `None`, as the sequence's tables are already in shared memory.
+        """
+        return None
+
+    @property
+    def memory_size(self) -> int:
+        """The approximate number of bytes the sequence takes up."""
+        return self.BLOCK_SIZE
+
+    def mask_blocks_intersecting(self, start: int, end: int) -> tuple[TwoBitBlock, ...]:
+        """Get all mask blocks that intersect the given range.
+
+        Args:
+            start: The start of the range to consider.
+            end: The end of the range to consider.
+
+        Returns:
+            The mask blocks that intersect the given range.
+        """
+        if not self.reader.masking:
+            return ()
+        return self._mask_cache.get(
+            (start, end),
+            lambda: tuple(blocks_overlapping(self.mask_blocks, start, end)),
+        )
+
+
+##############################################################################
+def _detach(data: memoryview, memory: SharedMemory) -> None:
+    """Release a view of some shared memory and detach from the memory.
+
+    Args:
+        data: The view of the shared memory.
+        memory: The shared memory.
+    """
+    data.release()
+    memory.close()
+
+
+##############################################################################
+class TwoBitSharedReader(TwoBitReader):
+    """Class for reading a 2bit file that has been loaded into shared memory.
+
+    Reading is a matter of slicing the shared memory, and there's nothing to
+    open other than the shared memory itself, so opening a reader is cheap.
+    """
+
+    def __init__(self, handle: SharedGenomeHandle, masking: bool = False) -> None:
+        """Initialise the reader.
+
+        Args:
+            handle: The handle of the shared genome to read.
+            masking: Should masking be taken into account?
+        """
+        self._handle = handle
+        self._position = 0
+        self._data: memoryview | None = None
+        self._detach: (
+            finalize[[memoryview, SharedMemory], TwoBitSharedReader] | None
+        ) = None
+        super().__init__(handle.source, masking)
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield from super().__rich_repr__()
+        yield "shared", self._handle.name
+
+    @property
+    def handle(self) -> SharedGenomeHandle:
+        """The handle of the shared genome being read."""
+        return self._handle
+
+    def _arguments(self) -> dict[str, Any]:
+        """Get the arguments needed to create the reader again.
+
+        Returns:
+            The arguments, keyed by name.
+        """
+        return {"handle": self._handle, "masking": self._masking}
+
+    def open(self) -> None:
+        """Attach to the shared memory."""
+        memory = attach_shared_memory(self._handle.name)
+        assert memory.buf is not None
+        self._data = memory.buf[: self._handle.size]
+        # The view of the memory has to be released before the memory can be
+        # closed, and a reader that isn't closed is likely to be tidied up
+        # (along with its sequences) in no particular order, so make sure
+        # things happen in the right order whenever the reader goes away.
+        self._detach = finalize(self, _detach, self._data, memory)
+
+    def close(self) -> None:
+        """Detach from the shared memory.
+
+        Note:
+            Any sequences obtained from the reader can't be used once the
+            reader has been closed.
+        """
+        super().close()
+        if self._detach is not None:
+            self._detach()
+            self._detach = None
+        self._data = None
+
+    @property
+    def _shared_data(self) -> memoryview:
+        """The shared copy of the file, attaching to it if need be."""
+        if self._data is None:
+            self.open()
+            assert self._data is not None
+        return self._data
+
+    def goto(self, position: int) -> None:
+        """Go to a specific position within the file.
+
+        Args:
+            position: The position to go to in the file.
+        """
+        self._position = position
+
+    def position(self) -> int:
+        """Get the current position within the 2bit file.
+
+        Returns:
+           The current position.
+        """
+        return self._position
+
+    def read(self, size: int, position: int | None = None) -> bytes:
+        """Read a number of bytes from the 2bit file.
+
+        Args:
+            size: The number of bytes to read.
+            position: The optional location to start reading from.
+
+        Returns:
+            The bytes read.
+        """
+        start = self._position if position is None else position
+        data = bytes(self._shared_data[start : start + size])
+        self._position = start + len(data)
+        return data
+
+    def blocks(self, count: int) -> Sequence[TwoBitBlock]:
+        """Get a view of the block table at the current position.
+
+        Args:
+            count: The number of blocks in the table.
+
+        Returns:
+            The blocks.
+
+        Note:
+            The position is moved on past the table.
+        """
+        start, self._position = self._position, self._position + 8 * count
+        return (
+            SharedBlocks(self._shared_data, self._endianness, start, count)
+            if count
+            else ()
+        )
+
+    def _new_sequence(self, name: str, offset: int) -> TwoBitSharedSequence:
+        """Create the object for reading a sequence.
+
+        Args:
+            name: The name of the sequence.
+            offset: The offset of the sequence in the file.
+
+        Returns:
+            An object for reading the sequence.
+        """
+        return TwoBitSharedSequence(self, name, offset)
+
+
+##############################################################################
+class TwoBitSharedGenome:
+    """A 2bit file loaded into shared memory.
+
+    The genome owns the shared memory: it should be created (and closed)
+    by the parent process, with `handle` being passed to the workers so
+    they can open their own `TwoBitSharedReader`. Closing the genome
+    releases the shared memory, so it should only be done once the workers
+    are finished with it.
+    """
+
+    def __init__(self, path: str | Path, name: str | None = None) -> None:
+        """Initialise the genome.
+
+        Args:
+            path: The path to the 2bit file to load.
+            name: The name to give the shared memory; made up if `None`.
+
+        Raises:
+            TwoBitError: If the file isn't a valid 2bit file.
+        """
+        size = Path(path).stat().st_size
+        self._memory = SharedMemory(name, create=True, size=max(size, 1))
+        self._handle = SharedGenomeHandle(self._memory.name, size, str(path))
+        assert self._memory.buf is not None
+        try:
+            with open(path, "rb") as source, self._memory.buf[:size] as target:
+                if source.readinto(target) != size:
+                    raise TwoBitError(f"Could not load all of '{path}'")
+            # Check that what we've loaded looks like a 2bit file.
+            self.open().close()
+        except Exception:
+            self.close()
+            raise
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield self._handle.source
+        yield "shared", self._handle.name
+        yield "size", self._handle.size
+
+    @property
+    def handle(self) -> SharedGenomeHandle:
+        """The handle for attaching to the genome."""
+        return self._handle
+
+    def open(self, masking: bool = False) -> TwoBitSharedReader:
+        """Open a reader for the genome.
+
+        Args:
+            masking: Should masking be taken into account?
+
+        Returns:
+            The reader.
+        """
+        return self._handle.open(masking)
+
+    def close(self) -> None:
+        """Release the shared memory."""
+        release_shared_memory(self._memory)
+
+    def __enter__(self) -> TwoBitSharedGenome:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+### shared.py ends here
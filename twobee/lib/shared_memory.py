@@ -0,0 +1,66 @@
+"""Provides helpers for attaching to and releasing shared memory."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import os
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+##############################################################################
+# The process that started the resource tracker used by this process, if it
+# was started to attach to shared memory.
+_TRACKER_STARTED_BY: int | None = None
+
+
+##############################################################################
+def attach_shared_memory(name: str) -> SharedMemory:
+    """Attach to shared memory that belongs to another object or process.
+
+    Args:
+        name: The name of the shared memory.
+
+    Returns:
+        The shared memory.
+    """
+    # The shared memory belongs to someone else, so make it clear that it's
+    # not down to us to clean it up.
+    if sys.version_info >= (3, 13):
+        # pylint: disable=unexpected-keyword-arg
+        return SharedMemory(name, track=False)
+    # Before Python 3.13 there's no way of saying that, and the resource
+    # tracker will unlink the memory when the processes using it have
+    # finished; that's fine if we share the tracker of the process that
+    # created the memory, but if we're about to start a tracker of our own
+    # it needs to be told to forget about the memory.
+    global _TRACKER_STARTED_BY  # pylint: disable=global-statement
+    tracker = resource_tracker._resource_tracker  # pylint: disable=protected-access
+    if os.name == "posix" and getattr(tracker, "_fd", None) is None:
+        _TRACKER_STARTED_BY = os.getpid()
+    memory = SharedMemory(name)
+    if _TRACKER_STARTED_BY == os.getpid():
+        resource_tracker.unregister(f"/{memory.name}", "shared_memory")
+    return memory
+
+
+##############################################################################
+def release_shared_memory(memory: SharedMemory) -> None:
+    """Close and unlink shared memory that was created by this process.
+
+    Args:
+        memory: The shared memory to release.
+    """
+    memory.close()
+    if sys.version_info < (3, 13) and _TRACKER_STARTED_BY == os.getpid():
+        # We attached to memory with a tracker of our own, so it will have
+        # been told to forget about this memory too; remind it, so that
+        # unlinking doesn't upset it.
+        resource_tracker.register(f"/{memory.name}", "shared_memory")
+    memory.unlink()
+
+
+### shared_memory.py ends here
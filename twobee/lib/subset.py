@@ -0,0 +1,223 @@
+"""Provides a writer for 2bit files that hold a subset of another 2bit file.
+
+The packed DNA is copied straight from the source file, without being
+decoded: a whole sequence, or a region that starts on a byte boundary, is
+copied a chunk of bytes at a time, while a region that starts part way
+through a byte is shifted into place as it's copied. The N and mask blocks
+are clipped to the region and moved to be relative to its start.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from struct import pack
+from typing import IO, Final, Iterable, Sequence
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .packed import clip_blocks, realign
+from .reader import TwoBitError, TwoBitReader
+from .sequence import TwoBitSequence
+
+##############################################################################
+# The number of bytes of packed DNA to copy in one go.
+COPY_CHUNK: Final = 1024 * 1024
+
+
+##############################################################################
+@dataclass(frozen=True)
+class SubsetRegion:
+    """A region of a sequence to write to a subset."""
+
+    sequence: str
+    """The name of the sequence the region is from."""
+    start: int = 0
+    """The start of the region (inclusive)."""
+    end: int | None = None
+    """The end of the region (exclusive); the end of the sequence if `None`."""
+    name: str | None = None
+    """The name to give the region in the subset.
+
+    If `None`, a whole sequence keeps its name, and any other region is
+    named `sequence:start-end`.
+    """
+
+
+##############################################################################
+@dataclass(frozen=True)
+class _Entry:
+    """A sequence, as it is to be written to a subset."""
+
+    name: bytes
+    """The name of the sequence in the subset."""
+    source: TwoBitSequence
+    """The sequence the bases come from."""
+    start: int
+    """The start of the bases in the source (inclusive)."""
+    end: int
+    """The end of the bases in the source (exclusive)."""
+    n_blocks: tuple[TwoBitBlock, ...]
+    """The N blocks, relative to the start."""
+    mask_blocks: tuple[TwoBitBlock, ...]
+    """The mask blocks, relative to the start."""
+
+    @property
+    def size(self) -> int:
+        """The number of bytes the sequence takes up in the subset."""
+        return (
+            4 * (4 + 2 * len(self.n_blocks) + 2 * len(self.mask_blocks))
+            + (self.end - self.start + 3) // 4
+        )
+
+
+##############################################################################
+def _entry(reader: TwoBitReader, region: str | SubsetRegion) -> _Entry:
+    """Work out what's to be written for a region.
+
+    Args:
+        reader: The reader for the source 2bit file.
+        region: The region, or the name of a whole sequence.
+
+    Returns:
+        What's to be written.
+
+    Raises:
+        UnknownSequence: If the region is on a sequence that isn't in the file.
+        ValueError: If the region isn't within the sequence.
+    """
+    if isinstance(region, str):
+        region = SubsetRegion(region)
+    sequence = reader[region.sequence]
+    end = sequence.dna_size if region.end is None else region.end
+    if not 0 <= region.start <= end <= sequence.dna_size:
+        raise ValueError(
+            f"{region.start}..{end} is not a region of '{region.sequence}'"
+        )
+    whole = region.start == 0 and end == sequence.dna_size
+    name = region.name or (
+        region.sequence if whole else f"{region.sequence}:{region.start}-{end}"
+    )
+    return _Entry(
+        name.encode(),
+        sequence,
+        region.start,
+        end,
+        clip_blocks(sequence.n_blocks, region.start, end),
+        clip_blocks(sequence.mask_blocks, region.start, end),
+    )
+
+
+##############################################################################
+def _write_blocks(output: IO[bytes], blocks: Sequence[TwoBitBlock]) -> None:
+    """Write a block table.
+
+    Args:
+        output: The output to write to.
+        blocks: The blocks to write.
+    """
+    output.write(pack("<L", len(blocks)))
+    output.write(pack(f"<{len(blocks)}L", *(block.start for block in blocks)))
+    output.write(pack(f"<{len(blocks)}L", *(block.size for block in blocks)))
+
+
+##############################################################################
+def _copy_packed(output: IO[bytes], entry: _Entry) -> None:
+    """Copy the packed DNA of a region.
+
+    Args:
+        output: The output to write to.
+        entry: The region to copy.
+    """
+    source = entry.source
+    skip = entry.start % 4
+    position = entry.start
+    while position < entry.end:
+        length = min(4 * COPY_CHUNK, entry.end - position)
+        first = position // 4
+        packed = source.reader.read(
+            (position + length + 3) // 4 - first, source.dna_file_location + first
+        )
+        if skip or (position + length) % 4:
+            # Either the region starts part way through a byte, and so has
+            # to be shifted into place, or this is the final byte, which
+            # might hold bases from beyond the end of the region.
+            packed = realign(packed, skip, length)
+        output.write(packed)
+        position += length
+
+
+##############################################################################
+def write_subset(
+    reader: TwoBitReader, path: str | Path, regions: Iterable[str | SubsetRegion]
+) -> Path:
+    """Write a 2bit file that holds a subset of another.
+
+    Args:
+        reader: The reader for the source 2bit file.
+        path: The path to write the subset to.
+        regions: The regions to write; each is either the name of a whole
+            sequence, or a `SubsetRegion`.
+
+    Returns:
+        The path that was written to.
+
+    Raises:
+        UnknownSequence: If a region is on a sequence that isn't in the file.
+        ValueError: If a region isn't within its sequence, if two regions
+            have the same name, or if a name is too long.
+        TwoBitError: If the subset is too large for a 2bit file.
+
+    Note:
+        The subset is always written little-endian, whatever the source
+        is. It's written next to where it's going, and only moved into
+        place once it's complete.
+    """
+    entries = [_entry(reader, region) for region in regions]
+    names = [entry.name for entry in entries]
+    if len(set(names)) != len(names):
+        raise ValueError("Each sequence in a subset must have a different name")
+    if any(len(name) > 255 for name in names):
+        raise ValueError("The name of a sequence can't be longer than 255 bytes")
+    offset = 16 + sum(5 + len(name) for name in names)
+    offsets = []
+    for entry in entries:
+        offsets.append(offset)
+        offset += entry.size
+    if offsets and offsets[-1] > 0xFFFFFFFF:
+        raise TwoBitError("The subset is too large to be a 2bit file")
+    target = Path(path)
+    partial = target.with_name(f".{target.name}.{os.getpid()}.partial")
+    try:
+        with partial.open("wb") as output:
+            output.write(
+                pack(
+                    "<IIII",
+                    TwoBitReader.SIGNATURE,
+                    TwoBitReader.VERSION,
+                    len(entries),
+                    0,
+                )
+            )
+            for entry, location in zip(entries, offsets):
+                output.write(pack("<B", len(entry.name)) + entry.name)
+                output.write(pack("<L", location))
+            for entry in entries:
+                output.write(pack("<L", entry.end - entry.start))
+                _write_blocks(output, entry.n_blocks)
+                _write_blocks(output, entry.mask_blocks)
+                output.write(pack("<L", 0))
+                _copy_packed(output, entry)
+        partial.replace(target)
+    finally:
+        partial.unlink(missing_ok=True)
+    return target
+
+
+### subset.py ends here
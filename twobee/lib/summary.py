@@ -0,0 +1,465 @@
+"""Multi-resolution summaries of the sequences in a 2bit file."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from array import array
+from contextlib import suppress
+from dataclasses import dataclass
+from json import dumps, loads
+from pathlib import Path
+from struct import pack, unpack
+from sys import byteorder
+from threading import RLock
+from typing import TYPE_CHECKING, Final, Iterable, Iterator
+
+##############################################################################
+# Rich imports; only needed for type checking.
+if TYPE_CHECKING:
+    from rich.repr import Result
+
+##############################################################################
+# Imports only needed for type checking.
+if TYPE_CHECKING:
+    from .sequence import TwoBitSequence
+
+##############################################################################
+# Local imports.
+from .block import TwoBitBlock
+from .identity import file_identity
+from .reader import TwoBitReader, UnknownSequence
+
+##############################################################################
+# The count of G and C bases in each possible packed byte. In 2bit files C is
+# 0b01 and G is 0b11, T and A are 0b00 and 0b10, so it's the low bit of each
+# pair of bits that says if a base is G or C.
+GC_COUNTS: Final = bytes(bin(byte & 0b01010101).count("1") for byte in range(256))
+
+
+##############################################################################
+def _count_gc(packed: bytes, offset: int, start: int, end: int) -> int:
+    """Count the G and C bases in a range of packed DNA.
+
+    Args:
+        packed: The packed DNA.
+        offset: The base location of the first base in `packed`.
+        start: The start of the range to count (inclusive).
+        end: The end of the range to count (exclusive).
+
+    Returns:
+        The number of G and C bases in the range.
+
+    Note:
+        `offset` must fall on a byte boundary.
+    """
+    count = 0
+    # Count the bases in any partial byte at the start of the range...
+    while start < end and start % 4:
+        count += (packed[(start - offset) // 4] >> (6 - 2 * (start % 4))) & 1
+        start += 1
+    # ...and in any partial byte at the end of the range.
+    while start < end and end % 4:
+        end -= 1
+        count += (packed[(end - offset) // 4] >> (6 - 2 * (end % 4))) & 1
+    # Everything else is whole bytes, so can be counted a byte at a time.
+    if start < end:
+        counts = packed[(start - offset) // 4 : (end - offset) // 4].translate(
+            GC_COUNTS
+        )
+        count += sum(value * counts.count(value) for value in (1, 2, 3, 4))
+    return count
+
+
+##############################################################################
+def _spread(blocks: Iterable[TwoBitBlock], counts: array[int], bin_size: int) -> None:
+    """Spread the sizes of some blocks over the bins they cover.
+
+    Args:
+        blocks: The blocks to spread.
+        counts: The counts for each bin.
+        bin_size: The size of each bin.
+    """
+    limit = len(counts) * bin_size
+    for block in blocks:
+        start, end = block.start, min(block.end, limit)
+        while start < end:
+            stop = min(end, ((start // bin_size) + 1) * bin_size)
+            counts[start // bin_size] += stop - start
+            start = stop
+
+
+##############################################################################
+@dataclass(frozen=True)
+class SummaryBin:
+    """The summary of a bin of bases within a sequence."""
+
+    start: int
+    """The start location of the bin (inclusive)."""
+    end: int
+    """The end location of the bin (exclusive)."""
+    gc: int
+    """The number of G and C bases in the bin."""
+    n: int
+    """The number of N bases in the bin."""
+    masked: int
+    """The number of masked bases in the bin."""
+
+    @property
+    def size(self) -> int:
+        """The number of bases in the bin."""
+        return self.end - self.start
+
+    @property
+    def gc_fraction(self) -> float:
+        """The fraction of the known bases in the bin that are G or C."""
+        known = self.size - self.n
+        return self.gc / known if known else 0.0
+
+    @property
+    def n_fraction(self) -> float:
+        """The fraction of the bin that is N."""
+        return self.n / self.size if self.size else 0.0
+
+    @property
+    def mask_fraction(self) -> float:
+        """The fraction of the bin that is masked."""
+        return self.masked / self.size if self.size else 0.0
+
+
+##############################################################################
+class SequenceSummary:
+    """A multi-resolution summary of a single sequence."""
+
+    BIN_SIZE: Final = 1_000
+    """The size of the bins in the finest level of the summary."""
+
+    LEVEL_FACTOR: Final = 10
+    """How many bins of a level make up a bin of the next level up."""
+
+    CHUNK_SIZE: Final = 4_000_000
+    """The number of bases to pull from the file in one read."""
+
+    def __init__(
+        self,
+        name: str,
+        dna_size: int,
+        levels: dict[int, tuple[array[int], array[int], array[int]]],
+    ) -> None:
+        """Initialise the summary.
+
+        Args:
+            name: The name of the sequence.
+            dna_size: The size of the DNA in the sequence.
+            levels: The G/C, N and mask counts, keyed by bin size.
+        """
+        self._name = name
+        self._dna_size = dna_size
+        self._levels = levels
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield self._name
+        yield "dna_size", self._dna_size
+        yield "bin_sizes", self.bin_sizes
+
+    @property
+    def name(self) -> str:
+        """The name of the sequence."""
+        return self._name
+
+    @property
+    def dna_size(self) -> int:
+        """The size of the DNA in the sequence."""
+        return self._dna_size
+
+    @property
+    def bin_sizes(self) -> tuple[int, ...]:
+        """The sizes of the bins for each level of the summary, finest first."""
+        return tuple(sorted(self._levels))
+
+    @classmethod
+    def build(cls, reader: TwoBitReader, name: str) -> SequenceSummary:
+        """Build the summary for a sequence.
+
+        Args:
+            reader: The reader for the 2bit file.
+            name: The name of the sequence to summarise.
+
+        Returns:
+            The summary of the sequence.
+
+        Note:
+            The summary is built in a single pass over the packed DNA of the
+            sequence; nothing is decoded.
+        """
+        sequence = reader.sequence(name)
+        bin_size = cls.BIN_SIZE
+        bins = -(-sequence.dna_size // bin_size)
+        n = array("I", bytes(4 * bins))
+        masked = array("I", bytes(4 * bins))
+
+        # The N and mask counts come straight from the block tables.
+        _spread(sequence.n_blocks, n, bin_size)
+        _spread(sequence.mask_blocks, masked, bin_size)
+
+        # Now build up the coarser levels from the finest one.
+        gc = cls._count_gc_bins(reader, sequence)
+        levels = {bin_size: (gc, n, masked)}
+        while len(gc) > 1:
+            bin_size *= cls.LEVEL_FACTOR
+            gc, n, masked = (
+                array(
+                    "I",
+                    (
+                        sum(counts[bin_ : bin_ + cls.LEVEL_FACTOR])
+                        for bin_ in range(0, len(counts), cls.LEVEL_FACTOR)
+                    ),
+                )
+                for counts in (gc, n, masked)
+            )
+            levels[bin_size] = (gc, n, masked)
+
+        return cls(name, sequence.dna_size, levels)
+
+    @classmethod
+    def _count_gc_bins(
+        cls, reader: TwoBitReader, sequence: TwoBitSequence
+    ) -> array[int]:
+        """Count the G and C bases in each of the finest bins of a sequence.
+
+        Args:
+            reader: The reader for the 2bit file.
+            sequence: The sequence to count the bases of.
+
+        Returns:
+            The count of G and C bases in each bin.
+        """
+        bin_size = cls.BIN_SIZE
+        gc = array("I", bytes(4 * -(-sequence.dna_size // bin_size)))
+
+        # The G/C counts come from the packed data, a chunk at a time. Any
+        # bases that are within an N block get taken back off again, as
+        # those bases aren't really G or C.
+        n_blocks = sequence.n_blocks
+        next_n_block = 0
+        for chunk_start in range(0, sequence.dna_size, cls.CHUNK_SIZE):
+            chunk_end = min(chunk_start + cls.CHUNK_SIZE, sequence.dna_size)
+            packed = reader.read(
+                -(-(chunk_end - chunk_start) // 4),
+                sequence.dna_file_location + chunk_start // 4,
+            )
+            for bin_start in range(chunk_start, chunk_end, bin_size):
+                gc[bin_start // bin_size] = _count_gc(
+                    packed, chunk_start, bin_start, min(bin_start + bin_size, chunk_end)
+                )
+            while (
+                next_n_block < len(n_blocks)
+                and n_blocks[next_n_block].start < chunk_end
+            ):
+                block = n_blocks[next_n_block]
+                start, end = max(block.start, chunk_start), min(block.end, chunk_end)
+                while start < end:
+                    stop = min(end, ((start // bin_size) + 1) * bin_size)
+                    gc[start // bin_size] -= _count_gc(packed, chunk_start, start, stop)
+                    start = stop
+                if block.end > chunk_end:
+                    break
+                next_n_block += 1
+        return gc
+
+    def bin_count(self, bin_size: int) -> int:
+        """Get the number of bins in a level of the summary.
+
+        Args:
+            bin_size: The bin size of the level.
+
+        Returns:
+            The number of bins in that level.
+        """
+        return len(self._levels[bin_size][0])
+
+    def bins(
+        self, bin_size: int, first: int = 0, count: int | None = None
+    ) -> Iterator[SummaryBin]:
+        """Get bins from a level of the summary.
+
+        Args:
+            bin_size: The bin size of the level.
+            first: The first bin to get.
+            count: The number of bins to get; all the rest if `None`.
+
+        Yields:
+            The bins.
+        """
+        gc, n, masked = self._levels[bin_size]
+        last = len(gc) if count is None else min(len(gc), first + count)
+        for bin_ in range(first, last):
+            yield SummaryBin(
+                bin_ * bin_size,
+                min((bin_ + 1) * bin_size, self._dna_size),
+                gc[bin_],
+                n[bin_],
+                masked[bin_],
+            )
+
+    def __iter__(self) -> Iterator[SummaryBin]:
+        return self.bins(self.BIN_SIZE)
+
+
+##############################################################################
+class TwoBitSummary:
+    """A multi-resolution summary of the sequences in a 2bit file.
+
+    Sequences are summarised the first time they are asked for. If the
+    summary is for a local file it can be saved next to the file and loaded
+    up again next time, so long as the file hasn't changed.
+
+    A summary can be used from more than one thread; only one sequence is
+    summarised (and the summary saved) at a time, as the reader is shared.
+    """
+
+    SIDECAR_SUFFIX: Final = ".twobee-summary"
+    """The suffix of the file that a summary is saved to."""
+
+    _MAGIC: Final = b"2BSM"
+    """The signature for a saved summary."""
+
+    _VERSION: Final = 1
+    """The version of the saved summary format."""
+
+    def __init__(self, reader: TwoBitReader, persist: bool = False) -> None:
+        """Initialise the summary.
+
+        Args:
+            reader: The reader for the 2bit file.
+            persist: Should the summary be saved alongside the 2bit file?
+
+        Note:
+            Persisting the summary only works with local files.
+        """
+        self._reader = reader
+        self._persist = persist
+        self._summaries: dict[str, SequenceSummary] = {}
+        self._lock = RLock()
+        if persist:
+            self._load()
+
+    def __rich_repr__(self) -> Result:
+        """Make the object look nice in Rich."""
+        yield self._reader
+        yield "summarised", len(self._summaries)
+
+    @property
+    def sidecar(self) -> Path:
+        """The path to the file the summary is saved to."""
+        return Path(f"{self._reader.uri}{self.SIDECAR_SUFFIX}")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._summaries
+
+    def summary(self, name: str) -> SequenceSummary:
+        """Get the summary for a sequence.
+
+        Args:
+            name: The name of the sequence.
+
+        Returns:
+            The summary of the sequence.
+
+        Raises:
+            UnknownSequence: When an unknown sequence is requested.
+        """
+        with self._lock:
+            if name not in self._summaries:
+                if name not in self._reader.sequences:
+                    raise UnknownSequence(
+                        f"'{name}' is not a sequence in '{self._reader.uri}'"
+                    )
+                self._summaries[name] = SequenceSummary.build(self._reader, name)
+                if self._persist:
+                    # Saving the summary is only ever an optimisation, so if
+                    # it can't be saved (perhaps we can't write next to the
+                    # 2bit file) just carry on without it.
+                    with suppress(OSError):
+                        self.save()
+            return self._summaries[name]
+
+    def __getitem__(self, name: str) -> SequenceSummary:
+        return self.summary(name)
+
+    def build(self, names: Iterable[str] | None = None) -> None:
+        """Summarise a number of sequences in one go.
+
+        Args:
+            names: The names of the sequences to summarise; all of them if `None`.
+        """
+        with self._lock:
+            persist, self._persist = self._persist, False
+            try:
+                for name in self._reader.sequences if names is None else names:
+                    self.summary(name)
+            finally:
+                self._persist = persist
+            if persist:
+                self.save()
+
+    def save(self) -> None:
+        """Save the summary alongside the 2bit file."""
+        with self._lock:
+            header: dict[str, object] = {
+                "identity": file_identity(self._reader.uri),
+                "byteorder": byteorder,
+                "sequences": [
+                    [
+                        summary.name,
+                        summary.dna_size,
+                        [[size, summary.bin_count(size)] for size in summary.bin_sizes],
+                    ]
+                    for summary in self._summaries.values()
+                ],
+            }
+            raw_header = dumps(header).encode()
+            with self.sidecar.open("wb") as sidecar:
+                sidecar.write(
+                    pack("<4sII", self._MAGIC, self._VERSION, len(raw_header))
+                )
+                sidecar.write(raw_header)
+                for summary in self._summaries.values():
+                    for size in summary.bin_sizes:
+                        # pylint: disable=protected-access
+                        for counts in summary._levels[size]:
+                            counts.tofile(sidecar)
+
+    def _load(self) -> None:
+        """Load a saved summary, if there is one and it's still good."""
+        try:
+            with self.sidecar.open("rb") as sidecar:
+                magic, version, header_size = unpack("<4sII", sidecar.read(12))
+                if magic != self._MAGIC or version != self._VERSION:
+                    return
+                header = loads(sidecar.read(header_size))
+                if header["identity"] != file_identity(self._reader.uri):
+                    return
+                summaries: dict[str, SequenceSummary] = {}
+                for name, dna_size, sizes in header["sequences"]:
+                    levels: dict[int, tuple[array[int], array[int], array[int]]] = {}
+                    for size, count in sizes:
+                        loaded = []
+                        for _ in range(3):
+                            counts = array("I")
+                            counts.fromfile(sidecar, count)
+                            if header["byteorder"] != byteorder:
+                                counts.byteswap()
+                            loaded.append(counts)
+                        levels[size] = (loaded[0], loaded[1], loaded[2])
+                    summaries[name] = SequenceSummary(name, dna_size, levels)
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            # If the summary can't be loaded, it'll just get built again.
+            return
+        self._summaries = summaries
+
+
+### summary.py ends here
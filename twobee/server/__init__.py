@@ -0,0 +1,12 @@
+"""A server, and client, for serving regions of 2bit files to local jobs."""
+
+##############################################################################
+# Import things for easier access.
+from .client import SequenceClient, ServerError
+from .server import SequenceServer, ServerStats
+
+##############################################################################
+# Define what importing * means.
+__all__ = ["SequenceClient", "SequenceServer", "ServerError", "ServerStats"]
+
+### __init__.py ends here
@@ -0,0 +1,122 @@
+"""A load benchmark for the sequence server."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from dataclasses import dataclass
+from random import Random
+from threading import Thread
+from time import perf_counter
+from typing import Callable, Sequence
+
+##############################################################################
+# Local imports.
+from .client import SequenceClient
+from .protocol import Region
+
+
+##############################################################################
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """The result of benchmarking the server at one level of concurrency."""
+
+    concurrency: int
+    """The number of clients making requests at the same time."""
+    requests: int
+    """The number of requests made."""
+    p50: float
+    """The median latency of a request, in seconds."""
+    p99: float
+    """The 99th percentile latency of a request, in seconds."""
+    throughput: float
+    """The number of requests served per second."""
+
+
+##############################################################################
+def random_regions(
+    genome: str, sizes: dict[str, int], count: int, length: int, seed: int = 0
+) -> list[Region]:
+    """Pick some random regions from a genome.
+
+    Args:
+        genome: The name of the genome.
+        sizes: The sizes of the sequences in the genome.
+        count: The number of regions to pick.
+        length: The length of each region.
+        seed: The seed for the random number generator.
+
+    Returns:
+        The regions.
+    """
+    candidates = [(name, size) for name, size in sizes.items() if size >= length]
+    if not candidates:
+        raise ValueError(f"No sequence in {genome} is at least {length} bases long")
+    rng = Random(seed)
+    regions = []
+    for _ in range(count):
+        name, size = rng.choice(candidates)
+        start = rng.randrange(size - length + 1)
+        regions.append(Region(genome, name, start, start + length))
+    return regions
+
+
+##############################################################################
+def _percentile(values: list[float], fraction: float) -> float:
+    """Get a percentile of some sorted values.
+
+    Args:
+        values: The sorted values.
+        fraction: The percentile, as a fraction.
+
+    Returns:
+        The value at that percentile.
+    """
+    return values[round(fraction * (len(values) - 1))] if values else 0.0
+
+
+##############################################################################
+def benchmark(
+    connect: Callable[[], SequenceClient],
+    regions: Sequence[Region],
+    concurrency: int,
+) -> BenchmarkResult:
+    """Benchmark the server at a given level of concurrency.
+
+    Args:
+        connect: A function that connects a new client to the server.
+        regions: The regions each client should request, one at a time.
+        concurrency: The number of clients to run at the same time.
+
+    Returns:
+        The result of the benchmark.
+    """
+    latencies: list[list[float]] = [[] for _ in range(concurrency)]
+
+    def client(timings: list[float]) -> None:
+        with connect() as connection:
+            for region in regions:
+                started = perf_counter()
+                connection.fetch(*region)
+                timings.append(perf_counter() - started)
+
+    clients = [Thread(target=client, args=(timings,)) for timings in latencies]
+    started = perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = perf_counter() - started
+    timings = sorted(latency for timings in latencies for latency in timings)
+    return BenchmarkResult(
+        concurrency,
+        len(timings),
+        _percentile(timings, 0.5),
+        _percentile(timings, 0.99),
+        len(timings) / elapsed if elapsed else 0.0,
+    )
+
+
+### benchmark.py ends here
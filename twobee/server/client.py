@@ -0,0 +1,126 @@
+"""A client for the sequence server."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import socket
+from types import TracebackType
+from typing import Iterable
+
+##############################################################################
+# Local imports.
+from ..lib.reader import TwoBitError
+from .protocol import DEFAULT_PORT, Region, encode_request
+
+
+##############################################################################
+class ServerError(TwoBitError):
+    """Exception thrown when the server can't serve a request."""
+
+
+##############################################################################
+class SequenceClient:
+    """A client for getting regions of sequences from a sequence server."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+    ) -> None:
+        """Initialise the client.
+
+        Args:
+            path: The path to the server's UNIX socket.
+            host: The host of the server, if not using a UNIX socket.
+            port: The port of the server, if not using a UNIX socket.
+        """
+        if path is None:
+            self._socket = socket.create_connection((host, port))
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(path)
+        self._replies = self._socket.makefile("rb")
+
+    def close(self) -> None:
+        """Close the connection to the server."""
+        self._replies.close()
+        self._socket.close()
+
+    def __enter__(self) -> SequenceClient:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _reply(self) -> str | ServerError:
+        """Read a reply from the server.
+
+        Returns:
+            The bases sent back by the server, or the error it reported.
+
+        Raises:
+            ServerError: If the server closed the connection.
+        """
+        header = self._replies.readline()
+        if not header:
+            raise ServerError("The server closed the connection")
+        if header.startswith(b"-"):
+            return ServerError(header[1:].decode().strip())
+        size = int(header[1:])
+        return self._replies.read(size + 1)[:size].decode()
+
+    def fetch(self, genome: str, sequence: str, start: int, end: int) -> str:
+        """Fetch the bases of a region.
+
+        Args:
+            genome: The name of the genome.
+            sequence: The name of the sequence.
+            start: The start of the region (inclusive).
+            end: The end of the region (exclusive).
+
+        Returns:
+            The bases of the region.
+
+        Raises:
+            ServerError: If the server couldn't serve the region.
+        """
+        return self.fetch_many([(genome, sequence, start, end)])[0]
+
+    def fetch_many(self, regions: Iterable[tuple[str, str, int, int]]) -> list[str]:
+        """Fetch the bases of a batch of regions.
+
+        Args:
+            regions: The regions to fetch, as (genome, sequence, start, end).
+
+        Returns:
+            The bases of each region, in the order they were asked for.
+
+        Raises:
+            ServerError: If the server couldn't serve one of the regions.
+
+        Note:
+            All of the requests are sent before any of the replies are
+            read, so the server can serve them as a batch.
+        """
+        requests = [Region(*region) for region in regions]
+        self._socket.sendall(b"".join(encode_request(region) for region in requests))
+        # Read every reply, even if one is an error, so that we don't leave
+        # any replies behind to be mistaken for the replies to later requests.
+        replies = [self._reply() for _ in requests]
+        for reply in replies:
+            if isinstance(reply, ServerError):
+                raise reply
+        return [reply for reply in replies if isinstance(reply, str)]
+
+
+### client.py ends here
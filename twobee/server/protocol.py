@@ -0,0 +1,111 @@
+"""The wire protocol used between the sequence server and its clients.
+
+The protocol is line-based plain text. A request is a single line made up
+of the genome name, the sequence name, the start and the end of the region
+(end exclusive), separated by whitespace:
+
+    hg38 chr1 1000000 1000100
+
+A client may send any number of requests without waiting for replies; the
+replies always come back in the order the requests were sent. A successful
+reply is a line holding `+` and the number of bases, followed by a line
+holding the bases:
+
+    +100
+    ACGT...
+
+A failed reply is a single line holding `-` and an error message.
+"""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+from typing import Final, NamedTuple
+
+##############################################################################
+# The default TCP port for the server.
+DEFAULT_PORT: Final = 2222
+
+
+##############################################################################
+class Region(NamedTuple):
+    """A region of a sequence in a genome."""
+
+    genome: str
+    """The name of the genome."""
+    sequence: str
+    """The name of the sequence."""
+    start: int
+    """The start of the region (inclusive)."""
+    end: int
+    """The end of the region (exclusive)."""
+
+
+##############################################################################
+def encode_request(region: Region) -> bytes:
+    """Encode a request for a region.
+
+    Args:
+        region: The region to request.
+
+    Returns:
+        The encoded request.
+    """
+    return f"{region.genome} {region.sequence} {region.start} {region.end}\n".encode()
+
+
+##############################################################################
+def decode_request(line: bytes) -> Region:
+    """Decode a request for a region.
+
+    Args:
+        line: The line holding the request.
+
+    Returns:
+        The region being requested.
+
+    Raises:
+        ValueError: If the request isn't valid.
+    """
+    try:
+        genome, sequence, start, end = line.decode().split()
+        region = Region(genome, sequence, int(start), int(end))
+    except (UnicodeDecodeError, ValueError):
+        raise ValueError(
+            "Requests should be: <genome> <sequence> <start> <end>"
+        ) from None
+    if region.start < 0 or region.end < region.start:
+        raise ValueError(f"{region.start}..{region.end} is not a valid region")
+    return region
+
+
+##############################################################################
+def encode_bases(bases: str) -> bytes:
+    """Encode a successful reply.
+
+    Args:
+        bases: The bases to send back.
+
+    Returns:
+        The encoded reply.
+    """
+    return f"+{len(bases)}\n{bases}\n".encode()
+
+
+##############################################################################
+def encode_error(message: str) -> bytes:
+    """Encode a failed reply.
+
+    Args:
+        message: The error message.
+
+    Returns:
+        The encoded reply.
+    """
+    return f"-{' '.join(message.split())}\n".encode()
+
+
+### protocol.py ends here
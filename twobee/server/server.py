@@ -0,0 +1,297 @@
+"""A server that keeps 2bit files open and serves regions from them."""
+
+##############################################################################
+# Backward compatibility.
+from __future__ import annotations
+
+##############################################################################
+# Python imports.
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Coroutine, Final, Mapping
+
+##############################################################################
+# Local imports.
+from ..lib.file_reader import TwoBitFileReader
+from ..lib.reader import TwoBitError
+from .protocol import Region, decode_request, encode_bases, encode_error
+
+
+##############################################################################
+@dataclass
+class ServerStats:
+    """Statistics for a sequence server."""
+
+    connections: int = 0
+    """The number of connections that have been made."""
+    requests: int = 0
+    """The number of region requests that have been handled."""
+    batches: int = 0
+    """The number of batches the requests were gathered into."""
+    reads: int = 0
+    """The number of reads made after overlapping requests were coalesced."""
+
+
+##############################################################################
+class SequenceServer:
+    """A server that serves regions of sequences from a set of 2bit files.
+
+    The files are opened, and their indexes read, when the server is
+    created, and are kept open for as long as it runs. Requests that arrive
+    at around the same time, on any connection, are gathered into a batch;
+    within a batch, requests for overlapping or nearby regions of the same
+    sequence are coalesced into a single read.
+    """
+
+    BATCH_WINDOW: Final = 0.002
+    """The default time, in seconds, to gather requests into a batch."""
+
+    COALESCE_GAP: Final = 1024
+    """How far apart two regions can be and still be read together."""
+
+    def __init__(
+        self,
+        genomes: Mapping[str, str | Path],
+        masking: bool = False,
+        batch_window: float | None = None,
+    ) -> None:
+        """Initialise the server.
+
+        Args:
+            genomes: The paths to the 2bit files, keyed by genome name.
+            masking: Should masking be taken into account?
+            batch_window: The time, in seconds, to gather requests into a batch.
+        """
+        self._readers = {
+            name: TwoBitFileReader(str(path), masking=masking)
+            for name, path in genomes.items()
+        }
+        # Readers aren't safe to share between threads, so each genome gets
+        # a thread of its own to do its reading in.
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"twobee-{name}")
+            for name in self._readers
+        }
+        self._batch_window = self.BATCH_WINDOW if batch_window is None else batch_window
+        self._pending: list[tuple[Region, asyncio.Future[str]]] = []
+        self._flush: asyncio.TimerHandle | None = None
+        # The event loop only keeps weak references to tasks, so keep hold
+        # of the ones we start until they're done.
+        self._tasks: set[asyncio.Future[None]] = set()
+        self._stats = ServerStats()
+
+    @property
+    def genomes(self) -> tuple[str, ...]:
+        """The names of the genomes being served."""
+        return tuple(self._readers)
+
+    @property
+    def stats(self) -> ServerStats:
+        """A snapshot of the statistics for the server."""
+        return replace(self._stats)
+
+    def close(self) -> None:
+        """Close the server's files."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+        for reader in self._readers.values():
+            reader.close()
+
+    def _read(self, genome: str, regions: list[Region]) -> list[str | TwoBitError]:
+        """Read a group of regions from a genome.
+
+        Args:
+            genome: The name of the genome to read from.
+            regions: The regions to read, all from the same sequence.
+
+        Returns:
+            The bases for each region, or the error reading it.
+        """
+        try:
+            sequence = self._readers[genome][regions[0].sequence]
+        except TwoBitError as error:
+            return [error] * len(regions)
+        results: list[str | TwoBitError] = [""] * len(regions)
+        order = sorted(range(len(regions)), key=lambda index: regions[index].start)
+        run: list[int] = []
+        run_end = -1
+
+        def read_run() -> None:
+            """Read a run of coalesced regions, and share out the bases."""
+            start = regions[run[0]].start
+            bases = str(sequence[start:run_end])
+            for index in run:
+                region = regions[index]
+                results[index] = bases[region.start - start : region.end - start]
+            self._stats.reads += 1
+
+        for index in order:
+            region = regions[index]
+            if run and region.start > run_end + self.COALESCE_GAP:
+                read_run()
+                run = []
+            run_end = max(run_end, region.end) if run else region.end
+            run.append(index)
+        if run:
+            read_run()
+        return results
+
+    async def _serve_batch(self) -> None:
+        """Serve all of the requests that are pending."""
+        self._flush = None
+        batch, self._pending = self._pending, []
+        self._stats.batches += 1
+        groups: dict[
+            tuple[str, str], list[tuple[Region, asyncio.Future[str]]]
+        ] = defaultdict(list)
+        for region, future in batch:
+            if region.genome in self._readers:
+                groups[(region.genome, region.sequence)].append((region, future))
+            else:
+                future.set_exception(
+                    TwoBitError(f"'{region.genome}' is not being served")
+                )
+        loop = asyncio.get_running_loop()
+        reads = {
+            key: loop.run_in_executor(
+                self._executors[key[0]],
+                self._read,
+                key[0],
+                [region for region, _ in requests],
+            )
+            for key, requests in groups.items()
+        }
+        for key, read in reads.items():
+            try:
+                results = await read
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # Something other than a 2bit error went wrong reading the
+                # group (a corrupt file, perhaps); fail every request in the
+                # group, so nobody is left waiting, but carry on serving
+                # the rest of the batch.
+                results = [
+                    TwoBitError(f"Unable to read '{key[1]}' from '{key[0]}': {error!r}")
+                ] * len(groups[key])
+            for (_, future), result in zip(groups[key], results):
+                if not future.done():
+                    if isinstance(result, TwoBitError):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+    def _start(self, work: Coroutine[Any, Any, None]) -> asyncio.Future[None]:
+        """Start a task, keeping hold of it until it's done.
+
+        Args:
+            work: The work the task is to do.
+
+        Returns:
+            The task.
+        """
+        task = asyncio.ensure_future(work)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _submit(self, region: Region) -> asyncio.Future[str]:
+        """Submit a request to be served in the next batch.
+
+        Args:
+            region: The region being requested.
+
+        Returns:
+            A future that will hold the bases for the region.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[str] = loop.create_future()
+        self._pending.append((region, future))
+        self._stats.requests += 1
+        if self._flush is None:
+            self._flush = loop.call_later(
+                self._batch_window,
+                lambda: self._start(self._serve_batch()),
+            )
+        return future
+
+    async def _reply(
+        self,
+        replies: asyncio.Queue[asyncio.Future[str] | None],
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Send the replies for a connection back, in order.
+
+        Args:
+            replies: The queue of replies to send.
+            writer: The writer for the connection.
+        """
+        while (reply := await replies.get()) is not None:
+            try:
+                writer.write(encode_bases(await reply))
+            except (TwoBitError, ValueError) as error:
+                writer.write(encode_error(str(error)))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # Whatever went wrong, the client still gets a reply, and
+                # the replies to its other requests still get sent.
+                writer.write(encode_error(repr(error)))
+            if replies.empty():
+                await writer.drain()
+        await writer.drain()
+
+    async def _connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Handle a connection to the server.
+
+        Args:
+            reader: The reader for the connection.
+            writer: The writer for the connection.
+        """
+        self._stats.connections += 1
+        replies: asyncio.Queue[asyncio.Future[str] | None] = asyncio.Queue()
+        replying = self._start(self._reply(replies, writer))
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    await replies.put(self._submit(decode_request(line)))
+                except ValueError as error:
+                    failed: asyncio.Future[
+                        str
+                    ] = asyncio.get_running_loop().create_future()
+                    failed.set_exception(error)
+                    await replies.put(failed)
+        finally:
+            await replies.put(None)
+            try:
+                await replying
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def serve_tcp(self, host: str, port: int) -> None:
+        """Serve on a TCP port until cancelled.
+
+        Args:
+            host: The host to listen on.
+            port: The port to listen on.
+        """
+        server = await asyncio.start_server(self._connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_unix(self, path: str | Path) -> None:
+        """Serve on a UNIX socket until cancelled.
+
+        Args:
+            path: The path to the socket.
+        """
+        server = await asyncio.start_unix_server(self._connection, str(path))
+        async with server:
+            await server.serve_forever()
+
+
+### server.py ends here